@@ -4,40 +4,32 @@ import json
 from datetime import datetime, timedelta
 import os
 
+from lib.cache import ResponseCache, FileStore
 from lib.db import Db
+from lib.migrations import migrate
+from lib.profiling import RequestProfiler
+from lib.query_log import QueryLogger
+from lib.schema import SchemaInfo
 
 import routes.words
 import routes.groups
 import routes.study_sessions
 import routes.dashboard
 import routes.study_activities
+import routes.debug
+import routes.metrics
+import routes.export
 
 
 
 def init_db(app):
-    """Initialize database and create tables"""
+    """Apply pending migrations; a no-op once the schema is current"""
     try:
-        cursor = app.db.cursor()
-        
-        # Execute all migration files in order
-        migration_dir = os.path.join(os.path.dirname(__file__), 'sql', 'migrations')
-        migration_files = sorted([f for f in os.listdir(migration_dir) if f.endswith('.sql')])
-        
-        migrations = [
-            'sql/migrations/001_create_words_table.sql',
-            'sql/migrations/002_create_study_tables.sql',
-            'sql/migrations/003_update_study_activities.sql'
-        ]
-
-        for migration in migrations:
-            with open(migration, 'r') as f:
-                cursor.executescript(f.read())
-
-        app.db.commit()
-        app.logger.info("Database initialized successfully")
+        applied = migrate(app.db.get())
+        if applied:
+            app.logger.info(f"Applied migrations: {', '.join(applied)}")
     except Exception as e:
         app.logger.error(f"Error initializing database: {str(e)}")
-        app.db.rollback()
         raise e
 
 def seed_database(app):
@@ -141,12 +133,47 @@ def create_app(test_config=None):
         app.config.update(test_config)
     
     # Initialize database
-    app.db = Db(database=app.config['DATABASE'])
+    app.db = Db(
+        database=app.config['DATABASE'],
+        pool_size=app.config.get('DB_POOL_SIZE', 5),
+        read_pool_size=app.config.get('DB_READ_POOL_SIZE', 5),
+        pool_timeout=app.config.get('DB_POOL_TIMEOUT', 5.0)
+    )
+
+    # SQL trace logging, off unless enabled here or at runtime via /api/debug/query-log (DEBUG_ENDPOINTS)
+    app.query_log = QueryLogger(
+        enabled=app.config.get('QUERY_LOG_ENABLED', False),
+        sample_rate=app.config.get('QUERY_LOG_SAMPLE_RATE', 1.0)
+    )
+    app.query_log.init_app(app)
+
+    # Server-Timing headers and /metrics; ?profile=1 only when PROFILE_CPROFILE_ENABLED is set,
+    # and the slowest statement's text only when PROFILE_SQL_IN_HEADER is set
+    app.profiler = RequestProfiler(
+        cprofile_enabled=app.config.get('PROFILE_CPROFILE_ENABLED', False),
+        sql_in_header=app.config.get('PROFILE_SQL_IN_HEADER', False)
+    )
+    app.profiler.init_app(app)
+
+    # Cache for read-heavy GET routes; set RESPONSE_CACHE_DIR to share it between workers
+    cache_dir = app.config.get('RESPONSE_CACHE_DIR')
+    cache_ttl = app.config.get('RESPONSE_CACHE_TTL', 60)
+    app.response_cache = ResponseCache(
+        max_entries=app.config.get('RESPONSE_CACHE_SIZE', 512),
+        ttl=cache_ttl,
+        store=FileStore(cache_dir, ttl=cache_ttl) if cache_dir else None,
+        enabled=app.config.get('RESPONSE_CACHE_ENABLED', True)
+    )
+    app.response_cache.init_app(app)
     
     # Ensure database is initialized within app context
     with app.app_context():
         init_db(app)
         seed_database(app)
+        # Cache the schema once so routes don't introspect it per request
+        app.schema = SchemaInfo.load(app.db.get())
+        # teardown_appcontext is not registered yet, so hand the connection back here
+        app.db.close()
     
     # Get allowed origins from study_activities table
     allowed_origins = get_allowed_origins(app)
@@ -171,6 +198,11 @@ def create_app(test_config=None):
     routes.study_sessions.load(app)
     routes.dashboard.load(app)
     routes.study_activities.load(app)
+    routes.export.load(app)
+    routes.metrics.load(app)
+    # The query log writes statements with their bound values, so only expose its switch in development
+    if app.debug or app.config.get('DEBUG_ENDPOINTS', False):
+        routes.debug.load(app)
 
     from error_handler import register_error_handlers, setup_api_logging
     register_error_handlers(app)
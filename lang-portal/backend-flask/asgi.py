@@ -0,0 +1,12 @@
+import os
+
+from app import app as flask_app
+from lib.asgi import AsgiAdapter
+
+# Run with e.g. `uvicorn asgi:app --workers 4`. Each worker process gets
+# ASGI_READ_WORKERS reader threads (one per read-only pooled connection)
+# and a single writer thread.
+app = AsgiAdapter(
+    flask_app,
+    read_workers=int(os.environ.get('ASGI_READ_WORKERS', flask_app.config.get('DB_READ_POOL_SIZE', 5)))
+)
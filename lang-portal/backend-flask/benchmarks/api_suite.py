@@ -0,0 +1,214 @@
+"""Drive every API route at a fixed concurrency and report latency percentiles.
+
+Without --database, a temporary database is filled by datagen.py first
+(sized by --words/--sessions/--reviews). Requests go through the Flask app
+in-process with one thread per in-flight request, like the threaded
+server. The response cache is off so every request reaches SQLite.
+
+    python benchmarks/api_suite.py --reviews 1000000 --output baseline.json
+    python benchmarks/api_suite.py --reviews 1000000 --baseline baseline.json
+
+With --baseline, the run fails (exit status 1) if a route's p95 got more
+than --tolerance slower than in the baseline.
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from benchmarks.datagen import generate
+
+# (name, method, path); {group}, {session}, {word} and {activity} are filled
+# with random ids, {last_word} with the highest word id
+ROUTES = (
+    ('words', 'GET', '/api/words?page={page}'),
+    ('words_cursor', 'GET', '/api/words?cursor='),
+    ('word', 'GET', '/api/words/{word}'),
+    ('word_search', 'GET', '/api/words/search?q=mot{word}'),
+    ('groups', 'GET', '/api/groups?page=1'),
+    ('group', 'GET', '/api/groups/{group}'),
+    ('group_words', 'GET', '/api/groups/{group}/words?page=1'),
+    ('group_due', 'GET', '/api/groups/{group}/due'),
+    ('group_study_sessions', 'GET', '/api/groups/{group}/study-sessions'),
+    ('study_sessions', 'GET', '/api/study-sessions?page={page}'),
+    ('study_session', 'GET', '/api/study-sessions/{session}'),
+    ('study_activities', 'GET', '/api/study-activities'),
+    ('study_activity', 'GET', '/api/study-activities/{activity}'),
+    ('study_activity_launch', 'GET', '/api/study-activities/{activity}/launch'),
+    ('study_activity_launch_group', 'GET', '/api/study-activities/{activity}/launch?group_id={group}'),
+    ('study_activity_launch_session', 'POST', '/api/study-activities/{activity}/launch?group_id={group}'),
+    ('dashboard_last_session', 'GET', '/api/dashboard/last-study-session'),
+    ('dashboard_progress', 'GET', '/api/dashboard/study-progress'),
+    ('dashboard_quick_stats', 'GET', '/api/dashboard/quick-stats'),
+    ('export_words_tail', 'GET', '/api/export/words?after_id={last_word}'),
+    ('review', 'POST', '/api/study-sessions/{session}/review'),
+)
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def dataset_ranges(database):
+    conn = sqlite3.connect(database)
+    try:
+        return {
+            table: conn.execute(f'SELECT MAX(id) FROM {table}').fetchone()[0] or 1
+            for table in ('words', 'groups', 'study_sessions', 'study_activities')
+        }
+    finally:
+        conn.close()
+
+def build_requests(method, path, count, ranges, rng):
+    requests = []
+    for _ in range(count):
+        session = rng.randint(1, ranges['study_sessions'])
+        url = path.format(
+            page=rng.randint(1, 5), word=rng.randint(1, ranges['words']), group=rng.randint(1, ranges['groups']),
+            session=session, activity=rng.randint(1, ranges['study_activities']),
+            last_word=max(0, ranges['words'] - 50)
+        )
+        body = b''
+        if method == 'POST':
+            body = json.dumps({'reviews': [
+                {'word_id': rng.randint(1, ranges['words']), 'is_correct': rng.random() < 0.75}
+            ]}).encode()
+        requests.append((url, body))
+    return requests
+
+def run_route(app, method, requests, concurrency):
+    """Send requests concurrently; returns the route's latency summary"""
+    def call(request):
+        url, body = request
+        start = time.perf_counter()
+        response = app.test_client().open(url, method=method, data=body, content_type='application/json')
+        response.get_data()
+        return time.perf_counter() - start, response.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(call, requests))
+    elapsed = time.perf_counter() - start
+    latencies = [latency for latency, _ in results]
+    return {
+        'requests': len(results),
+        'errors': sum(status >= 500 for _, status in results),
+        'throughput': round(len(results) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+def run_suite(app, database, requests_per_route, concurrency, only=None, seed=1):
+    rng = random.Random(seed)
+    ranges = dataset_ranges(database)
+    results = {}
+    for name, method, path in ROUTES:
+        if only and name not in only:
+            continue
+        requests = build_requests(method, path, requests_per_route, ranges, rng)
+        # One untimed request so connection setup is not in the numbers
+        run_route(app, method, requests[:1], 1)
+        results[name] = run_route(app, method, requests, concurrency)
+    return results
+
+def compare(results, baseline, tolerance=0.2, min_delta_ms=1.0):
+    """Routes whose p95 regressed: {name: (baseline p95, current p95)}.
+
+    A route regresses when its p95 is more than tolerance slower than the
+    baseline and by at least min_delta_ms, so sub-millisecond noise on
+    fast routes does not fail the run.
+    """
+    regressions = {}
+    for name, result in results.items():
+        before = baseline.get('routes', {}).get(name)
+        if before is None:
+            continue
+        limit = max(before['p95_ms'] * (1 + tolerance), before['p95_ms'] + min_delta_ms)
+        if result['p95_ms'] > limit:
+            regressions[name] = (before['p95_ms'], result['p95_ms'])
+    return regressions
+
+def print_results(results, baseline=None):
+    print(f"{'route':24} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}  vs baseline p95")
+    for name, result in results.items():
+        line = (f"{name:24} {result['throughput']:8.0f} {result['p50_ms']:8.2f} {result['p95_ms']:8.2f} "
+                f"{result['p99_ms']:8.2f} {result['errors']:6}")
+        before = (baseline or {}).get('routes', {}).get(name)
+        if before:
+            line += f"  {(result['p95_ms'] / before['p95_ms'] - 1) * 100 if before['p95_ms'] else 0:+.0f}%"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database', help="Existing database to benchmark (default: generate a temporary one)")
+    parser.add_argument('--words', type=int, default=10000)
+    parser.add_argument('--groups', type=int, default=20)
+    parser.add_argument('--sessions', type=int, default=5000)
+    parser.add_argument('--reviews', type=int, default=200000)
+    parser.add_argument('--requests', type=int, default=200, help="Requests per route")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--route', action='append', help="Only run this route (repeatable)")
+    parser.add_argument('--output', help="Write the results as JSON (e.g. to store a new baseline)")
+    parser.add_argument('--baseline', help="Results JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed p95 slowdown, as a fraction")
+    args = parser.parse_args()
+
+    temporary = args.database is None
+    if temporary:
+        db_fd, database = tempfile.mkstemp(suffix='.db')
+        os.close(db_fd)
+        os.unlink(database)
+        conn = sqlite3.connect(database)
+        conn.execute('PRAGMA journal_mode=WAL')
+        started = time.perf_counter()
+        generate(conn, args.words, args.groups, args.sessions, args.reviews)
+        conn.close()
+        print(f"Generated {args.words} words, {args.sessions} sessions and {args.reviews} reviews "
+              f"in {time.perf_counter() - started:.1f}s")
+    else:
+        database = args.database
+
+    try:
+        app = create_app({'DATABASE': database, 'RESPONSE_CACHE_ENABLED': False})
+        results = run_suite(app, database, args.requests, args.concurrency, only=args.route)
+        app.db.close_all()
+    finally:
+        if temporary:
+            for path in (database, database + '-wal', database + '-shm', database + '.migrate.lock'):
+                if os.path.exists(path):
+                    os.unlink(path)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump({
+                'dataset': {'words': args.words, 'groups': args.groups, 'sessions': args.sessions,
+                            'reviews': args.reviews} if temporary else {'database': database},
+                'requests_per_route': args.requests,
+                'concurrency': args.concurrency,
+                'routes': results,
+            }, file, indent=2)
+            file.write('\n')
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for name, (before, after) in regressions.items():
+            print(f"REGRESSION {name}: p95 {before:.2f} ms -> {after:.2f} ms")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
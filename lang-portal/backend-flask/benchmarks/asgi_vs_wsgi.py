@@ -0,0 +1,147 @@
+"""Compare the Flask (WSGI) and ASGI entry points under concurrent load.
+
+Both run in-process against the same seeded database, so the numbers
+measure request handling and SQLite contention rather than the network.
+The WSGI side uses one thread per in-flight request, like the threaded
+Flask server. The ASGI side runs AsgiAdapter on an event loop.
+
+    python benchmarks/asgi_vs_wsgi.py --requests 2000 --concurrency 32 --write-ratio 0.1
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from lib.asgi import AsgiAdapter
+
+READ_PATHS = (
+    '/api/words?page={n}',
+    '/api/groups/{group}/words?page=1',
+    '/api/groups/{group}/study_sessions',
+    '/api/dashboard/quick-stats',
+    '/api/study-sessions?page=1',
+)
+
+def build_app(database, read_pool_size):
+    app = create_app({
+        'DATABASE': database,
+        'DB_READ_POOL_SIZE': read_pool_size,
+        'RESPONSE_CACHE_ENABLED': False
+    })
+    with app.app_context():
+        app.db.init(app)
+    return app
+
+def workload(app, count, write_ratio, seed=1):
+    client = app.test_client()
+    session_ids = [
+        client.post('/api/study-sessions', json={'group_id': group, 'activity_id': 1}).get_json()['id']
+        for group in (1, 2, 3)
+    ]
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(count):
+        if rng.random() < write_ratio:
+            body = json.dumps({'reviews': [{'word_id': rng.randint(1, 90), 'is_correct': rng.random() < 0.7}]})
+            requests.append(('POST', f'/api/study-sessions/{rng.choice(session_ids)}/review', body.encode()))
+        else:
+            path = rng.choice(READ_PATHS).format(n=rng.randint(1, 2), group=rng.randint(1, 3))
+            requests.append(('GET', path, b''))
+    return requests
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def summarize(name, latencies, errors, elapsed):
+    print(
+        f"{name:5} {len(latencies) / elapsed:8.0f} req/s  "
+        f"p50 {percentile(latencies, 0.50) * 1000:6.1f} ms  "
+        f"p95 {percentile(latencies, 0.95) * 1000:6.1f} ms  "
+        f"errors {errors}"
+    )
+
+def run_wsgi(app, requests, concurrency):
+    def call(request):
+        method, path, body = request
+        start = time.perf_counter()
+        response = app.test_client().open(path, method=method, data=body, content_type='application/json')
+        return time.perf_counter() - start, response.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(call, requests))
+    elapsed = time.perf_counter() - start
+    summarize('wsgi', [latency for latency, _ in results], sum(status >= 500 for _, status in results), elapsed)
+
+async def asgi_call(adapter, method, path, body):
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'query_string': query.encode(),
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())],
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    status = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    await adapter(scope, receive, send)
+    return status[0]
+
+def run_asgi(app, requests, concurrency, read_workers):
+    adapter = AsgiAdapter(app, read_workers=read_workers)
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call(request):
+            async with semaphore:
+                start = time.perf_counter()
+                status = await asgi_call(adapter, *request)
+                return time.perf_counter() - start, status
+
+        return await asyncio.gather(*(call(request) for request in requests))
+
+    start = time.perf_counter()
+    results = asyncio.run(main())
+    elapsed = time.perf_counter() - start
+    adapter.shutdown()
+    summarize('asgi', [latency for latency, _ in results], sum(status >= 500 for _, status in results), elapsed)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--write-ratio', type=float, default=0.1)
+    parser.add_argument('--read-workers', type=int, default=5, help="ASGI reader threads and read pool size")
+    args = parser.parse_args()
+
+    db_fd, database = tempfile.mkstemp(suffix='.db')
+    try:
+        app = build_app(database, args.read_workers)
+        requests = workload(app, args.requests, args.write_ratio)
+        print(f"{args.requests} requests, concurrency {args.concurrency}, {args.write_ratio:.0%} writes")
+        run_wsgi(app, requests, args.concurrency)
+        run_asgi(app, requests, args.concurrency, args.read_workers)
+        app.db.close_all()
+    finally:
+        os.close(db_fd)
+        for path in (database, database + '-wal', database + '-shm', database + '.migrate.lock'):
+            if os.path.exists(path):
+                os.unlink(path)
+
+if __name__ == '__main__':
+    main()
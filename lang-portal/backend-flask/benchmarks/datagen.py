@@ -0,0 +1,137 @@
+"""Fill a database with synthetic words, groups, study sessions and reviews.
+
+The schema comes from the migrations and the rows go through the normal
+triggers, so the rollups, counters and search index are those the API
+would have built. The spaced repetition schedule is replayed at the end.
+
+    python benchmarks/datagen.py bench.db --words 100000 --sessions 50000 --reviews 2000000
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from lib.migrations import migrate
+from lib.scheduler import rebuild_schedule
+from lib.stats import rebuild_dashboard_stats
+
+# Rows per executemany call
+BATCH_SIZE = 10000
+
+ACTIVITIES = (
+    ('Flashcards', 'Review words using flashcards'),
+    ('Quiz', 'Test your knowledge with a quiz'),
+    ('Writing', 'Practice writing sentences'),
+)
+
+GENDERS = ('masculine', 'feminine')
+
+def _batches(rows, size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _insert(conn, sql, rows):
+    for batch in _batches(rows):
+        conn.executemany(sql, batch)
+    conn.commit()
+
+def _word_rows(count, rng):
+    for i in range(1, count + 1):
+        stem = f'mot{i}'
+        parts = {
+            'definite_article': 'le' if i % 2 else 'la',
+            'indefinite_article': 'un' if i % 2 else 'une',
+            'plural': stem + 's',
+        }
+        yield (i, stem, f'word{i}', rng.choice(GENDERS), json.dumps(parts))
+
+def _group_of(word_id, groups):
+    return (word_id - 1) % groups + 1
+
+def generate(conn, words=10000, groups=20, sessions=5000, reviews=200000, days=365, seed=1, schedule=True):
+    """Populate an empty database; returns the number of rows written per table.
+
+    Word i belongs to group ((i - 1) % groups) + 1, so every group has about
+    words / groups words. Sessions are spread over the last `days` days and
+    each session reviews words of its own group.
+    """
+    rng = random.Random(seed)
+    migrate(conn)
+
+    conn.executemany('INSERT INTO study_activities (name, description) VALUES (?, ?)', ACTIVITIES)
+    _insert(conn, 'INSERT INTO groups (id, name, description) VALUES (?, ?, ?)',
+            ((i, f'Group {i}', f'Synthetic group {i}') for i in range(1, groups + 1)))
+    _insert(conn, 'INSERT INTO words (id, french, english, gender, parts) VALUES (?, ?, ?, ?, ?)',
+            _word_rows(words, rng))
+    _insert(conn, 'INSERT INTO word_groups (word_id, group_id) VALUES (?, ?)',
+            ((i, _group_of(i, groups)) for i in range(1, words + 1)))
+
+    start = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=days)
+    session_rows = []
+    for i in range(1, sessions + 1):
+        started = start + timedelta(seconds=i * days * 86400 // max(sessions, 1))
+        session_rows.append((i, rng.randint(1, groups), rng.randint(1, len(ACTIVITIES)), started,
+                             started + timedelta(minutes=rng.randint(5, 30))))
+    _insert(conn, 'INSERT INTO study_sessions (id, group_id, activity_id, start_time, end_time) VALUES (?, ?, ?, ?, ?)',
+            ((i, group, activity, started.strftime('%Y-%m-%d %H:%M:%S'), ended.strftime('%Y-%m-%d %H:%M:%S'))
+             for i, group, activity, started, ended in session_rows))
+
+    def review_rows():
+        # Words of group g are g, g + groups, g + 2 * groups, ...
+        words_per_group = max(1, words // groups)
+        for n in range(reviews):
+            session_id, group, _, started, _ = session_rows[n * sessions // reviews]
+            word_id = min(words, group + groups * rng.randrange(words_per_group))
+            reviewed_at = started + timedelta(seconds=n % 600)
+            yield (session_id, word_id, 1 if rng.random() < 0.75 else 0, reviewed_at.strftime('%Y-%m-%d %H:%M:%S'))
+
+    if sessions:
+        _insert(conn, 'INSERT INTO word_review_items (session_id, word_id, is_correct, created_at) VALUES (?, ?, ?, ?)',
+                review_rows())
+    # The triggers keep the rollups current; this also sets the totals the
+    # triggers only adjust (dashboard_stats starts empty on a new database)
+    rebuild_dashboard_stats(conn)
+    if schedule:
+        rebuild_schedule(conn)
+    conn.execute('ANALYZE')
+    conn.commit()
+    return {'groups': groups, 'words': words, 'study_sessions': sessions, 'word_review_items': reviews if sessions else 0}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('database', help="SQLite file to create (must not exist)")
+    parser.add_argument('--words', type=int, default=10000)
+    parser.add_argument('--groups', type=int, default=20)
+    parser.add_argument('--sessions', type=int, default=5000)
+    parser.add_argument('--reviews', type=int, default=200000)
+    parser.add_argument('--days', type=int, default=365, help="History length the sessions are spread over")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--no-schedule', action='store_true', help="Skip replaying reviews into word_schedule")
+    args = parser.parse_args()
+
+    if os.path.exists(args.database):
+        parser.error(f"{args.database} already exists")
+    conn = sqlite3.connect(args.database)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    started = time.perf_counter()
+    counts = generate(conn, args.words, args.groups, args.sessions, args.reviews, args.days, args.seed,
+                      schedule=not args.no_schedule)
+    conn.close()
+    print(f"Generated {', '.join(f'{count} {table}' for table, count in counts.items())} "
+          f"in {time.perf_counter() - started:.1f}s")
+
+if __name__ == '__main__':
+    main()
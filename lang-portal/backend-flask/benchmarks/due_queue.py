@@ -0,0 +1,91 @@
+"""Time GET /api/groups/<id>/due's queries on a large review history.
+
+Builds a temporary database with --words words in one group, submits
+--reviews answers through the normal ingestion path (which keeps the
+schedule up to date), then times due_words() for a batch of --limit words.
+
+    python benchmarks/due_queue.py --words 20000 --reviews 1000000
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from lib.migrations import migrate
+from lib.reviews import ingest_reviews
+from lib.scheduler import due_words
+
+def populate(conn, words, reviews, seed=1):
+    rng = random.Random(seed)
+    conn.execute("INSERT INTO groups (name) VALUES ('Benchmark')")
+    conn.executemany(
+        "INSERT INTO words (id, french, english, gender, parts) VALUES (?, ?, ?, 'masculine', ?)",
+        [(i, f'mot{i}', f'word{i}', json.dumps({'plural': f'mots{i}'})) for i in range(1, words + 1)]
+    )
+    conn.executemany('INSERT INTO word_groups (word_id, group_id) VALUES (?, 1)', [(i,) for i in range(1, words + 1)])
+    conn.execute("INSERT INTO study_activities (name) VALUES ('Benchmark')")
+    conn.commit()
+
+    # Reviews spread over the last year, submitted one session at a time
+    start = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=365)
+    per_session = 1000
+    for offset in range(0, reviews, per_session):
+        session_start = start + timedelta(seconds=offset * 365 * 86400 // reviews)
+        cursor = conn.execute(
+            'INSERT INTO study_sessions (group_id, activity_id, start_time) VALUES (1, 1, ?)',
+            (session_start.strftime('%Y-%m-%d %H:%M:%S'),)
+        )
+        conn.commit()
+        ingest_reviews(conn, cursor.lastrowid, ({
+            'word_id': rng.randint(1, words),
+            'is_correct': rng.random() < 0.75,
+            'created_at': (session_start + timedelta(seconds=i)).strftime('%Y-%m-%d %H:%M:%S')
+        } for i in range(min(per_session, reviews - offset))))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--words', type=int, default=20000)
+    parser.add_argument('--reviews', type=int, default=1000000)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--runs', type=int, default=1000)
+    args = parser.parse_args()
+
+    db_fd, database = tempfile.mkstemp(suffix='.db')
+    try:
+        conn = sqlite3.connect(database)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        migrate(conn)
+
+        start = time.perf_counter()
+        populate(conn, args.words, args.reviews)
+        elapsed = time.perf_counter() - start
+        print(f"Ingested {args.reviews} reviews of {args.words} words in {elapsed:.1f}s "
+              f"({args.reviews / elapsed:.0f} reviews/s)")
+
+        cursor = conn.cursor()
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            rows = due_words(cursor, 1, args.limit)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(f"due_words(limit={args.limit}) returned {len(rows)} words: "
+              f"p50 {timings[len(timings) // 2] * 1000:.3f} ms, "
+              f"p99 {timings[int(len(timings) * 0.99)] * 1000:.3f} ms")
+        conn.close()
+    finally:
+        os.close(db_fd)
+        for path in (database, database + '-wal', database + '-shm', database + '.migrate.lock'):
+            if os.path.exists(path):
+                os.unlink(path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from lib.db import READ_METHODS
+
+class AsgiAdapter:
+    """Serves the Flask app to an ASGI server such as uvicorn.
+
+    The routes stay synchronous: each request runs on a thread so the event
+    loop never waits on SQLite. Reads (GET/HEAD) share a pool of
+    read_workers threads, sized to match the read-only connection pool.
+    Every other method is queued on a single writer thread. SQLite allows one
+    writer at a time anyway, so writes wait in this queue rather than
+    spinning on busy_timeout. Read responses are streamed back chunk by
+    chunk, with the reader thread waiting for each chunk to be sent. Write
+    responses are collected on the writer thread and sent once it is free
+    again, so a slow client never holds up the next write. A request whose
+    client disconnects before the body is complete is dropped.
+    """
+
+    def __init__(self, wsgi_app, read_workers=5):
+        self.wsgi_app = wsgi_app
+        self.read_workers = read_workers
+        self.readers = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix='sqlite-read')
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite-write')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+        body = await self._read_body(receive)
+        if body is None:
+            return
+        loop = asyncio.get_running_loop()
+        if scope['method'] in READ_METHODS:
+            await loop.run_in_executor(self.readers, self._stream, scope, body, send, loop)
+            return
+        status, headers, content = await loop.run_in_executor(self.writer, self._collect, scope, body)
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': content, 'more_body': False})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def shutdown(self):
+        self.readers.shutdown(wait=True)
+        self.writer.shutdown(wait=True)
+
+    async def _read_body(self, receive):
+        """The whole request body, or None if the client went away first"""
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body', False):
+                break
+        return b''.join(chunks)
+
+    def _start(self, scope, body):
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers
+            ]
+
+        return response, self.wsgi_app(build_environ(scope, body), start_response)
+
+    def _collect(self, scope, body):
+        """Run the app to completion and return (status, headers, body)"""
+        response, result = self._start(scope, body)
+        try:
+            content = b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return response['status'], response['headers'], content
+
+    def _stream(self, scope, body, send, loop):
+        def send_sync(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        def send_start():
+            send_sync({
+                'type': 'http.response.start',
+                'status': response['status'],
+                'headers': response['headers']
+            })
+
+        response, result = self._start(scope, body)
+        started = False
+        try:
+            for chunk in result:
+                if not chunk:
+                    continue
+                if not started:
+                    send_start()
+                    started = True
+                send_sync({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        if not started:
+            send_start()
+        send_sync({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+def build_environ(scope, body):
+    """The PEP 3333 environ for an ASGI http scope"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.input_terminated': True,  # the whole body is buffered
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1')
+        value = value.decode('latin-1')
+        if name == 'content-type':
+            key = 'CONTENT_TYPE'
+        elif name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        if key in environ:
+            value = environ[key] + ',' + value
+        environ[key] = value
+    return environ
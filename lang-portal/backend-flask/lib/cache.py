@@ -0,0 +1,190 @@
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from flask import request, make_response
+
+class LRUCache:
+    """Thread-safe LRU cache whose entries also expire after ttl seconds"""
+
+    def __init__(self, max_entries=512, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class FileStore:
+    """Cache entries and tag versions in a local directory shared by worker processes"""
+
+    def __init__(self, directory, ttl=60):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _write(self, name, data):
+        # Write to a temp file and rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump(data, file)
+        os.replace(tmp_path, self._path(name))
+
+    def _read(self, name):
+        try:
+            with open(self._path(name), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, key):
+        entry = self._read(hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json')
+        if entry is None or entry['expires_at'] < time.time():
+            return None
+        return entry['value']
+
+    def set(self, key, value):
+        self._write(hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json', {
+            'expires_at': time.time() + self.ttl,
+            'value': value
+        })
+
+    def get_version(self, tag):
+        return self._read(f'tag-{tag}.version') or 0
+
+    def bump_version(self, tag):
+        # A timestamp rather than a counter, so concurrent bumps cannot collide
+        self._write(f'tag-{tag}.version', time.time_ns())
+
+class ResponseCache:
+    """Caches JSON responses of read-only routes, keyed by path and query args.
+
+    Each cached route declares the data it depends on as tags ('words',
+    'groups', ...). Writers call invalidate() with the tags they touched,
+    which bumps the tag versions that are part of every cache key, so stale
+    entries are never served again and simply age out. Responses carry an
+    ETag and answer If-None-Match with 304. With a FileStore, entries and
+    tag versions are shared between worker processes.
+    """
+
+    def __init__(self, max_entries=512, ttl=60, store=None, enabled=True):
+        self.local = LRUCache(max_entries=max_entries, ttl=ttl)
+        self.store = store
+        self.enabled = enabled
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        # Db.notify_change() is called by writers such as the word importer
+        app.db.change_listeners.append(self.invalidate)
+
+    def _version(self, tag):
+        if self.store is not None:
+            return self.store.get_version(tag)
+        return self._versions.get(tag, 0)
+
+    def invalidate(self, *tags):
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+        if self.store is not None:
+            for tag in tags:
+                self.store.bump_version(tag)
+
+    def clear(self):
+        self.local.clear()
+
+    def _key(self, tags):
+        args = sorted(request.args.items(multi=True))
+        versions = [(tag, self._version(tag)) for tag in tags]
+        return json.dumps([request.path, args, versions], ensure_ascii=False)
+
+    def _lookup(self, key):
+        entry = self.local.get(key)
+        if entry is None and self.store is not None:
+            entry = self.store.get(key)
+            if entry is not None:
+                self.local.set(key, entry)
+        return entry
+
+    def _store(self, key, entry):
+        self.local.set(key, entry)
+        if self.store is not None:
+            self.store.set(key, entry)
+
+    def cached(self, *tags):
+        """Decorator for GET views whose output only depends on the given tags"""
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or request.method != 'GET':
+                    return view(*args, **kwargs)
+
+                key = self._key(tags)
+                entry = self._lookup(key)
+                if entry is not None:
+                    self.hits += 1
+                    response = make_response(entry['body'], entry['status'])
+                    response.mimetype = entry['mimetype']
+                    response.set_etag(entry['etag'])
+                else:
+                    self.misses += 1
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.direct_passthrough:
+                        return response
+                    body = response.get_data(as_text=True)
+                    etag = hashlib.sha1(response.get_data()).hexdigest()
+                    response.set_etag(etag)
+                    self._store(key, {
+                        'body': body,
+                        'status': response.status_code,
+                        'mimetype': response.mimetype,
+                        'etag': etag
+                    })
+
+                # Clients must revalidate, but get a 304 while the data is unchanged
+                response.headers['Cache-Control'] = 'no-cache'
+                return response.make_conditional(request)
+            return wrapper
+        return decorator
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'entries': len(self.local),
+            'hits': self.hits,
+            'misses': self.misses
+        }
@@ -1,30 +1,241 @@
 import sqlite3
 import json
-from flask import g
+import queue
+import threading
+import time
+from flask import g, has_request_context, request
+
+from lib.importer import import_words
+from lib.migrations import migrate
+
+# Pragmas applied to every pooled connection. WAL lets readers keep going while
+# a review is being written; NORMAL sync is safe under WAL and avoids an fsync
+# per commit. cache_size is negative so it is read as KiB (16 MB per connection).
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'foreign_keys': 'ON',
+    'cache_size': -16000,
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,
+}
+
+# Requests with these methods are served from the read-only pool
+READ_METHODS = ('GET', 'HEAD')
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection became free within the timeout"""
+
+class ConnectionPool:
+    """Bounded pool of sqlite3 connections shared by the request threads"""
+
+    def __init__(self, database, size=5, timeout=5.0, pragmas=None, readonly=False, on_connect=None,
+                 factory=sqlite3.Connection):
+        self.database = database
+        self.size = size
+        self.timeout = timeout
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self.readonly = readonly
+        # Callables run on every new connection (e.g. to install trace callbacks)
+        self.on_connect = on_connect if on_connect is not None else []
+        # sqlite3.Connection subclass new connections are opened as
+        self.factory = factory
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._checked_out = set()
+        # Checked out when close_all ran; closed instead of re-queued on release
+        self._stale = set()
+        self._created = 0
+        self._in_use = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.database, check_same_thread=False, factory=self.factory)
+        for name, value in self.pragmas.items():
+            # WAL is persistent in the database file; switching needs a write lock
+            if self.readonly and name == 'journal_mode':
+                continue
+            conn.execute(f"PRAGMA {name} = {value}")
+        if self.readonly:
+            conn.execute("PRAGMA query_only = ON")
+        # Return rows as dictionaries
+        conn.row_factory = sqlite3.Row
+        for hook in self.on_connect:
+            hook(conn)
+        return conn
+
+    def acquire(self):
+        """Check out a connection, opening a new one while under the size limit"""
+        start = time.perf_counter()
+        conn = None
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._created < self.size
+                if can_open:
+                    self._created += 1
+            if can_open:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"No connection to {self.database} available after {self.timeout}s "
+                        f"(pool size {self.size})"
+                    )
+
+        waited = time.perf_counter() - start
+        with self._lock:
+            self._checked_out.add(conn)
+            self._in_use += 1
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return conn
+
+    def release(self, conn):
+        """Return a connection to the pool, discarding it if it is unusable or close_all ran"""
+        with self._lock:
+            self._in_use -= 1
+            self._checked_out.discard(conn)
+            stale = conn in self._stale
+            self._stale.discard(conn)
+        if stale:
+            with self._lock:
+                self._created -= 1
+            conn.close()
+            return
+        try:
+            # Never hand an open transaction to the next request
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            with self._lock:
+                self._created -= 1
+            conn.close()
+            return
+        self._idle.put(conn)
+
+    def close_all(self):
+        """Close every idle connection; checked-out ones are closed on release"""
+        with self._lock:
+            self._stale.update(self._checked_out)
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': self.size,
+                'open': self._created,
+                'in_use': self._in_use,
+                'idle': self._created - self._in_use,
+                'checkouts': self._checkouts,
+                'timeouts': self._timeouts,
+                'wait_avg_ms': round(self._wait_total / self._checkouts * 1000, 3) if self._checkouts else 0.0,
+                'wait_max_ms': round(self._wait_max * 1000, 3),
+            }
 
 class Db:
-    def __init__(self, database='words.db'):
+    def __init__(self, database='words.db', pool_size=5, read_pool_size=5, pool_timeout=5.0, pragmas=None):
         self.database = database
+        self.connect_hooks = [self._install_trace]
+        # Called with the text of every statement run on a pooled connection.
+        # A connection has a single trace callback, so it is shared through this list.
+        self.trace_hooks = []
+        # Called with the names of the tables a write touched (e.g. to drop cached responses)
+        self.change_listeners = []
+        self.pool = ConnectionPool(database, size=pool_size, timeout=pool_timeout, pragmas=pragmas,
+                                   on_connect=self.connect_hooks)
+        # An in-memory database is private to its connection, so it cannot have readers
+        self.read_pool = None
+        if database != ':memory:' and read_pool_size > 0:
+            self.read_pool = ConnectionPool(database, size=read_pool_size, timeout=pool_timeout,
+                                            pragmas=pragmas, readonly=True, on_connect=self.connect_hooks)
+
+    def set_connection_factory(self, factory):
+        """Open new pooled connections as factory, a sqlite3.Connection subclass"""
+        self.pool.factory = factory
+        if self.read_pool is not None:
+            self.read_pool.factory = factory
+
+    def _install_trace(self, conn):
+        conn.set_trace_callback(self._trace)
+
+    def _trace(self, statement):
+        for hook in self.trace_hooks:
+            hook(statement)
 
     def get(self):
         if 'db' not in g:
-            g.db = sqlite3.connect(self.database)
-            # Enable foreign key support
-            g.db.execute("PRAGMA foreign_keys = ON")
-            # Return rows as dictionaries
-            g.db.row_factory = sqlite3.Row
+            g.db = self.pool.acquire()
         return g.db
 
+    def get_readonly(self):
+        """Read-only connection for the current context (the writer if there is no read pool)"""
+        if self.read_pool is None:
+            return self.get()
+        if 'db_ro' not in g:
+            g.db_ro = self.read_pool.acquire()
+        return g.db_ro
+
+    def _for_request(self):
+        # GET routes never write, so they stay off the writer connections
+        if has_request_context() and request.method in READ_METHODS and 'db' not in g:
+            return self.get_readonly()
+        return self.get()
+
     def commit(self):
         self.get().commit()
 
+    def rollback(self):
+        if 'db' in g:
+            g.db.rollback()
+
     def cursor(self):
-        return self.get().cursor()
+        return self._for_request().cursor()
 
     def close(self):
         db = g.pop('db', None)
         if db is not None:
-            db.close()
+            self.pool.release(db)
+        db_ro = g.pop('db_ro', None)
+        if db_ro is not None:
+            self.read_pool.release(db_ro)
+
+    def close_all(self):
+        self.pool.close_all()
+        if self.read_pool is not None:
+            self.read_pool.close_all()
+
+    def notify_change(self, *tags):
+        for listener in self.change_listeners:
+            listener(*tags)
+
+    def pool_stats(self):
+        stats = {'writer': self.pool.stats()}
+        if self.read_pool is not None:
+            stats['reader'] = self.read_pool.stats()
+        return stats
 
     def sql(self, filepath):
         try:
@@ -65,50 +276,15 @@ class Db:
 
     def import_word_json(self, cursor, group_name, data_json_path):
         """Import words from a JSON file into the database"""
-        # Create group if it doesn't exist
-        cursor.execute('''
-            INSERT OR IGNORE INTO groups (name)
-            VALUES (?)
-        ''', (group_name,))
-        
-        # Get group id
-        cursor.execute('SELECT id FROM groups WHERE name = ?', (group_name,))
-        group_id = cursor.fetchone()['id']
-        
-        # Import words from JSON
-        words = self.load_json(data_json_path)
-        for word in words:
-            # Insert word (use 'none' as default gender for verbs)
-            cursor.execute('''
-                INSERT INTO words (french, english, gender, parts)
-                VALUES (?, ?, ?, ?)
-            ''', (word['french'], word['english'], word.get('gender', 'none'), json.dumps(word['parts']),))
-            
-            # Get word id
-            word_id = cursor.lastrowid
-            
-            # Add word to group
-            cursor.execute('''
-                INSERT INTO word_groups (word_id, group_id)
-                VALUES (?, ?)
-            ''', (word_id, group_id))
-        self.get().commit()
-
-        # Update the words_count in the groups table by counting all words in the group
-        cursor.execute('''
-          UPDATE groups
-          SET words_count = (
-            SELECT COUNT(*) FROM word_groups WHERE group_id = ?
-          )
-          WHERE id = ?
-        ''', (group_id, group_id))
-
-        self.get().commit()
-
-        print(f"Successfully added {len(words)} verbs to the '{group_name}' group.")
+        stats = import_words(cursor.connection, data_json_path, group_name=group_name)
+        self.notify_change('words', 'groups')
+        print(
+            f"Successfully added {stats['inserted']} words to the '{group_name}' group "
+            f"({stats['duplicates']} duplicates skipped, {stats['rows_per_sec']} rows/sec)."
+        )
 
     def init(self, app):
-        """Initialize the database by running all SQL setup files"""
+        """Rebuild the database from scratch: setup files, migrations and seed words"""
         cursor = self.cursor()
         
         # Temporarily disable foreign key constraints while dropping tables
@@ -118,11 +294,17 @@ class Db:
         cursor.executescript('''
             DROP TABLE IF EXISTS word_review_items;
             DROP TABLE IF EXISTS word_reviews;
+            DROP TABLE IF EXISTS dashboard_stats;
+            DROP TABLE IF EXISTS daily_review_stats;
+            DROP TABLE IF EXISTS word_schedule;
             DROP TABLE IF EXISTS word_groups;
+            DROP TABLE IF EXISTS group_words;
             DROP TABLE IF EXISTS study_sessions;
             DROP TABLE IF EXISTS study_activities;
+            DROP TABLE IF EXISTS words_fts;
             DROP TABLE IF EXISTS words;
             DROP TABLE IF EXISTS groups;
+            DROP TABLE IF EXISTS schema_migrations;
         ''')
         
         # Re-enable foreign key constraints
@@ -133,8 +315,7 @@ class Db:
             'setup/create_table_groups.sql',  # Create groups first
             'setup/create_table_words.sql',
             'setup/create_table_word_groups.sql',
-            'setup/create_table_word_reviews.sql',
-            'setup/create_word_reviews.sql'
+            'setup/create_table_word_reviews.sql'
         ]
         
         for file in setup_files:
@@ -143,16 +324,9 @@ class Db:
                 cursor.executescript(sql)
                 print(f"Executed {file}")
         
-        # Run migrations in correct order
-        migration_files = [
-            'migrations/003_update_study_activities.sql',  # This creates study_activities, study_sessions, and word_review_items
-        ]
-        
-        for file in migration_files:
-            sql = self.sql(file)
-            if sql:
-                cursor.executescript(sql)
-                print(f"Executed {file}")
+        # Then every migration, recorded in the fresh schema_migrations table
+        for name in migrate(self.get()):
+            print(f"Executed migrations/{name}")
         
         # Import seed data
         self.import_word_json(
@@ -175,5 +349,9 @@ class Db:
         
         self.get().commit()
 
+        # The tables were rebuilt, so any cached schema is stale
+        if getattr(app, 'schema', None) is not None:
+            app.schema.refresh(self.get())
+
 # Create an instance of the Db class
 db = Db()
@@ -0,0 +1,123 @@
+import csv
+import io
+import json
+
+from lib.words import Word, WORD_FIELDS
+
+# Rows fetched from SQLite per chunk of output
+DEFAULT_BATCH_SIZE = 1000
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+class InvalidExportError(ValueError):
+    """Raised for an unknown dataset or format, or a since= on a dataset without timestamps"""
+
+class Dataset:
+    """A table that can be exported in id order.
+
+    timestamp is the column since= filters on; with since= the rows come in
+    (timestamp, id) order instead, which an index on the timestamp column
+    provides without sorting. after_id then resumes after that row's
+    (timestamp, id), so it must be a row an earlier export returned.
+    """
+
+    def __init__(self, table, columns, timestamp=None, to_dict=None, fields=None):
+        self.table = table
+        self.columns = columns
+        self.timestamp = timestamp
+        self.to_dict = to_dict or (lambda row: {column: row[column] for column in columns})
+        # Keys of to_dict(), in CSV column order
+        self.fields = fields or columns
+
+    def query(self, since=None, after_id=None):
+        conditions = []
+        params = []
+        order = 'id'
+        if since is not None:
+            if self.timestamp is None:
+                raise InvalidExportError(f"{self.table} has no timestamp to filter on; use after_id=")
+            conditions.append(f'{self.timestamp} >= ?')
+            params.append(since)
+            order = f'{self.timestamp}, id'
+            if after_id is not None:
+                # Rows come in (timestamp, id) order, so an older row with a
+                # higher id may still be ahead of after_id
+                conditions.append(
+                    f'({self.timestamp}, id) > ((SELECT {self.timestamp} FROM {self.table} WHERE id = ?), ?)'
+                )
+                params.extend([after_id, after_id])
+        elif after_id is not None:
+            conditions.append('id > ?')
+            params.append(after_id)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        return f"SELECT {', '.join(self.columns)} FROM {self.table} {where} ORDER BY {order}", params
+
+def _word_to_dict(row):
+    return Word.from_row(row).to_dict()
+
+DATASETS = {
+    'words': Dataset('words', ('id', 'french', 'english', 'gender', 'parts'),
+                     to_dict=_word_to_dict, fields=WORD_FIELDS),
+    'groups': Dataset('groups', ('id', 'name', 'description', 'words_count')),
+    'study-sessions': Dataset('study_sessions', ('id', 'group_id', 'activity_id', 'start_time', 'end_time'),
+                              timestamp='start_time'),
+    'review-items': Dataset('word_review_items', ('id', 'session_id', 'word_id', 'is_correct', 'created_at'),
+                            timestamp='created_at'),
+}
+
+def get_dataset(name):
+    if name not in DATASETS:
+        raise InvalidExportError(f"Unknown dataset '{name}'. Available: {', '.join(DATASETS)}")
+    return DATASETS[name]
+
+def iter_rows(conn, dataset, since=None, after_id=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Yield lists of at most batch_size rows, read with fetchmany"""
+    sql, params = dataset.query(since, after_id)
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+def _drain(buffer):
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return text
+
+def _csv_value(value):
+    # Word parts are nested objects; keep them as JSON in a single cell
+    return json.dumps(value, ensure_ascii=False) if isinstance(value, dict) else value
+
+def export_chunks(conn, dataset, fmt='ndjson', since=None, after_id=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Yield the export as text chunks, one per batch of rows.
+
+    Memory stays bounded by batch_size however large the table is. The
+    query is built before the first chunk, so invalid arguments raise
+    InvalidExportError before anything is sent.
+    """
+    if fmt not in FORMATS:
+        raise InvalidExportError(f"Unknown format '{fmt}'. Available: {', '.join(FORMATS)}")
+    dataset.query(since, after_id)
+
+    def generate():
+        if fmt == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(dataset.fields)
+            yield _drain(buffer)
+            for rows in iter_rows(conn, dataset, since, after_id, batch_size):
+                for row in rows:
+                    data = dataset.to_dict(row)
+                    writer.writerow([_csv_value(data[field]) for field in dataset.fields])
+                yield _drain(buffer)
+        else:
+            for rows in iter_rows(conn, dataset, since, after_id, batch_size):
+                yield ''.join(json.dumps(dataset.to_dict(row), ensure_ascii=False) + '\n' for row in rows)
+
+    return generate()
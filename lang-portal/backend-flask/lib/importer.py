@@ -0,0 +1,157 @@
+import json
+import time
+
+# Rows handed to each executemany call
+DEFAULT_BATCH_SIZE = 1000
+
+def iter_json_array(filepath, chunk_size=64 * 1024):
+    """Yield the items of a top-level JSON array without loading the whole file"""
+    decoder = json.JSONDecoder()
+    with open(filepath, 'r', encoding='utf-8') as file:
+        buffer = ''
+        pos = 0
+        eof = False
+        started = False
+
+        while True:
+            # Skip whitespace and separators between items
+            while pos < len(buffer) and (buffer[pos].isspace() or (started and buffer[pos] == ',')):
+                pos += 1
+
+            if pos >= len(buffer):
+                if eof:
+                    raise ValueError(f"Unexpected end of JSON array in {filepath}")
+                chunk = file.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+
+            if not started:
+                if buffer[pos] != '[':
+                    raise ValueError(f"Expected a JSON array in {filepath}")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == ']':
+                return
+
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+                # A scalar ending exactly at the buffer edge may continue in the next chunk
+                complete = end < len(buffer) or eof
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+            if not complete:
+                chunk = file.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            yield item
+            pos = end
+
+def _batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _get_or_create_group(cursor, group_name):
+    cursor.execute('SELECT id FROM groups WHERE name = ?', (group_name,))
+    group = cursor.fetchone()
+    if group:
+        return group[0]
+    cursor.execute('INSERT INTO groups (name) VALUES (?)', (group_name,))
+    return cursor.lastrowid
+
+# (french, english) pairs per id lookup, two bound parameters each
+LOOKUP_CHUNK = 250
+
+def _word_ids(cursor, keys):
+    """Map (french, english) pairs to their word ids, through the unique index on the pair"""
+    ids = {}
+    keys = list(keys)
+    for start in range(0, len(keys), LOOKUP_CHUNK):
+        chunk = keys[start:start + LOOKUP_CHUNK]
+        cursor.execute(
+            f"SELECT id, french, english FROM words WHERE (french, english) IN "
+            f"(VALUES {', '.join(['(?, ?)'] * len(chunk))})",
+            [value for key in chunk for value in key]
+        )
+        ids.update({(row[1], row[2]): row[0] for row in cursor.fetchall()})
+    return ids
+
+def import_words(conn, data_json_path, group_name=None, gender=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Bulk import words from a JSON array file in a single transaction.
+
+    Words that already exist with the same (french, english) pair are not
+    inserted again, but are still added to the group. When gender is given it
+    overrides the value in the file, otherwise 'none' is used for entries
+    without one (verbs). Duplicates are skipped by the unique index on the
+    pair, so memory use depends on batch_size, not on the size of the table.
+    Returns a dict of import statistics.
+    """
+    start = time.perf_counter()
+    cursor = conn.cursor()
+
+    # Take the write lock up front, so no other writer adds a word between a
+    # batch's insert and its id lookup
+    owns_transaction = not conn.in_transaction
+    if owns_transaction:
+        cursor.execute('BEGIN IMMEDIATE')
+
+    try:
+        group_id = _get_or_create_group(cursor, group_name) if group_name else None
+        stats = {'read': 0, 'inserted': 0, 'duplicates': 0, 'grouped': 0}
+
+        for batch in _batches(iter_json_array(data_json_path), batch_size):
+            # The first copy of a pair within the batch wins, as it would across batches
+            word_rows = {}
+            for word in batch:
+                key = (word['french'], word['english'])
+                if key not in word_rows:
+                    word_rows[key] = (
+                        word['french'],
+                        word['english'],
+                        gender or word.get('gender', 'none'),
+                        json.dumps(word['parts'])
+                    )
+
+            cursor.executemany('''
+                INSERT INTO words (french, english, gender, parts)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (french, english) DO NOTHING
+            ''', list(word_rows.values()))
+            inserted = cursor.rowcount
+            stats['read'] += len(batch)
+            stats['inserted'] += inserted
+            stats['duplicates'] += len(batch) - inserted
+
+            if group_id is not None:
+                word_ids = _word_ids(cursor, word_rows)
+                cursor.executemany('''
+                    INSERT INTO word_groups (word_id, group_id)
+                    SELECT ?, ?
+                    WHERE NOT EXISTS (SELECT 1 FROM word_groups WHERE word_id = ? AND group_id = ?)
+                ''', [(word_id, group_id, word_id, group_id) for word_id in word_ids.values()])
+                stats['grouped'] += cursor.rowcount
+
+        if owns_transaction:
+            conn.commit()
+    except Exception:
+        if owns_transaction:
+            conn.rollback()
+        raise
+
+    elapsed = time.perf_counter() - start
+    stats['group_id'] = group_id
+    stats['seconds'] = round(elapsed, 3)
+    stats['rows_per_sec'] = round(stats['read'] / elapsed) if elapsed > 0 else 0
+    return stats
@@ -0,0 +1,87 @@
+from datetime import datetime
+
+from lib.words import Word
+
+# Words sent with a launch bundle unless ?limit= asks for another number
+DEFAULT_WORDS_LIMIT = 500
+MAX_WORDS_LIMIT = 5000
+
+# A session of the same group and activity started this recently is resumed
+# instead of opening a new one (the same window as GET /api/study-sessions?active=true).
+# Sessions store local start times, so the window is measured in local time too.
+RESUME_WINDOW = '-1 day'
+
+class LaunchNotFoundError(LookupError):
+    """Raised when the activity or the group of a launch does not exist"""
+
+def _activity(cursor, activity_id):
+    cursor.execute('SELECT id, name, url, preview_url FROM study_activities WHERE id = ?', (activity_id,))
+    activity = cursor.fetchone()
+    if not activity:
+        raise LaunchNotFoundError('Activity not found')
+    return {
+        'id': activity['id'],
+        'title': activity['name'],
+        'launch_url': activity['url'],
+        'preview_url': activity['preview_url']
+    }
+
+def launch_bundle(cursor, activity_id, group_id=None, fields=None, limit=DEFAULT_WORDS_LIMIT):
+    """Everything a study activity needs to start, as one dict.
+
+    Always has the activity and every group with its word count; with a
+    group_id also the group and up to limit of its words (projected to
+    fields). Run it inside one transaction so the parts are consistent.
+    """
+    bundle = {'activity': _activity(cursor, activity_id)}
+
+    cursor.execute('SELECT id, name, words_count FROM groups ORDER BY id')
+    bundle['groups'] = [
+        {'id': group['id'], 'name': group['name'], 'words_count': group['words_count']}
+        for group in cursor.fetchall()
+    ]
+    if group_id is None:
+        return bundle
+
+    group = next((group for group in bundle['groups'] if group['id'] == group_id), None)
+    if group is None:
+        raise LaunchNotFoundError('Group not found')
+    bundle['group'] = group
+
+    # A range scan of idx_word_groups_group_word, in word id order
+    cursor.execute('''
+        SELECT w.id, w.french, w.english, w.gender, w.parts
+        FROM word_groups wg
+        JOIN words w ON w.id = wg.word_id
+        WHERE wg.group_id = ?
+        ORDER BY wg.word_id
+        LIMIT ?
+    ''', (group_id, limit))
+    bundle['words'] = [Word.from_row(word).to_dict(fields) for word in cursor.fetchall()]
+    bundle['words_truncated'] = group['words_count'] > len(bundle['words'])
+    return bundle
+
+def resume_or_create_session(cursor, group_id, activity_id):
+    """The latest recent session of this group and activity, or a new one.
+
+    Returns (session, created). Call it inside a write transaction so two
+    launches cannot both decide to create a session.
+    """
+    cursor.execute(f'''
+        SELECT id, start_time
+        FROM study_sessions
+        WHERE group_id = ? AND activity_id = ?
+          AND start_time >= datetime('now', 'localtime', '{RESUME_WINDOW}')
+        ORDER BY start_time DESC, id DESC
+        LIMIT 1
+    ''', (group_id, activity_id))
+    session = cursor.fetchone()
+    if session:
+        return {'id': session['id'], 'start_time': session['start_time'], 'resumed': True}, False
+
+    start_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    cursor.execute('''
+        INSERT INTO study_sessions (group_id, activity_id, start_time)
+        VALUES (?, ?, ?)
+    ''', (group_id, activity_id, start_time))
+    return {'id': cursor.lastrowid, 'start_time': start_time, 'resumed': False}, True
@@ -0,0 +1,215 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: BEGIN IMMEDIATE still serializes the runners
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sql', 'migrations')
+
+# Databases created before schema_migrations existed already hold the tables
+# of these versions; 003 drops the study tables, so it must not run again
+LEGACY_BASELINE = 3
+
+_FILENAME = re.compile(r'^(\d+)_.+\.sql$')
+
+class MigrationError(Exception):
+    """Raised when a migration file fails; nothing from the run is kept"""
+
+class Migration:
+    """One sql/migrations/NNN_name.sql file"""
+
+    def __init__(self, version, name, path):
+        self.version = version
+        self.name = name
+        self.path = path
+
+    def read(self):
+        with open(self.path, 'r', encoding='utf-8') as file:
+            return file.read()
+
+    def __repr__(self):
+        return f'Migration({self.name!r})'
+
+def discover(directory=MIGRATIONS_DIR):
+    """List the migration files in a directory, ordered by version"""
+    migrations = []
+    for filename in os.listdir(directory):
+        match = _FILENAME.match(filename)
+        if match:
+            migrations.append(Migration(int(match.group(1)), filename, os.path.join(directory, filename)))
+    migrations.sort(key=lambda migration: migration.version)
+    versions = [migration.version for migration in migrations]
+    if len(versions) != len(set(versions)):
+        raise MigrationError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+def split_statements(script):
+    """Split a SQL script into statements, keeping trigger bodies whole.
+
+    executescript() commits before it runs, so a script cannot be part of a
+    larger transaction; its statements are executed one by one instead.
+    """
+    statements = []
+    buffer = ''
+    for piece in script.split(';'):
+        buffer += piece + ';'
+        if sqlite3.complete_statement(buffer):
+            statements.append(buffer.strip())
+            buffer = ''
+    # The split adds a ';' after the last piece: only keep it if it holds SQL
+    rest = buffer[:-1].strip()
+    if rest and _has_sql(rest):
+        statements.append(rest)
+    return [statement for statement in statements if _has_sql(statement)]
+
+def _has_sql(statement):
+    lines = [line.split('--', 1)[0].strip() for line in statement.splitlines()]
+    return any(line and line != ';' for line in lines)
+
+def _has_table(conn, name):
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone()
+    return row is not None
+
+def applied_versions(conn):
+    """Versions recorded in schema_migrations (empty before the first run)"""
+    try:
+        return {row[0] for row in conn.execute('SELECT version FROM schema_migrations')}
+    except sqlite3.OperationalError:
+        return set()
+
+def pending(conn, directory=MIGRATIONS_DIR):
+    applied = applied_versions(conn)
+    return [migration for migration in discover(directory) if migration.version not in applied]
+
+def _database_path(conn):
+    for row in conn.execute('PRAGMA database_list'):
+        if row[1] == 'main':
+            return row[2] or None
+    return None
+
+class _FileLock:
+    """Exclusive lock on <database>.migrate.lock shared by all worker processes"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        if self.path and fcntl is not None:
+            self.file = open(self.path, 'a')
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.file is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+            self.file.close()
+            self.file = None
+
+def _create_version_table(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            checksum TEXT NOT NULL,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+def migrate(conn, directory=MIGRATIONS_DIR):
+    """Apply the pending migrations and return the names of those applied.
+
+    When the schema is current this is a directory listing and one SELECT.
+    Otherwise the runner takes a file lock next to the database, so that
+    workers starting together wait for one of them to migrate, then applies
+    every pending file in a single transaction: either all of them are
+    recorded in schema_migrations or none is.
+    """
+    migrations = discover(directory)
+    applied = applied_versions(conn)
+    if all(migration.version in applied for migration in migrations):
+        return []
+
+    database = _database_path(conn)
+    with _FileLock(database + '.migrate.lock' if database else None):
+        start = time.perf_counter()
+        cursor = conn.cursor()
+        if conn.in_transaction:
+            conn.commit()
+        cursor.execute('BEGIN IMMEDIATE')
+        done = []
+        try:
+            # Another worker may have migrated while this one waited
+            if not _has_table(conn, 'schema_migrations') and _has_table(conn, 'study_sessions'):
+                _create_version_table(cursor)
+                for migration in migrations:
+                    if migration.version <= LEGACY_BASELINE:
+                        _record(cursor, migration, migration.read())
+            _create_version_table(cursor)
+            applied = applied_versions(conn)
+
+            for migration in migrations:
+                if migration.version in applied:
+                    continue
+                script = migration.read()
+                try:
+                    for statement in split_statements(script):
+                        _execute(cursor, statement)
+                except sqlite3.Error as e:
+                    raise MigrationError(f"{migration.name}: {e}") from e
+                _record(cursor, migration, script)
+                done.append(migration.name)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    if done:
+        logger.info("Applied migrations %s in %.3fs", ', '.join(done), time.perf_counter() - start)
+    return done
+
+_ADD_COLUMN = re.compile(r'^\s*ALTER\s+TABLE\s+\S+\s+ADD\s+(COLUMN\s+)?', re.IGNORECASE)
+
+def _execute(cursor, statement):
+    # SQLite has no ADD COLUMN IF NOT EXISTS: databases built by Db.init get
+    # some columns from sql/setup, so an existing column counts as added
+    try:
+        cursor.execute(statement)
+    except sqlite3.OperationalError as e:
+        if not (_ADD_COLUMN.match(_strip_comments(statement)) and str(e).startswith('duplicate column name')):
+            raise
+
+def _strip_comments(statement):
+    return '\n'.join(line.split('--', 1)[0] for line in statement.splitlines())
+
+def _record(cursor, migration, script):
+    cursor.execute('''
+        INSERT INTO schema_migrations (version, name, checksum)
+        VALUES (?, ?, ?)
+    ''', (migration.version, migration.name, hashlib.sha256(script.encode('utf-8')).hexdigest()))
+
+def status(conn, directory=MIGRATIONS_DIR):
+    """Each migration with whether it is applied and whether its file changed since"""
+    recorded = {}
+    if _has_table(conn, 'schema_migrations'):
+        for row in conn.execute('SELECT version, checksum, applied_at FROM schema_migrations'):
+            recorded[row[0]] = (row[1], row[2])
+
+    result = []
+    for migration in discover(directory):
+        checksum, applied_at = recorded.get(migration.version, (None, None))
+        result.append({
+            'version': migration.version,
+            'name': migration.name,
+            'applied_at': applied_at,
+            'modified': checksum is not None and checksum != hashlib.sha256(migration.read().encode('utf-8')).hexdigest()
+        })
+    return result
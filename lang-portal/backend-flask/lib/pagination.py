@@ -0,0 +1,41 @@
+import base64
+import json
+
+class InvalidCursorError(ValueError):
+    """Raised when a client sends a cursor we did not issue"""
+
+def encode_cursor(sort_value, row_id):
+    """Opaque cursor pointing just past the row with this (sort value, id)"""
+    raw = json.dumps([sort_value, row_id], ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Return the (sort value, id) pair stored in a cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidCursorError(f"Invalid cursor: {cursor!r}")
+    # Anything else would reach the query as an unbindable parameter
+    if not isinstance(row_id, int) or not (sort_value is None or isinstance(sort_value, (str, int, float))):
+        raise InvalidCursorError(f"Invalid cursor: {cursor!r}")
+    return sort_value, row_id
+
+def keyset_condition(sort_column, id_column, order):
+    """WHERE fragment that seeks past the cursor row for the given sort order.
+
+    The row-value comparison lets SQLite seek on an index over
+    (sort_column, id) instead of stepping over OFFSET rows.
+    """
+    operator = '<' if order == 'desc' else '>'
+    return f'({sort_column}, {id_column}) {operator} (?, ?)'
+
+def keyset_page(rows, per_page, sort_key, id_key='id'):
+    """Trim the look-ahead row fetched with LIMIT per_page + 1 and build the next cursor"""
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(last[sort_key], last[id_key])
+    return rows, next_cursor
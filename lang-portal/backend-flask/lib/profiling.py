@@ -0,0 +1,269 @@
+import cProfile
+import io
+import pstats
+import re
+import sqlite3
+import threading
+import time
+from flask import g, has_request_context, request
+
+# Upper bounds of the request duration histogram, in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Longest statement text put in the Server-Timing header
+SLOWEST_STATEMENT_CHARS = 120
+
+_WHITESPACE = re.compile(r'\s+')
+
+class RequestProfile:
+    """SQL statements and their time for one request.
+
+    A statement's time is the time spent inside its cursor's execute and
+    fetch calls, which excludes the Python work done between fetches.
+    """
+
+    __slots__ = ('started', 'statements', 'sql_time', 'slowest', 'slowest_time')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.sql_time = 0.0
+        self.slowest = None
+        self.slowest_time = 0.0
+
+    def add(self, text, elapsed, statement_time):
+        """Charge elapsed seconds to the statement text, which has taken statement_time so far"""
+        self.sql_time += elapsed
+        if self.slowest is None or statement_time > self.slowest_time:
+            self.slowest = text
+            self.slowest_time = statement_time
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+def _current_profile():
+    if has_request_context():
+        return g.get('profile')
+    return None
+
+class TimedCursor(sqlite3.Cursor):
+    """A cursor that times its execute and fetch calls into the request's profile.
+
+    Each execute counts as one statement, so statements run by triggers are
+    not counted separately; their time is part of the statement that fired them.
+    """
+
+    def __init__(self, connection):
+        super().__init__(connection)
+        self._profile = None
+        self._sql = None
+        self._elapsed = 0.0
+
+    def _begin(self, sql):
+        self._profile = _current_profile()
+        self._sql = sql
+        self._elapsed = 0.0
+        if self._profile is not None:
+            self._profile.statements += 1
+
+    def _timed(self, method, *args):
+        if self._profile is None:
+            return method(self, *args)
+        started = time.perf_counter()
+        try:
+            return method(self, *args)
+        finally:
+            elapsed = time.perf_counter() - started
+            self._elapsed += elapsed
+            self._profile.add(self._sql, elapsed, self._elapsed)
+
+    def execute(self, sql, parameters=()):
+        self._begin(sql)
+        return self._timed(sqlite3.Cursor.execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._begin(sql)
+        return self._timed(sqlite3.Cursor.executemany, sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        self._begin(sql_script)
+        return self._timed(sqlite3.Cursor.executescript, sql_script)
+
+    def fetchone(self):
+        return self._timed(sqlite3.Cursor.fetchone)
+
+    def fetchmany(self, size=None):
+        return self._timed(sqlite3.Cursor.fetchmany, self.arraysize if size is None else size)
+
+    def fetchall(self):
+        return self._timed(sqlite3.Cursor.fetchall)
+
+    def __next__(self):
+        return self._timed(sqlite3.Cursor.__next__)
+
+class TimedConnection(sqlite3.Connection):
+    """A connection whose cursors, including those behind execute(), are cursor_factory.
+
+    That is a plain cursor until the profiler's connect hook switches it to
+    TimedCursor, so the pragmas run while opening the connection are not timed.
+    """
+
+    cursor_factory = sqlite3.Cursor
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or self.cursor_factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+class Histogram:
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        self.counts = [0] * len(DURATION_BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+def _header_value(text):
+    return _WHITESPACE.sub(' ', text).strip().replace('"', "'").replace('\\', '/')[:SLOWEST_STATEMENT_CHARS]
+
+class RequestProfiler:
+    """Per-request timing and SQL instrumentation.
+
+    Every request gets a Server-Timing header with its total time, its SQL
+    time and statement count, and the time of its slowest statement, and is
+    counted in the Prometheus metrics served by /metrics. The slowest
+    statement's text is only added with sql_in_header, since headers reach
+    every client. With cprofile_enabled, ?profile=1 answers with the
+    request's cProfile stats instead of its body.
+    """
+
+    def __init__(self, cprofile_enabled=False, sql_in_header=False):
+        self.cprofile_enabled = cprofile_enabled
+        self.sql_in_header = sql_in_header
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._durations = {}
+        self._sql_statements = {}
+        self._sql_seconds = {}
+
+    def init_app(self, app):
+        self.db = app.db
+        app.db.set_connection_factory(TimedConnection)
+        app.db.connect_hooks.append(self._install)
+
+        @app.before_request
+        def start_profile():
+            g.profile = RequestProfile()
+            if self.cprofile_enabled and request.args.get('profile') == '1':
+                g.cprofile = cProfile.Profile()
+                g.cprofile.enable()
+
+        @app.after_request
+        def finish_profile(response):
+            profile = g.pop('profile', None)
+            cprofile = g.pop('cprofile', None)
+            if profile is None:
+                return response
+            if cprofile is not None:
+                cprofile.disable()
+            elapsed = profile.elapsed()
+
+            timings = [
+                f'app;dur={elapsed * 1000:.3f}',
+                f'sql;dur={profile.sql_time * 1000:.3f};desc="{profile.statements} statements"',
+            ]
+            if profile.slowest is not None:
+                slowest = f'sql-slowest;dur={profile.slowest_time * 1000:.3f}'
+                if self.sql_in_header:
+                    slowest += f';desc="{_header_value(profile.slowest)}"'
+                timings.append(slowest)
+            # Unmatched URLs share one label so scanners cannot grow the metrics
+            self.record(request.method, request.endpoint or 'unmatched', response.status_code,
+                        elapsed, profile.statements, profile.sql_time)
+
+            if cprofile is not None:
+                response = app.response_class(self._stats_text(cprofile), mimetype='text/plain')
+            response.headers['Server-Timing'] = ', '.join(timings)
+            return response
+
+    def _install(self, conn):
+        if isinstance(conn, TimedConnection):
+            conn.cursor_factory = TimedCursor
+
+    def _stats_text(self, cprofile, limit=40):
+        stream = io.StringIO()
+        pstats.Stats(cprofile, stream=stream).sort_stats('cumulative').print_stats(limit)
+        return stream.getvalue()
+
+    def record(self, method, endpoint, status, elapsed, statements, sql_time):
+        with self._lock:
+            key = (method, endpoint, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            histogram = self._durations.get((method, endpoint))
+            if histogram is None:
+                histogram = self._durations[(method, endpoint)] = Histogram()
+            histogram.observe(elapsed)
+            self._sql_statements[endpoint] = self._sql_statements.get(endpoint, 0) + statements
+            self._sql_seconds[endpoint] = self._sql_seconds.get(endpoint, 0.0) + sql_time
+
+    def render_metrics(self):
+        """The metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            lines += ['# HELP langportal_http_requests_total Requests served.',
+                      '# TYPE langportal_http_requests_total counter']
+            for (method, endpoint, status), count in sorted(self._requests.items()):
+                lines.append(f'langportal_http_requests_total'
+                             f'{_labels(method=method, endpoint=endpoint, status=status)} {count}')
+
+            lines += ['# HELP langportal_http_request_duration_seconds Time to build a response.',
+                      '# TYPE langportal_http_request_duration_seconds histogram']
+            for (method, endpoint), histogram in sorted(self._durations.items()):
+                name = 'langportal_http_request_duration_seconds'
+                for bound, count in zip(DURATION_BUCKETS, histogram.counts):
+                    lines.append(f'{name}_bucket{_labels(method=method, endpoint=endpoint, le=bound)} {count}')
+                lines.append(f'{name}_bucket{_labels(method=method, endpoint=endpoint, le="+Inf")} {histogram.count}')
+                lines.append(f'{name}_sum{_labels(method=method, endpoint=endpoint)} {histogram.total:.6f}')
+                lines.append(f'{name}_count{_labels(method=method, endpoint=endpoint)} {histogram.count}')
+
+            lines += ['# HELP langportal_sql_statements_total SQL statements run by requests.',
+                      '# TYPE langportal_sql_statements_total counter']
+            for endpoint, count in sorted(self._sql_statements.items()):
+                lines.append(f'langportal_sql_statements_total{_labels(endpoint=endpoint)} {count}')
+
+            lines += ['# HELP langportal_sql_duration_seconds_total Time spent in SQLite by requests.',
+                      '# TYPE langportal_sql_duration_seconds_total counter']
+            for endpoint, seconds in sorted(self._sql_seconds.items()):
+                lines.append(f'langportal_sql_duration_seconds_total{_labels(endpoint=endpoint)} {seconds:.6f}')
+
+        lines += ['# HELP langportal_db_pool_connections Pooled SQLite connections.',
+                  '# TYPE langportal_db_pool_connections gauge']
+        pools = self.db.pool_stats()
+        for pool, stats in pools.items():
+            lines.append(f'langportal_db_pool_connections{_labels(pool=pool, state="in_use")} {stats["in_use"]}')
+            lines.append(f'langportal_db_pool_connections{_labels(pool=pool, state="idle")} {stats["idle"]}')
+        lines += ['# HELP langportal_db_pool_timeouts_total Checkouts that timed out waiting for a connection.',
+                  '# TYPE langportal_db_pool_timeouts_total counter']
+        for pool, stats in pools.items():
+            lines.append(f'langportal_db_pool_timeouts_total{_labels(pool=pool)} {stats["timeouts"]}')
+        return '\n'.join(lines) + '\n'
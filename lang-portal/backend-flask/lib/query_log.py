@@ -0,0 +1,60 @@
+import json
+import logging
+import random
+import re
+import time
+from flask import g, has_request_context, request
+
+# Query traces go to stderr as JSON lines, separate from the Flask debug log
+logger = logging.getLogger('sql')
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+handler.setFormatter(logging.Formatter('%(message)s'))
+logger.addHandler(handler)
+logger.propagate = False
+
+_WHITESPACE = re.compile(r'\s+')
+
+class QueryLogger:
+    """Structured, sampled SQL trace log that can be switched on at runtime.
+
+    Every statement on a pooled connection reaches _trace; it costs one attribute
+    check per statement while the logger is off. When on, a sample_rate
+    fraction of requests log each of their statements as one JSON line on
+    the 'sql' logger.
+    """
+
+    def __init__(self, enabled=False, sample_rate=1.0):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+
+    def init_app(self, app):
+        app.db.trace_hooks.append(self._trace)
+
+        @app.before_request
+        def sample_query_log():
+            g.query_log_sampled = self.enabled and random.random() < self.sample_rate
+
+    def configure(self, enabled=None, sample_rate=None):
+        if enabled is not None:
+            # bool('false') is True, so only accept real booleans
+            if not isinstance(enabled, bool):
+                raise TypeError(f"enabled must be a bool, got {enabled!r}")
+            self.enabled = enabled
+        if sample_rate is not None:
+            self.sample_rate = min(1.0, max(0.0, float(sample_rate)))
+
+    def status(self):
+        return {'enabled': self.enabled, 'sample_rate': self.sample_rate}
+
+    def _trace(self, statement):
+        if not self.enabled or not has_request_context() or not g.get('query_log_sampled'):
+            return
+        logger.info(json.dumps({
+            'event': 'sql',
+            'ts': round(time.time(), 3),
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'statement': _WHITESPACE.sub(' ', statement).strip()
+        }, ensure_ascii=False))
@@ -0,0 +1,54 @@
+import re
+
+# Lookup tables with a handful of rows, where a scan is cheaper than an index
+SMALL_TABLES = ('groups', 'study_activities', 'dashboard_stats')
+
+_TABLE_REF = re.compile(
+    r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(?!ON\b|WHERE\b|JOIN\b|LEFT\b|INNER\b|CROSS\b|GROUP\b|ORDER\b|LIMIT\b|HAVING\b|UNION\b)(\w+))?',
+    re.IGNORECASE
+)
+_SCAN = re.compile(r'^SCAN (\w+)$')
+
+class FullScan:
+    """A table read row by row, without any index, by one statement"""
+
+    def __init__(self, table, detail, sql):
+        self.table = table
+        self.detail = detail
+        self.sql = sql
+
+    def __repr__(self):
+        return f"FullScan({self.table!r}: {self.detail!r} in {' '.join(self.sql.split())!r})"
+
+def table_aliases(sql):
+    """Map every table name and alias in a statement to its table"""
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+    return aliases
+
+def explain(conn, sql, params=()):
+    """Return the detail column of EXPLAIN QUERY PLAN for a statement"""
+    return [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+
+def full_scans(conn, sql, params=(), allowed=SMALL_TABLES):
+    """List the full table scans in the plan of a statement.
+
+    Walking an index ('SCAN words USING INDEX ...') is not reported: it is
+    what an ORDER BY ... LIMIT or a covering COUNT(*) should do.
+    """
+    aliases = table_aliases(sql)
+    scans = []
+    for detail in explain(conn, sql, params):
+        match = _SCAN.match(detail)
+        if not match:
+            continue
+        table = aliases.get(match.group(1), match.group(1))
+        if table not in allowed:
+            scans.append(FullScan(table, detail, sql))
+    return scans
+
+def is_query(sql):
+    return sql.lstrip().upper().startswith(('SELECT', 'WITH'))
@@ -0,0 +1,107 @@
+import json
+from datetime import datetime
+
+from lib.scheduler import schedule_reviews, utc_now
+
+# Reviews written per executemany call while reading a request body
+DEFAULT_BATCH_SIZE = 500
+
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/jsonl')
+
+class InvalidReviewError(ValueError):
+    """Raised for a review payload item or line that is not a JSON object"""
+
+def iter_ndjson(lines):
+    """Yield one review dict per non-empty line of an NDJSON body"""
+    for line_number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            review = json.loads(line)
+        except ValueError:
+            raise InvalidReviewError(f"Line {line_number} is not valid JSON")
+        if not isinstance(review, dict):
+            raise InvalidReviewError(f"Line {line_number} is not a JSON object")
+        yield review
+
+def _review_rows(session_id, reviews, skipped):
+    for index, review in enumerate(reviews):
+        if not isinstance(review, dict):
+            raise InvalidReviewError(f"Review {index} is not a JSON object")
+        word_id = review.get('word_id')
+        if not word_id:
+            skipped.append(review)
+            continue
+        yield (
+            session_id,
+            word_id,
+            1 if review.get('is_correct', False) else 0,  # Convert boolean to int for SQLite
+            review.get('created_at')
+        )
+
+def ingest_reviews(conn, session_id, reviews, batch_size=DEFAULT_BATCH_SIZE):
+    """Insert reviews for a session in one transaction and close the session.
+
+    reviews can be any iterable (including a generator over a streamed
+    request body); rows are written with executemany in batches of
+    batch_size. The session's end_time is set in the same transaction, and
+    the per-word and dashboard rollups are updated by the word_review_items
+    triggers, and each batch is folded into the spaced repetition schedule.
+    Returns (review_ids, skipped) where skipped holds the reviews without a
+    word_id.
+    """
+    cursor = conn.cursor()
+    skipped = []
+    inserted = 0
+    end_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    reviewed_at = utc_now()  # what CURRENT_TIMESTAMP stores for reviews without created_at
+
+    # The write lock is held from the start, so AUTOINCREMENT hands out a
+    # contiguous block of ids that can be reported without lastrowid
+    owns_transaction = not conn.in_transaction
+    if owns_transaction:
+        cursor.execute('BEGIN IMMEDIATE')
+
+    try:
+        rows = _review_rows(session_id, reviews, skipped)
+        while True:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    break
+            if not batch:
+                break
+            cursor.executemany('''
+                INSERT INTO word_review_items (session_id, word_id, is_correct, created_at)
+                VALUES (?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+            ''', batch)
+            schedule_reviews(cursor, [
+                (word_id, is_correct == 1, created_at or reviewed_at)
+                for _, word_id, is_correct, created_at in batch
+            ])
+            inserted += len(batch)
+
+        review_ids = []
+        if inserted:
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'word_review_items'")
+            last_id = cursor.fetchone()[0]
+            review_ids = list(range(last_id - inserted + 1, last_id + 1))
+
+            cursor.execute('''
+                UPDATE study_sessions
+                SET end_time = ?
+                WHERE id = ?
+            ''', (end_time, session_id))
+
+        if owns_transaction:
+            conn.commit()
+    except Exception:
+        if owns_transaction:
+            conn.rollback()
+        raise
+
+    return review_ids, skipped
@@ -0,0 +1,177 @@
+from datetime import datetime, timedelta, timezone
+
+# SM-2 defaults. Answers are only right or wrong, so they map to two quality grades.
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+CORRECT_QUALITY = 4
+WRONG_QUALITY = 1
+# A word answered wrong comes back in the same sitting rather than tomorrow
+RELEARN_MINUTES = 10
+# Intervals grow geometrically; a word is seen at least once a year
+MAX_INTERVAL_DAYS = 365
+
+# Same format as SQLite's CURRENT_TIMESTAMP (UTC), so due_at sorts and
+# compares with created_at
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def utc_now():
+    return datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+def parse_timestamp(value):
+    """A review's created_at as a naive UTC datetime (now if it cannot be read)"""
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.replace(microsecond=0)
+
+class Schedule:
+    """The SM-2 state of one word"""
+
+    __slots__ = ('word_id', 'ease', 'interval_days', 'repetitions', 'lapses', 'due_at', 'last_reviewed')
+
+    def __init__(self, word_id, ease=DEFAULT_EASE, interval_days=0.0, repetitions=0, lapses=0,
+                 due_at=None, last_reviewed=None):
+        self.word_id = word_id
+        self.ease = ease
+        self.interval_days = interval_days
+        self.repetitions = repetitions
+        self.lapses = lapses
+        self.due_at = due_at
+        self.last_reviewed = last_reviewed
+
+    def review(self, is_correct, reviewed):
+        """Apply one answer given at reviewed (a naive UTC datetime)"""
+        quality = CORRECT_QUALITY if is_correct else WRONG_QUALITY
+
+        if quality >= 3:
+            if self.repetitions == 0:
+                self.interval_days = 1.0
+            elif self.repetitions == 1:
+                self.interval_days = 6.0
+            else:
+                self.interval_days = min(MAX_INTERVAL_DAYS, round(self.interval_days * self.ease, 2))
+            self.repetitions += 1
+            due = reviewed + timedelta(days=self.interval_days)
+        else:
+            self.repetitions = 0
+            self.interval_days = 0.0
+            self.lapses += 1
+            due = reviewed + timedelta(minutes=RELEARN_MINUTES)
+
+        self.ease = max(MIN_EASE, self.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        self.due_at = due.strftime(TIMESTAMP_FORMAT)
+        self.last_reviewed = reviewed.strftime(TIMESTAMP_FORMAT)
+
+    def as_row(self):
+        return (self.word_id, self.ease, self.interval_days, self.repetitions, self.lapses,
+                self.due_at, self.last_reviewed)
+
+def _load(cursor, word_ids):
+    schedules = {}
+    word_ids = list(word_ids)
+    # Stay under SQLite's bound parameter limit
+    for start in range(0, len(word_ids), 500):
+        chunk = word_ids[start:start + 500]
+        cursor.execute(f'''
+            SELECT word_id, ease, interval_days, repetitions, lapses, due_at, last_reviewed
+            FROM word_schedule
+            WHERE word_id IN ({', '.join('?' * len(chunk))})
+        ''', chunk)
+        for row in cursor.fetchall():
+            schedules[row[0]] = Schedule(*row)
+    return schedules
+
+def schedule_reviews(cursor, reviews):
+    """Fold a batch of (word_id, is_correct, reviewed_at) answers into word_schedule.
+
+    Only the words in the batch are read and written, so the cost does not
+    grow with the review history. The triggers on word_schedule copy due_at
+    to every word_groups row of the word, where the due queue is indexed.
+    """
+    reviews = sorted(
+        ((word_id, is_correct, parse_timestamp(reviewed_at)) for word_id, is_correct, reviewed_at in reviews),
+        key=lambda review: review[2]
+    )
+    schedules = _load(cursor, {review[0] for review in reviews})
+    for word_id, is_correct, reviewed_at in reviews:
+        schedule = schedules.get(word_id)
+        if schedule is None:
+            schedule = schedules[word_id] = Schedule(word_id)
+        schedule.review(is_correct, reviewed_at)
+
+    cursor.executemany('''
+        INSERT INTO word_schedule (word_id, ease, interval_days, repetitions, lapses, due_at, last_reviewed)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (word_id) DO UPDATE SET
+          ease = excluded.ease,
+          interval_days = excluded.interval_days,
+          repetitions = excluded.repetitions,
+          lapses = excluded.lapses,
+          due_at = excluded.due_at,
+          last_reviewed = excluded.last_reviewed
+    ''', [schedule.as_row() for schedule in schedules.values()])
+    return schedules
+
+def rebuild_schedule(conn, batch_size=5000):
+    """Replay every review in word_review_items to rebuild word_schedule from scratch"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute('BEGIN IMMEDIATE')
+        cursor.execute('DELETE FROM word_schedule')
+        read = conn.cursor()
+        read.execute('''
+            SELECT word_id, is_correct, COALESCE(created_at, CURRENT_TIMESTAMP)
+            FROM word_review_items
+            ORDER BY created_at, id
+        ''')
+        replayed = 0
+        while True:
+            rows = read.fetchmany(batch_size)
+            if not rows:
+                break
+            schedule_reviews(cursor, [(row[0], row[1] == 1, row[2]) for row in rows])
+            replayed += len(rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return replayed
+
+def due_words(cursor, group_id, limit, now=None):
+    """Up to limit words of a group to study next: overdue words, oldest due
+    first, then words that were never reviewed.
+
+    Both parts are range scans of idx_word_groups_group_due, so the cost
+    depends on limit, not on the size of the group or the review history.
+    """
+    now = now or utc_now()
+    columns = '''
+        w.id, w.french, w.english, w.gender, w.parts,
+        wg.due_at, ws.ease, ws.interval_days, ws.repetitions, ws.lapses
+    '''
+    cursor.execute(f'''
+        SELECT {columns}
+        FROM word_groups wg
+        JOIN words w ON w.id = wg.word_id
+        LEFT JOIN word_schedule ws ON ws.word_id = wg.word_id
+        WHERE wg.group_id = ? AND wg.due_at <= ?
+        ORDER BY wg.due_at, wg.word_id
+        LIMIT ?
+    ''', (group_id, now, limit))
+    rows = cursor.fetchall()
+
+    if len(rows) < limit:
+        cursor.execute(f'''
+            SELECT {columns}
+            FROM word_groups wg
+            JOIN words w ON w.id = wg.word_id
+            LEFT JOIN word_schedule ws ON ws.word_id = wg.word_id
+            WHERE wg.group_id = ? AND wg.due_at IS NULL
+            ORDER BY wg.word_id
+            LIMIT ?
+        ''', (group_id, limit - len(rows)))
+        rows += cursor.fetchall()
+    return rows
@@ -0,0 +1,31 @@
+class SchemaInfo:
+    """Tables and columns of the database, read once instead of on every request.
+
+    create_app loads it after the migrations have run; call refresh() after
+    anything that changes the schema (Db.init does).
+    """
+
+    def __init__(self):
+        self.tables = {}
+
+    @classmethod
+    def load(cls, conn):
+        schema = cls()
+        schema.refresh(conn)
+        return schema
+
+    def refresh(self, conn):
+        tables = {}
+        names = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        for name in names:
+            tables[name] = [column[1] for column in conn.execute(f'PRAGMA table_info("{name}")')]
+        self.tables = tables
+
+    def has_table(self, table):
+        return table in self.tables
+
+    def has_column(self, table, column):
+        return column in self.tables.get(table, ())
+
+    def columns(self, table):
+        return list(self.tables.get(table, ()))
@@ -0,0 +1,45 @@
+import re
+
+# Longest query accepted, in terms, so a pasted paragraph cannot blow up the MATCH
+MAX_TERMS = 8
+
+_TERM = re.compile(r'\w+', re.UNICODE)
+
+class InvalidSearchError(ValueError):
+    """Raised for a search query without any searchable term"""
+
+def match_query(q):
+    """Turn user input into an FTS5 MATCH expression.
+
+    Every term must match (implicit AND) and the last one is a prefix, so
+    results narrow down while the user types. Terms are quoted, so FTS5
+    syntax in the input ("NOT", "*", quotes, column filters) is searched
+    literally instead of being interpreted.
+    """
+    terms = _TERM.findall(q or '')[:MAX_TERMS]
+    if not terms:
+        raise InvalidSearchError("q must contain at least one letter or digit")
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+def search_words(cursor, q, limit, offset):
+    """Ranked (words rows, total matches) for a search, best match first.
+
+    rank is the bm25 configured on words_fts, which weighs the french and
+    english columns above the forms taken from parts.
+    """
+    query = match_query(q)
+    cursor.execute('''
+        SELECT w.id, w.french, w.english, w.gender, w.parts
+        FROM words_fts
+        JOIN words w ON w.id = words_fts.rowid
+        WHERE words_fts MATCH ?
+        ORDER BY words_fts.rank, w.id
+        LIMIT ? OFFSET ?
+    ''', (query, limit, offset))
+    words = cursor.fetchall()
+
+    cursor.execute('SELECT COUNT(*) FROM words_fts WHERE words_fts MATCH ?', (query,))
+    total = cursor.fetchone()[0]
+    return words, total
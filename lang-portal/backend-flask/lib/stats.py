@@ -0,0 +1,167 @@
+from datetime import date, timedelta
+
+# Recomputes the rollups maintained by the triggers in
+# sql/migrations/005_create_dashboard_stats.sql, for backfills or repairs
+REBUILD_DASHBOARD_STATS_SQL = '''
+    DELETE FROM word_reviews;
+
+    INSERT INTO word_reviews (word_id, correct_count, wrong_count, last_reviewed)
+    SELECT
+      word_id,
+      SUM(is_correct = 1),
+      SUM(is_correct != 1),
+      MAX(COALESCE(created_at, CURRENT_TIMESTAMP))
+    FROM word_review_items
+    GROUP BY word_id;
+
+    INSERT OR REPLACE INTO dashboard_stats (id, total_words, words_studied, total_sessions, total_reviews, correct_reviews)
+    SELECT
+      1,
+      (SELECT COUNT(*) FROM words),
+      (SELECT COUNT(*) FROM word_reviews),
+      (SELECT COUNT(*) FROM study_sessions),
+      COUNT(*),
+      COALESCE(SUM(is_correct = 1), 0)
+    FROM word_review_items;
+'''
+
+def rebuild_dashboard_stats(conn):
+    """Recompute word_reviews and dashboard_stats from the raw tables in one transaction"""
+    try:
+        conn.executescript('BEGIN IMMEDIATE;' + REBUILD_DASHBOARD_STATS_SQL + 'COMMIT;')
+    except Exception:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+
+# Groups whose counter cache (sql/migrations/007_maintain_groups_words_count.sql)
+# disagrees with word_groups
+GROUP_WORDS_COUNT_DRIFT_SQL = '''
+    SELECT g.id, g.words_count, COUNT(wg.group_id) as actual
+    FROM groups g
+    LEFT JOIN word_groups wg ON wg.group_id = g.id
+    GROUP BY g.id
+    HAVING g.words_count IS NOT COUNT(wg.group_id)
+'''
+
+def rebuild_group_words_count(conn):
+    """Reset groups.words_count wherever it drifted; returns {group_id: (cached, actual)}"""
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        drift = {row[0]: (row[1], row[2]) for row in conn.execute(GROUP_WORDS_COUNT_DRIFT_SQL)}
+        conn.executemany(
+            'UPDATE groups SET words_count = ? WHERE id = ?',
+            [(actual, group_id) for group_id, (_, actual) in drift.items()]
+        )
+        conn.commit()
+    except Exception:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    return drift
+
+def get_dashboard_stats(cursor):
+    """The single dashboard_stats row as a dict (all zeros if it is missing)"""
+    cursor.execute('''
+        SELECT total_words, words_studied, total_sessions, total_reviews, correct_reviews
+        FROM dashboard_stats
+        WHERE id = 1
+    ''')
+    row = cursor.fetchone()
+    if not row:
+        return {
+            'total_words': 0,
+            'words_studied': 0,
+            'total_sessions': 0,
+            'total_reviews': 0,
+            'correct_reviews': 0
+        }
+    return dict(row)
+
+# Recomputes the per-day rollup maintained by the triggers in
+# sql/migrations/011_create_daily_review_stats.sql
+REBUILD_DAILY_REVIEW_STATS_SQL = '''
+    DELETE FROM daily_review_stats;
+
+    INSERT INTO daily_review_stats (date, group_id, activity_id, reviews, correct)
+    SELECT
+      COALESCE(date(wri.created_at), date('now')),
+      s.group_id,
+      s.activity_id,
+      COUNT(*),
+      SUM(wri.is_correct = 1)
+    FROM word_review_items wri
+    JOIN study_sessions s ON s.id = wri.session_id
+    GROUP BY 1, 2, 3;
+'''
+
+def rebuild_daily_review_stats(conn):
+    """Backfill daily_review_stats from word_review_items in one transaction"""
+    try:
+        conn.executescript('BEGIN IMMEDIATE;' + REBUILD_DAILY_REVIEW_STATS_SQL + 'COMMIT;')
+    except Exception:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    return conn.execute('SELECT COUNT(*) FROM daily_review_stats').fetchone()[0]
+
+BUCKETS = ('day', 'week')
+
+# Most buckets one trends request may return
+MAX_TREND_BUCKETS = 400
+
+class InvalidTrendError(ValueError):
+    """Raised for a trends range or bucket that cannot be served"""
+
+def _bucket_start(day, bucket):
+    # Weeks start on Monday, like ISO weeks
+    return day - timedelta(days=day.weekday()) if bucket == 'week' else day
+
+def get_review_trends(cursor, start, end, bucket='day', group_id=None, activity_id=None):
+    """Reviews and accuracy per day or week between two dates (inclusive).
+
+    Reads only daily_review_stats, a range scan of its primary key. Every
+    bucket in the range is returned, with zeros where nothing was reviewed.
+    """
+    if bucket not in BUCKETS:
+        raise InvalidTrendError(f"bucket must be one of {', '.join(BUCKETS)}")
+    if start > end:
+        raise InvalidTrendError("from must not be after to")
+    first = _bucket_start(start, bucket)
+    step = timedelta(days=7 if bucket == 'week' else 1)
+    if (end - first) // step + 1 > MAX_TREND_BUCKETS:
+        raise InvalidTrendError(f"At most {MAX_TREND_BUCKETS} {bucket}s can be requested at once")
+
+    conditions = ['date BETWEEN ? AND ?']
+    params = [start.isoformat(), end.isoformat()]
+    if group_id is not None:
+        conditions.append('group_id = ?')
+        params.append(group_id)
+    if activity_id is not None:
+        conditions.append('activity_id = ?')
+        params.append(activity_id)
+    cursor.execute(f'''
+        SELECT date, SUM(reviews) as reviews, SUM(correct) as correct
+        FROM daily_review_stats
+        WHERE {' AND '.join(conditions)}
+        GROUP BY date
+    ''', params)
+
+    totals = {}
+    for row in cursor.fetchall():
+        key = _bucket_start(date.fromisoformat(row['date']), bucket)
+        reviews, correct = totals.get(key, (0, 0))
+        totals[key] = (reviews + row['reviews'], correct + row['correct'])
+
+    points = []
+    day = first
+    while day <= end:
+        reviews, correct = totals.get(day, (0, 0))
+        points.append({
+            'start': day.isoformat(),
+            'reviews': reviews,
+            'correct': correct,
+            'accuracy': round(correct / reviews * 100, 1) if reviews else None
+        })
+        day += step
+    return points
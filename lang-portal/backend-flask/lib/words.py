@@ -0,0 +1,86 @@
+import json
+
+from lib.cache import LRUCache
+
+# Fields a client can ask for with ?fields=
+WORD_FIELDS = ('id', 'french', 'english', 'gender', 'type', 'parts')
+
+# Decoded parts keyed by word id. Entries never expire on their own: the raw
+# JSON is compared on every lookup, so an edited word is simply decoded again.
+_parts_cache = LRUCache(max_entries=20000, ttl=float('inf'))
+
+class InvalidFieldsError(ValueError):
+    """Raised when ?fields= names a field that does not exist"""
+
+def parse_fields(value, allowed=WORD_FIELDS):
+    """Turn a comma separated ?fields= value into a tuple (None means all fields)"""
+    if not value:
+        return None
+    fields = tuple(field.strip() for field in value.split(',') if field.strip())
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise InvalidFieldsError(
+            f"Unknown field(s): {', '.join(unknown)}. Allowed fields: {', '.join(allowed)}"
+        )
+    return fields
+
+def decode_parts(word_id, raw):
+    """Decode a words.parts JSON string, at most once per word id and value"""
+    cached = _parts_cache.get(word_id)
+    if cached is not None and cached[0] == raw:
+        return cached[1]
+    try:
+        parts = json.loads(raw) if raw else {}
+    except ValueError:
+        parts = {}
+    _parts_cache.set(word_id, (raw, parts))
+    return parts
+
+def clear_parts_cache():
+    _parts_cache.clear()
+
+class Word:
+    """A row of the words table with its parts decoded.
+
+    gender holds 'masculine'/'feminine' for nouns; verbs and adjectives are
+    imported with 'none', so their kind is derived from the shape of parts
+    and exposed as type ('noun', 'verb' or 'adjective').
+    """
+
+    __slots__ = ('id', 'french', 'english', 'gender', 'parts', 'extra')
+
+    def __init__(self, id, french, english, gender, parts, extra=None):
+        self.id = id
+        self.french = french
+        self.english = english
+        self.gender = gender
+        self.parts = parts
+        # Columns joined in by a query, e.g. correct_count / wrong_count
+        self.extra = extra or {}
+
+    @classmethod
+    def from_row(cls, row, extra_columns=()):
+        return cls(
+            id=row['id'],
+            french=row['french'],
+            english=row['english'],
+            gender=row['gender'],
+            parts=decode_parts(row['id'], row['parts']),
+            extra={column: row[column] for column in extra_columns}
+        )
+
+    @property
+    def type(self):
+        if self.gender == 'verb' or 'infinitive' in self.parts:
+            return 'verb'
+        if self.gender == 'adjective' or 'feminine' in self.parts:
+            return 'adjective'
+        return 'noun'
+
+    def to_dict(self, fields=None):
+        if fields is None:
+            fields = WORD_FIELDS + tuple(self.extra)
+        data = {}
+        for field in fields:
+            data[field] = self.extra[field] if field in self.extra else getattr(self, field)
+        return data
@@ -1,31 +1,28 @@
 import sqlite3
 import os
+import sys
 
-def run_migrations():
+from lib.migrations import migrate, status
+
+def run_migrations(db_path=None):
     # Connect to the database
-    db_path = os.path.join(os.path.dirname(__file__), 'word_bank.db')
+    db_path = db_path or os.path.join(os.path.dirname(__file__), 'word_bank.db')
     conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
     
     try:
-        # Get list of migration files
-        migrations_dir = os.path.join(os.path.dirname(__file__), 'sql', 'migrations')
-        migration_files = sorted([f for f in os.listdir(migrations_dir) if f.endswith('.sql')])
-        
-        # Run each migration
-        for migration_file in migration_files:
-            print(f"Running migration: {migration_file}")
-            with open(os.path.join(migrations_dir, migration_file)) as f:
-                migration_sql = f.read()
-                conn.executescript(migration_sql)
-                conn.commit()
-        
-        print("Migrations completed successfully")
+        applied = migrate(conn)
+        for name in applied:
+            print(f"Applied migration: {name}")
+        if not applied:
+            print("Database schema is up to date")
+        for migration in status(conn):
+            if migration['modified']:
+                print(f"Warning: {migration['name']} changed after it was applied")
     except Exception as e:
         print(f"Error running migrations: {str(e)}")
-        conn.rollback()
+        sys.exit(1)
     finally:
         conn.close()
 
 if __name__ == '__main__':
-    run_migrations()
+    run_migrations(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -1,6 +1,11 @@
-from flask import jsonify
+from flask import jsonify, request
 from flask_cors import cross_origin
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
+
+from lib.stats import get_dashboard_stats, get_review_trends, InvalidTrendError
+
+# Days shown by GET /api/dashboard/trends without ?from=
+DEFAULT_TREND_DAYS = 30
 
 def load(app):
     @app.route('/api/dashboard/last-study-session', methods=['GET'])
@@ -51,18 +56,10 @@ def load(app):
         try:
             cursor = app.db.cursor()
             
-            # Get total words studied (unique words that have been reviewed)
-            cursor.execute('''
-                SELECT COUNT(DISTINCT word_id) as total_studied
-                FROM word_review_items
-            ''')
-            result = cursor.fetchone()
-            total_studied = result["total_studied"] if result else 0
-            
-            # Get total available words
-            cursor.execute('SELECT COUNT(*) as total FROM words')
-            result = cursor.fetchone()
-            total_available = result["total"] if result else 0
+            # Totals are maintained by triggers (see 005_create_dashboard_stats.sql)
+            stats = get_dashboard_stats(cursor)
+            total_studied = stats['words_studied']
+            total_available = stats['total_words']
             
             return jsonify({
                 "study_progress": {
@@ -81,31 +78,15 @@ def load(app):
         try:
             cursor = app.db.cursor()
             
-            # Get total words studied (unique words that have been reviewed)
-            cursor.execute('''
-                SELECT COUNT(DISTINCT word_id) as total_words_studied
-                FROM word_review_items
-            ''')
-            total_words_studied = cursor.fetchone()['total_words_studied']
-            
-            # Get total study sessions
-            cursor.execute('''
-                SELECT COUNT(*) as total_sessions
-                FROM study_sessions
-            ''')
-            total_sessions = cursor.fetchone()['total_sessions']
+            # Totals are maintained by triggers (see 005_create_dashboard_stats.sql)
+            stats = get_dashboard_stats(cursor)
+            total_words_studied = stats['words_studied']
+            total_sessions = stats['total_sessions']
             
             # Get success rate
-            cursor.execute('''
-                SELECT 
-                    COUNT(*) as total_reviews,
-                    SUM(CASE WHEN is_correct = 1 THEN 1 ELSE 0 END) as correct_reviews
-                FROM word_review_items
-            ''')
-            review_stats = cursor.fetchone()
             success_rate = 0
-            if review_stats['total_reviews'] > 0:
-                success_rate = (review_stats['correct_reviews'] / review_stats['total_reviews']) * 100
+            if stats['total_reviews'] > 0:
+                success_rate = (stats['correct_reviews'] / stats['total_reviews']) * 100
             
             return jsonify({
                 "total_words_studied": total_words_studied,
@@ -116,3 +97,43 @@ def load(app):
         except Exception as e:
             app.logger.error(f"Error in get_quick_stats: {str(e)}")
             return jsonify({"error": "Internal server error"}), 500
+
+    # Endpoint: GET /api/dashboard/trends?from=2025-01-01&to=2025-03-31&bucket=week
+    # Reviews and accuracy over time, read from the daily_review_stats rollup
+    # (see 011_create_daily_review_stats.sql). Dates are UTC days.
+    @app.route('/api/dashboard/trends', methods=['GET'])
+    @cross_origin()
+    def get_trends():
+        try:
+            try:
+                end = date.fromisoformat(request.args['to']) if 'to' in request.args else datetime.now(timezone.utc).date()
+                start = (date.fromisoformat(request.args['from']) if 'from' in request.args
+                         else end - timedelta(days=DEFAULT_TREND_DAYS - 1))
+            except ValueError:
+                return jsonify({"error": "from and to must be dates (YYYY-MM-DD)"}), 400
+            group_id = request.args.get('group_id', type=int)
+            activity_id = request.args.get('activity_id', type=int)
+            bucket = request.args.get('bucket', 'day')
+
+            cursor = app.db.cursor()
+            points = get_review_trends(cursor, start, end, bucket, group_id, activity_id)
+
+            reviews = sum(point['reviews'] for point in points)
+            correct = sum(point['correct'] for point in points)
+            return jsonify({
+                "from": start.isoformat(),
+                "to": end.isoformat(),
+                "bucket": bucket,
+                "points": points,
+                "totals": {
+                    "reviews": reviews,
+                    "correct": correct,
+                    "accuracy": round(correct / reviews * 100, 1) if reviews else None
+                }
+            })
+
+        except InvalidTrendError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            app.logger.error(f"Error in get_trends: {str(e)}")
+            return jsonify({"error": "Internal server error"}), 500
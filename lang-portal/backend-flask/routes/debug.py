@@ -0,0 +1,30 @@
+from flask import request, jsonify
+from flask_cors import cross_origin
+
+def load(app):
+    # Endpoint: GET /api/debug/query-log to see whether SQL tracing is on
+    @app.route('/api/debug/query-log', methods=['GET'])
+    @cross_origin()
+    def get_query_log():
+        return jsonify(app.query_log.status())
+
+    # Endpoint: POST /api/debug/query-log {"enabled": true, "sample_rate": 0.1}
+    @app.route('/api/debug/query-log', methods=['POST'])
+    @cross_origin()
+    def update_query_log():
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        enabled = data.get('enabled')
+        if enabled is not None and not isinstance(enabled, bool):
+            return jsonify({'error': 'enabled must be true or false'}), 400
+        try:
+            app.query_log.configure(
+                enabled=enabled,
+                sample_rate=data.get('sample_rate')
+            )
+        except (TypeError, ValueError):
+            return jsonify({'error': 'sample_rate must be a number'}), 400
+        return jsonify(app.query_log.status())
+
+    return app
@@ -0,0 +1,52 @@
+from flask import request, jsonify, Response, stream_with_context
+from flask_cors import cross_origin
+
+from lib.export import DATASETS, DEFAULT_BATCH_SIZE, FORMATS, InvalidExportError, export_chunks, get_dataset
+
+MAX_BATCH_SIZE = 10000
+
+def load(app):
+    # Endpoint: GET /api/export/<dataset>?format=ndjson|csv&since=&after_id=
+    # dataset is one of words, groups, study-sessions, review-items
+    @app.route('/api/export/<dataset>', methods=['GET'])
+    @cross_origin()
+    def export_dataset(dataset):
+        try:
+            fmt = request.args.get('format', 'ndjson')
+            since = request.args.get('since')
+            after_id = request.args.get('after_id', type=int)
+            batch_size = request.args.get('batch_size', DEFAULT_BATCH_SIZE, type=int)
+            if not 1 <= batch_size <= MAX_BATCH_SIZE:
+                return jsonify({'error': f'batch_size must be between 1 and {MAX_BATCH_SIZE}'}), 400
+
+            chunks = export_chunks(
+                app.db.cursor().connection,
+                get_dataset(dataset),
+                fmt=fmt,
+                since=since,
+                after_id=after_id,
+                batch_size=batch_size
+            )
+        except InvalidExportError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # The read connection stays checked out until the last chunk is sent,
+        # so the whole export comes from one snapshot of the database
+        response = Response(stream_with_context(chunks), mimetype=FORMATS[fmt])
+        extension = 'csv' if fmt == 'csv' else 'ndjson'
+        response.headers['Content-Disposition'] = f'attachment; filename={dataset}.{extension}'
+        return response
+
+    # Endpoint: GET /api/export to list what can be exported
+    @app.route('/api/export', methods=['GET'])
+    @cross_origin()
+    def list_exports():
+        return jsonify({
+            'datasets': {
+                name: {'since': dataset.timestamp is not None}
+                for name, dataset in DATASETS.items()
+            },
+            'formats': list(FORMATS)
+        })
+
+    return app
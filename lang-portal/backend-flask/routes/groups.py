@@ -2,12 +2,23 @@ from flask import request, jsonify, g
 from flask_cors import cross_origin
 import json
 
+from lib.pagination import decode_cursor, keyset_condition, keyset_page, InvalidCursorError
+from lib.scheduler import due_words
+from lib.words import Word, WORD_FIELDS, parse_fields, InvalidFieldsError
+
+GROUP_WORD_FIELDS = WORD_FIELDS + ('correct_count', 'wrong_count')
+
+# Scheduling state returned with each word of GET /api/groups/<id>/due
+DUE_COLUMNS = ('due_at', 'ease', 'interval_days', 'repetitions', 'lapses')
+DEFAULT_DUE_LIMIT = 20
+MAX_DUE_LIMIT = 200
+
 def load(app):
   @app.route('/api/groups', methods=['GET'])
   @cross_origin()
+  @app.response_cache.cached('groups', 'words')
   def get_groups():
     try:
-      print("Starting get_groups function")
       cursor = app.db.cursor()
 
       # Get the current page number from query parameters (default is 1)
@@ -26,46 +37,30 @@ def load(app):
       if order not in ['asc', 'desc']:
         order = 'asc'
 
-      print(f"Query params: page={page}, sort_by={sort_by}, order={order}")
-
-      # Query to fetch groups with sorting and the word count
+      # words_count is a counter cache kept exact by triggers on word_groups;
+      # (column, id) indexes serve both sort orders
       query = f'''
         SELECT 
           g.id, 
           g.name, 
           COALESCE(g.description, '') as description,
-          (SELECT COUNT(*) FROM word_groups wg WHERE wg.group_id = g.id) as words_count
+          g.words_count
         FROM groups g
-        ORDER BY {sort_by} {order}
+        ORDER BY g.{sort_by} {order}, g.id {order}
         LIMIT ? OFFSET ?
       '''
-      print(f"Executing query: {query}")
-      
-      # First check if groups table exists
-      cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='groups'")
-      table_exists = cursor.fetchone()
-      print(f"Groups table exists: {table_exists is not None}")
 
-      if not table_exists:
+      # The schema is cached at startup (see SchemaInfo in create_app)
+      if not app.schema.has_table('groups'):
         return jsonify({"error": "Groups table does not exist"}), 500
 
-      # Check groups table schema
-      cursor.execute("PRAGMA table_info(groups)")
-      columns = cursor.fetchall()
-      print(f"Groups table columns: {columns}")
-
       cursor.execute(query, (groups_per_page, offset))
       groups = cursor.fetchall()
-      print(f"Found {len(groups)} groups")
-
-      if len(groups) > 0:
-        print(f"First group data: {dict(groups[0])}")
 
       # Query the total number of groups
       cursor.execute('SELECT COUNT(*) FROM groups')
       total_groups = cursor.fetchone()[0]
       total_pages = (total_groups + groups_per_page - 1) // groups_per_page
-      print(f"Total groups: {total_groups}, Total pages: {total_pages}")
 
       # Format the response
       groups_data = []
@@ -82,17 +77,15 @@ def load(app):
         'total_pages': total_pages,
         'current_page': page
       }
-      print(f"Returning response: {response}")
       return jsonify(response)
     except Exception as e:
-      print(f"Error in get_groups: {str(e)}")
-      print(f"Error type: {type(e)}")
       import traceback
-      traceback.print_exc()
+      app.logger.error(f"Error in get_groups: {str(e)}\n{traceback.format_exc()}")
       return jsonify({"error": str(e)}), 500
 
   @app.route('/api/groups/<int:id>', methods=['GET'])
   @cross_origin()
+  @app.response_cache.cached('groups')
   def get_group(id):
     try:
       cursor = app.db.cursor()
@@ -144,6 +137,13 @@ def load(app):
       if not group:
         return jsonify({"error": "Group not found"}), 404
 
+      # Optional projection, e.g. ?fields=id,french,english
+      fields = parse_fields(request.args.get('fields'), GROUP_WORD_FIELDS)
+
+      # Keyset pagination: ?cursor= (empty for the first page)
+      if 'cursor' in request.args:
+        return get_group_words_by_cursor(cursor, id, sort_by, order, words_per_page, fields)
+
       # Query to fetch words with pagination and sorting
       cursor.execute(f'''
         SELECT w.*, 
@@ -168,29 +168,90 @@ def load(app):
       total_words = cursor.fetchone()[0]
       total_pages = (total_words + words_per_page - 1) // words_per_page
 
-      # Format the response
-      words_data = []
-      for word in words:
-        words_data.append({
-          "id": word["id"],
-          "french": word["french"],
-          "english": word["english"],
-          "parts": word["parts"],
-          "correct_count": word["correct_count"],
-          "wrong_count": word["wrong_count"]
-        })
-
       return jsonify({
-        'words': words_data,
+        'words': [format_group_word(word, fields) for word in words],
         'total_pages': total_pages,
         'current_page': page
       })
+    except (InvalidCursorError, InvalidFieldsError) as e:
+      return jsonify({"error": str(e)}), 400
+    except Exception as e:
+      return jsonify({"error": str(e)}), 500
+
+  def get_group_words_by_cursor(cursor, group_id, sort_by, order, words_per_page, fields):
+    # The cursor seeks on (w.<column>, w.id); review counts come from a
+    # LEFT JOIN and cannot be seeked on
+    keyset_columns = ['french', 'english']
+    if sort_by not in keyset_columns:
+      return jsonify({
+        "error": f"Cursor pagination only supports sort_by {', '.join(keyset_columns)}"
+      }), 400
+
+    params = [group_id]
+    keyset_clause = ''
+    if request.args['cursor']:
+      sort_value, last_id = decode_cursor(request.args['cursor'])
+      keyset_clause = 'AND ' + keyset_condition(f'w.{sort_by}', 'w.id', order)
+      params.extend([sort_value, last_id])
+
+    # Fetch one extra row to know whether there is a next page
+    cursor.execute(f'''
+      SELECT w.*,
+             COALESCE(wr.correct_count, 0) as correct_count,
+             COALESCE(wr.wrong_count, 0) as wrong_count
+      FROM words w
+      JOIN word_groups wg ON w.id = wg.word_id
+      LEFT JOIN word_reviews wr ON w.id = wr.word_id
+      WHERE wg.group_id = ? {keyset_clause}
+      ORDER BY w.{sort_by} {order}, w.id {order}
+      LIMIT ?
+    ''', params + [words_per_page + 1])
+    words, next_cursor = keyset_page(cursor.fetchall(), words_per_page, sort_by)
+
+    response = {
+      'words': [format_group_word(word, fields) for word in words],
+      'next_cursor': next_cursor,
+      'has_more': next_cursor is not None
+    }
+    if request.args.get('include_total', '').lower() in ['true', '1']:
+      cursor.execute('SELECT COUNT(*) FROM word_groups WHERE group_id = ?', (group_id,))
+      response['total_words'] = cursor.fetchone()[0]
+
+    return jsonify(response)
+
+  def format_group_word(word, fields=None):
+    return Word.from_row(word, extra_columns=('correct_count', 'wrong_count')).to_dict(fields)
+
+  @app.route('/api/groups/<int:id>/due', methods=['GET'])
+  @cross_origin()
+  def get_group_due_words(id):
+    try:
+      cursor = app.db.cursor()
+
+      limit = request.args.get('limit', DEFAULT_DUE_LIMIT, type=int)
+      if not 1 <= limit <= MAX_DUE_LIMIT:
+        return jsonify({"error": f"limit must be between 1 and {MAX_DUE_LIMIT}"}), 400
+
+      cursor.execute('SELECT id FROM groups WHERE id = ?', (id,))
+      if not cursor.fetchone():
+        return jsonify({"error": "Group not found"}), 404
+
+      # Overdue words first, then words never reviewed (see lib/scheduler.py)
+      words = due_words(cursor, id, limit)
+      return jsonify({
+        'group_id': id,
+        'words': [
+          Word.from_row(word, extra_columns=DUE_COLUMNS).to_dict(WORD_FIELDS + DUE_COLUMNS)
+          for word in words
+        ]
+      })
     except Exception as e:
       return jsonify({"error": str(e)}), 500
 
   # todo GET /groups/:id/words/raw
 
   @app.route('/api/groups/<int:id>/study_sessions', methods=['GET'])
+  @app.route('/api/groups/<int:id>/study-sessions', methods=['GET'])
   @cross_origin()
   def get_group_study_sessions(id):
     try:
@@ -204,18 +265,20 @@ def load(app):
       # Get sorting parameters
       sort_by = request.args.get('sort_by', 'created_at')
       order = request.args.get('order', 'desc')  # Default to newest first
+      if order not in ['asc', 'desc']:
+        order = 'desc'
 
       # Map frontend sort keys to database columns
       sort_mapping = {
-        'startTime': 'created_at',
-        'endTime': 'last_activity_time',
+        'startTime': 's.start_time',
+        'endTime': 'end_time',
         'activityName': 'a.name',
         'groupName': 'g.name',
         'reviewItemsCount': 'review_count'
       }
 
-      # Use mapped sort column or default to created_at
-      sort_column = sort_mapping.get(sort_by, 'created_at')
+      # Use mapped sort column or default to the start time
+      sort_column = sort_mapping.get(sort_by, 's.start_time')
 
       # Get total count for pagination
       cursor.execute('''
@@ -226,52 +289,52 @@ def load(app):
       total_sessions = cursor.fetchone()[0]
       total_pages = (total_sessions + sessions_per_page - 1) // sessions_per_page
 
-      # Get study sessions for this group with dynamic calculations
+      # Review totals for every session of the group are aggregated in one
+      # pass, so the page costs one statement however many sessions it has.
+      # Sessions without reviews end 30 minutes after they started.
       cursor.execute(f'''
+        WITH review_totals AS (
+          SELECT
+            wri.session_id,
+            MAX(wri.created_at) as last_activity_time,
+            COUNT(*) as review_count,
+            SUM(wri.is_correct = 1) as correct_count
+          FROM study_sessions s
+          JOIN word_review_items wri ON wri.session_id = s.id
+          WHERE s.group_id = ?
+          GROUP BY wri.session_id
+        )
         SELECT 
           s.id,
           s.group_id,
-          s.study_activity_id,
-          s.created_at as start_time,
-          (
-            SELECT MAX(created_at)
-            FROM word_review_items
-            WHERE study_session_id = s.id
-          ) as last_activity_time,
+          s.activity_id,
+          s.start_time,
+          COALESCE(rt.last_activity_time, datetime(s.start_time, '+30 minutes')) as end_time,
           a.name as activity_name,
           g.name as group_name,
-          (
-            SELECT COUNT(*)
-            FROM word_review_items
-            WHERE study_session_id = s.id
-          ) as review_count
+          COALESCE(rt.review_count, 0) as review_count,
+          COALESCE(rt.correct_count, 0) as correct_count
         FROM study_sessions s
-        JOIN study_activities a ON s.study_activity_id = a.id
+        JOIN study_activities a ON s.activity_id = a.id
         JOIN groups g ON s.group_id = g.id
+        LEFT JOIN review_totals rt ON rt.session_id = s.id
         WHERE s.group_id = ?
-        ORDER BY {sort_column} {order}
+        ORDER BY {sort_column} {order}, s.id {order}
         LIMIT ? OFFSET ?
-      ''', (id, sessions_per_page, offset))
-      
-      sessions = cursor.fetchall()
-      sessions_data = []
+      ''', (id, id, sessions_per_page, offset))
       
-      for session in sessions:
-        # If there's no last_activity_time, use start_time + 30 minutes
-        end_time = session["last_activity_time"]
-        if not end_time:
-            end_time = cursor.execute('SELECT datetime(?, "+30 minutes")', (session["start_time"],)).fetchone()[0]
-        
-        sessions_data.append({
-          "id": session["id"],
-          "group_id": session["group_id"],
-          "group_name": session["group_name"],
-          "study_activity_id": session["study_activity_id"],
-          "activity_name": session["activity_name"],
-          "start_time": session["start_time"],
-          "end_time": end_time,
-          "review_items_count": session["review_count"]
-        })
+      sessions_data = [{
+        "id": session["id"],
+        "group_id": session["group_id"],
+        "group_name": session["group_name"],
+        "activity_id": session["activity_id"],
+        "study_activity_id": session["activity_id"],
+        "activity_name": session["activity_name"],
+        "start_time": session["start_time"],
+        "end_time": session["end_time"],
+        "review_items_count": session["review_count"],
+        "correct_count": session["correct_count"]
+      } for session in cursor.fetchall()]
 
       return jsonify({
         'study_sessions': sessions_data,
@@ -0,0 +1,9 @@
+from flask import Response
+
+def load(app):
+    # Endpoint: GET /metrics in the Prometheus text format (see lib/profiling.py)
+    @app.route('/metrics', methods=['GET'])
+    def get_metrics():
+        return Response(app.profiler.render_metrics(), mimetype='text/plain; version=0.0.4')
+
+    return app
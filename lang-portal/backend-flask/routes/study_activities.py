@@ -2,9 +2,15 @@ from flask import jsonify, request
 from flask_cors import cross_origin
 import math
 
+from lib.launch import (
+    launch_bundle, resume_or_create_session, LaunchNotFoundError, DEFAULT_WORDS_LIMIT, MAX_WORDS_LIMIT
+)
+from lib.words import parse_fields
+
 def load(app):
     @app.route('/api/study-activities', methods=['GET', 'OPTIONS'])
     @cross_origin()
+    @app.response_cache.cached('study_activities')
     def get_study_activities():
         try:
             cursor = app.db.cursor()
@@ -98,34 +104,84 @@ def load(app):
             } for session in sessions]
         })
 
+    # Endpoint: GET /api/study-activities/:id/launch[?group_id=&fields=&limit=]
+    # The activity, every group with its word count and, for a group_id, the
+    # group's words, read in one transaction. Sent with an ETag, so a client
+    # that kept the last bundle gets a 304 while nothing changed.
     @app.route('/api/study-activities/<int:id>/launch', methods=['GET', 'OPTIONS'])
     @cross_origin()
     def get_study_activity_launch_data(id):
-        cursor = app.db.cursor()
-        
-        # Get activity details
-        cursor.execute('SELECT id, name, url, preview_url FROM study_activities WHERE id = ?', (id,))
-        activity = cursor.fetchone()
-        
-        if not activity:
-            return jsonify({'error': 'Activity not found'}), 404
-        
-        # Get available groups
-        cursor.execute('SELECT id, name FROM groups')
-        groups = cursor.fetchall()
-        
-        return jsonify({
-            'activity': {
-                'id': activity['id'],
-                'title': activity['name'],
-                'launch_url': activity['url'],
-                'preview_url': activity['preview_url']
-            },
-            'groups': [{
-                'id': group['id'],
-                'name': group['name']
-            } for group in groups]
-        })
+        try:
+            group_id, fields, limit = parse_launch_args(request.args)
+            cursor = app.db.cursor()
+            cursor.execute('BEGIN')
+            try:
+                bundle = launch_bundle(cursor, id, group_id, fields, limit)
+            finally:
+                cursor.connection.commit()
+
+            response = jsonify(bundle)
+            response.add_etag()
+            return response.make_conditional(request)
+        except LaunchNotFoundError as e:
+            return jsonify({'error': str(e)}), 404
+        except ValueError as e:  # includes InvalidFieldsError
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    # Endpoint: POST /api/study-activities/:id/launch {"group_id": 1}
+    # The launch bundle of a group plus the session to record reviews in:
+    # the group's recent session for this activity if there is one (200),
+    # else a new one (201). One write transaction, one round trip.
+    @app.route('/api/study-activities/<int:id>/launch', methods=['POST'])
+    @cross_origin()
+    def launch_study_activity(id):
+        try:
+            data = request.get_json(silent=True) or {}
+            if not isinstance(data, dict):
+                return jsonify({'error': 'Request body must be a JSON object'}), 400
+            group_id, fields, limit = parse_launch_args({**request.args, **data})
+            if group_id is None:
+                return jsonify({'error': 'group_id is required'}), 400
+
+            cursor = app.db.get().cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                bundle = launch_bundle(cursor, id, group_id, fields, limit)
+                bundle['session'], created = resume_or_create_session(cursor, group_id, id)
+                cursor.connection.commit()
+            except Exception:
+                cursor.connection.rollback()
+                raise
+            if created:
+                app.db.notify_change('study_sessions')
+
+            return jsonify(bundle), 201 if created else 200
+        except LaunchNotFoundError as e:
+            return jsonify({'error': str(e)}), 404
+        except ValueError as e:  # includes InvalidFieldsError
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    def parse_launch_args(args):
+        group_id = args.get('group_id')
+        if group_id is not None:
+            try:
+                group_id = int(group_id)
+            except (TypeError, ValueError):
+                raise ValueError('group_id must be an integer')
+        try:
+            limit = int(args.get('limit', DEFAULT_WORDS_LIMIT))
+        except (TypeError, ValueError):
+            raise ValueError('limit must be an integer')
+        if not 1 <= limit <= MAX_WORDS_LIMIT:
+            raise ValueError(f'limit must be between 1 and {MAX_WORDS_LIMIT}')
+        fields = args.get('fields')
+        if isinstance(fields, list):
+            fields = ','.join(fields)
+        return group_id, parse_fields(fields), limit
 
     @app.route('/api/study-activities/<int:id>/sessions', methods=['GET', 'OPTIONS'])
     @cross_origin()
@@ -3,6 +3,8 @@ from flask_cors import cross_origin
 from datetime import datetime
 import math
 
+from lib.reviews import ingest_reviews, iter_ndjson, InvalidReviewError, NDJSON_MIMETYPES
+
 def load(app):
   # todo /study_sessions POST
     @app.route('/api/study-sessions', methods=['POST'])
@@ -38,6 +40,7 @@ def load(app):
         
         session_id = cursor.lastrowid
         app.db.commit()
+        app.db.notify_change('study_sessions')
         
         # Return the created session
         return jsonify({
@@ -63,36 +66,10 @@ def load(app):
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         offset = (page - 1) * per_page
-        print(f"Query params: page={page}, per_page={per_page}")
-
-        # Debug: Check table structure
-        print("Checking tables...")
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = cursor.fetchall()
-        table_names = [table['name'] for table in tables]
-        print(f"Tables in database: {table_names}")
-
-        # Check study_sessions structure
-        print("Checking study_sessions table...")
-        cursor.execute("PRAGMA table_info(study_sessions)")
-        columns = cursor.fetchall()
-        print(f"study_sessions columns: {[col['name'] for col in columns]}")
-        
-        # Check study_activities structure
-        print("Checking study_activities table...")
-        cursor.execute("PRAGMA table_info(study_activities)")
-        columns = cursor.fetchall()
-        print(f"study_activities columns: {[col['name'] for col in columns]}")
-
-        # Check if there are any study sessions
-        cursor.execute("SELECT COUNT(*) as count FROM study_sessions")
-        count = cursor.fetchone()['count']
-        print(f"Number of study sessions in database: {count}")
         
         # Get filter parameters
         group_id = request.args.get('group_id')
         active = request.args.get('active', '').lower() in ['true', '1', 't', 'yes']
-        print(f"Filter params: group_id={group_id}, active={active}")
         
         # Base query
         base_query = '''
@@ -120,10 +97,8 @@ def load(app):
         
         # Get total count
         count_query = f'SELECT COUNT(*) as count {base_query}{where_clause}'
-        print(f"Count query: {count_query} with params {query_params}")
         cursor.execute(count_query, query_params)
         total_count = cursor.fetchone()['count']
-        print(f"Total count: {total_count}")
         
         # Get paginated sessions
         full_query = f'''
@@ -135,12 +110,12 @@ def load(app):
             sa.name as activity_name,
             ss.start_time,
             ss.end_time,
-            COUNT(wri.id) as review_items_count,
-            SUM(CASE WHEN wri.is_correct = 1 THEN 1 ELSE 0 END) as correct_count
+            (SELECT COUNT(*) FROM word_review_items wri
+             WHERE wri.session_id = ss.id) as review_items_count,
+            (SELECT COUNT(*) FROM word_review_items wri
+             WHERE wri.session_id = ss.id AND wri.is_correct = 1) as correct_count
           {base_query}
-          LEFT JOIN word_review_items wri ON wri.session_id = ss.id
           {where_clause}
-          GROUP BY ss.id, ss.group_id, g.name, sa.id, sa.name, ss.start_time, ss.end_time
           ORDER BY ss.start_time DESC
           LIMIT ? OFFSET ?
         '''
@@ -148,15 +123,12 @@ def load(app):
         # Add pagination parameters to the query
         final_params = query_params.copy()
         final_params.extend([per_page, offset])
-        print(f"Full query: {full_query} with params {final_params}")
         
         cursor.execute(full_query, final_params)
         sessions = cursor.fetchall()
-        print(f"Found {len(sessions)} sessions")
 
         # Calculate total pages
         total_pages = math.ceil(total_count / per_page)
-        print(f"Total pages: {total_pages}")
 
         response_data = {
           'study_sessions': [{
@@ -166,7 +138,7 @@ def load(app):
             'activity_id': session['activity_id'],
             'activity_name': session['activity_name'],
             'start_time': session['start_time'],
-            'end_time': session['end_time'] if 'end_time' in session.keys() else None,  # Safely access end_time
+            'end_time': session['end_time'],
             'review_items_count': session['review_items_count'],
             'correct_count': session['correct_count']
           } for session in sessions],
@@ -174,14 +146,12 @@ def load(app):
           'current_page': page
         }
         
-        print(f"Returning response with {len(response_data['study_sessions'])} sessions")
         return jsonify(response_data)
         
       except Exception as e:
         import traceback
         error_trace = traceback.format_exc()
-        print(f"ERROR in get_study_sessions: {str(e)}")
-        print(f"Traceback: {error_trace}")
+        app.logger.error(f"Error in get_study_sessions: {str(e)}\n{error_trace}")
         return jsonify({"error": str(e), "trace": error_trace}), 500
 
     @app.route('/api/study-sessions/<id>', methods=['GET'])
@@ -270,26 +240,14 @@ def load(app):
       except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-    # todo POST /study_sessions/:id/review
+    # POST /study_sessions/:id/review
+    # Accepts {"reviews": [...]}, a bare array, a single review object, or an
+    # NDJSON body (one review per line) so a client can flush a whole session
     @app.route('/api/study-sessions/<id>/review', methods=['POST'])
     @cross_origin()
     def submit_review(id):
       try:
         session_id = id
-        data = request.get_json()
-        
-        if not data:
-          return jsonify({"error": "No data provided"}), 400
-        
-        # Check if the reviews array is provided
-        reviews = data.get('reviews', [])
-        if not reviews and 'word_id' in data:
-          # Handle single review format
-          reviews = [data]
-        
-        if not reviews:
-          return jsonify({"error": "No reviews provided"}), 400
-        
         cursor = app.db.cursor()
         
         # First check if this session exists
@@ -299,43 +257,43 @@ def load(app):
         if not session:
           return jsonify({"error": f"Study session with ID {session_id} not found"}), 404
         
-        # Process each review
-        review_ids = []
-        for review in reviews:
-          word_id = review.get('word_id')
-          is_correct = review.get('is_correct', False)
+        if request.mimetype in NDJSON_MIMETYPES:
+          # Stream the body straight into the batched inserts
+          reviews = iter_ndjson(request.stream)
+        else:
+          data = request.get_json()
           
-          if not word_id:
-            continue
+          if not data:
+            return jsonify({"error": "No data provided"}), 400
           
-          # Insert the word review item using session_id
-          cursor.execute('''
-            INSERT INTO word_review_items (
-              session_id,
-              word_id,
-              is_correct
-            )
-            VALUES (?, ?, ?)
-          ''', (
-            session_id, 
-            word_id, 
-            1 if is_correct else 0  # Convert boolean to int for SQLite
-          ))
+          if isinstance(data, list):
+            reviews = data
+          else:
+            # Check if the reviews array is provided
+            reviews = data.get('reviews', [])
+            if not reviews and 'word_id' in data:
+              # Handle single review format
+              reviews = [data]
           
-          review_ids.append(cursor.lastrowid)
+          if not reviews:
+            return jsonify({"error": "No reviews provided"}), 400
         
-        app.db.commit()
+        review_ids, skipped = ingest_reviews(app.db.get(), session_id, reviews)
+        if review_ids:
+          app.db.notify_change('reviews', 'study_sessions')
+        
+        if not review_ids and not skipped and request.mimetype in NDJSON_MIMETYPES:
+          return jsonify({"error": "No reviews provided"}), 400
         
         # Return the created reviews
         return jsonify({
           "message": f"Successfully added {len(review_ids)} reviews",
-          "review_ids": review_ids
+          "review_ids": review_ids,
+          "skipped": len(skipped)
         }), 201
         
-      except Exception as e:
-        app.db.rollback()  # Rollback in case of error
-        return jsonify({"error": str(e)}), 500
-        
+      except InvalidReviewError as e:
+        return jsonify({"error": str(e)}), 400
       except Exception as e:
         app.db.rollback()  # Rollback in case of error
         return jsonify({"error": str(e)}), 500
@@ -379,9 +337,14 @@ def load(app):
         # Then delete all study sessions
         cursor.execute('DELETE FROM study_sessions')
         
+        # The schedule was built from that history; its delete trigger clears word_groups.due_at
+        cursor.execute('DELETE FROM word_schedule')
+        
         app.db.commit()
+        app.db.notify_change('reviews', 'study_sessions')
         
         return jsonify({"message": "Study history cleared successfully"}), 200
       except Exception as e:
+        app.db.rollback()
         return jsonify({"error": str(e)}), 500
       
@@ -2,6 +2,10 @@ from flask import request, jsonify, g
 from flask_cors import cross_origin
 import json
 
+from lib.pagination import decode_cursor, keyset_condition, keyset_page, InvalidCursorError
+from lib.search import search_words, InvalidSearchError
+from lib.words import Word, parse_fields, InvalidFieldsError
+
 def load(app):
     # Endpoint: GET /api/words with pagination (50 words per page)
     @app.route('/api/words', methods=['GET'])
@@ -28,6 +32,14 @@ def load(app):
             if order not in ['asc', 'desc']:
                 order = 'asc'
 
+            # Optional projection, e.g. ?fields=id,french,english
+            fields = parse_fields(request.args.get('fields'))
+
+            # Keyset pagination: ?cursor= (empty for the first page) seeks on
+            # (sort column, id) so every page costs the same as the first one
+            if 'cursor' in request.args:
+                return get_words_by_cursor(cursor, sort_by, order, words_per_page, fields)
+
             # Query to fetch words with sorting
             cursor.execute(f'''
                 SELECT id, french, english, gender, parts
@@ -44,20 +56,73 @@ def load(app):
             total_words = result['total'] if result else 0
             total_pages = (total_words + words_per_page - 1) // words_per_page
 
-            # Format the response
-            words_data = []
-            for word in words:
-                word_dict = {
-                    'id': word['id'],
-                    'french': word['french'],
-                    'english': word['english'],
-                    'gender': word['gender'],
-                    'parts': word['parts']  # Keep as string, don't parse JSON
+            return jsonify({
+                'words': [Word.from_row(word).to_dict(fields) for word in words],
+                'pagination': {
+                    'current_page': page,
+                    'total_pages': total_pages,
+                    'total_words': total_words,
+                    'words_per_page': words_per_page
                 }
-                words_data.append(word_dict)
+            })
+
+        except (InvalidCursorError, InvalidFieldsError) as e:
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            app.logger.error(f"Error in get_words: {str(e)}")
+            return jsonify({'error': 'Internal server error'}), 500
+
+    def get_words_by_cursor(cursor, sort_by, order, words_per_page, fields):
+        params = []
+        where_clause = ''
+        if request.args['cursor']:
+            sort_value, last_id = decode_cursor(request.args['cursor'])
+            where_clause = 'WHERE ' + keyset_condition(sort_by, 'id', order)
+            params.extend([sort_value, last_id])
+
+        # Fetch one extra row to know whether there is a next page
+        cursor.execute(f'''
+            SELECT id, french, english, gender, parts
+            FROM words
+            {where_clause}
+            ORDER BY {sort_by} {order}, id {order}
+            LIMIT ?
+        ''', params + [words_per_page + 1])
+        words, next_cursor = keyset_page(cursor.fetchall(), words_per_page, sort_by)
+
+        pagination = {
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None,
+            'words_per_page': words_per_page
+        }
+        # Counting is a full index scan, so it is only done when asked for
+        if request.args.get('include_total', '').lower() in ['true', '1']:
+            cursor.execute('SELECT COUNT(*) as total FROM words')
+            pagination['total_words'] = cursor.fetchone()['total']
+
+        return jsonify({
+            'words': [Word.from_row(word).to_dict(fields) for word in words],
+            'pagination': pagination
+        })
+
+    # Endpoint: GET /api/words/search?q= full-text search over french, english
+    # and the conjugated forms, ignoring accents (see lib/search.py)
+    @app.route('/api/words/search', methods=['GET'])
+    @cross_origin()
+    def search_words_route():
+        try:
+            page = max(1, int(request.args.get('page', 1)))
+            words_per_page = 50
+            fields = parse_fields(request.args.get('fields'))
+
+            cursor = app.db.cursor()
+            words, total_words = search_words(
+                cursor, request.args.get('q', ''), words_per_page, (page - 1) * words_per_page
+            )
+            total_pages = (total_words + words_per_page - 1) // words_per_page
 
             return jsonify({
-                'words': words_data,
+                'words': [Word.from_row(word).to_dict(fields) for word in words],
                 'pagination': {
                     'current_page': page,
                     'total_pages': total_pages,
@@ -66,15 +131,21 @@ def load(app):
                 }
             })
 
+        except (InvalidSearchError, InvalidFieldsError) as e:
+            return jsonify({'error': str(e)}), 400
+        except ValueError:
+            return jsonify({'error': 'page must be an integer'}), 400
         except Exception as e:
-            app.logger.error(f"Error in get_words: {str(e)}")
+            app.logger.error(f"Error in search_words: {str(e)}")
             return jsonify({'error': 'Internal server error'}), 500
 
     # Endpoint: GET /api/words/:id to get a single word with its details
     @app.route('/api/words/<int:word_id>', methods=['GET'])
     @cross_origin()
+    @app.response_cache.cached('words')
     def get_word(word_id):
         try:
+            fields = parse_fields(request.args.get('fields'))
             cursor = app.db.cursor()
             
             # Query to fetch the word and its details
@@ -89,19 +160,13 @@ def load(app):
             if not word:
                 return jsonify({"error": "Word not found"}), 404
             
-            # Parse the parts string into a dictionary
-            parts = json.loads(word['parts'])
-            
+            # parts is decoded once per word and cached (see lib/words.py)
             return jsonify({
-                "word": {
-                    "id": word['id'],
-                    "french": word['french'],
-                    "english": word['english'],
-                    "gender": word['gender'],
-                    "parts": parts
-                }
+                "word": Word.from_row(word).to_dict(fields)
             })
             
+        except InvalidFieldsError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             app.logger.error(f"Error in get_word: {str(e)}")
             return jsonify({"error": "Internal server error"}), 500
@@ -131,6 +196,7 @@ def load(app):
                 json.dumps(data['parts'])
             ))
             app.db.commit()
+            app.db.notify_change('words')
 
             return jsonify({
                 'message': 'Word added successfully',
@@ -1,6 +1,10 @@
 import sqlite3
 import json
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lib.importer import import_words
 
 def seed_french_words():
     # Connect to the database
@@ -9,39 +13,18 @@ def seed_french_words():
     cursor = conn.cursor()
     
     try:
-        # Clear existing data
+        # Clear and reload in one transaction; import_words joins the open one
+        cursor.execute('BEGIN IMMEDIATE')
         cursor.execute('DELETE FROM words')
-        
-        # Load verbs
-        with open('seed/data_verbs.json', 'r', encoding='utf-8') as f:
-            verbs = json.load(f)
-            for verb in verbs:
-                cursor.execute('''
-                    INSERT INTO words (french, english, gender, parts)
-                    VALUES (?, ?, ?, ?)
-                ''', (
-                    verb['french'],
-                    verb['english'],
-                    'verb',  # Use 'verb' as gender for verbs
-                    json.dumps(verb['parts'])
-                ))
 
-        # Load adjectives
-        with open('seed/data_adjectives.json', 'r', encoding='utf-8') as f:
-            adjectives = json.load(f)
-            for adj in adjectives:
-                cursor.execute('''
-                    INSERT INTO words (french, english, gender, parts)
-                    VALUES (?, ?, ?, ?)
-                ''', (
-                    adj['french'],
-                    adj['english'],
-                    'adjective',  # Use 'adjective' as gender for adjectives
-                    json.dumps(adj['parts'])
-                ))
+        verbs = import_words(conn, 'seed/data_verbs.json', gender='verb')  # Use 'verb' as gender for verbs
+        adjectives = import_words(conn, 'seed/data_adjectives.json', gender='adjective')  # Use 'adjective' as gender for adjectives
 
         conn.commit()
-        print("Successfully seeded French words into database!")
+        print(
+            f"Successfully seeded {verbs['inserted'] + adjectives['inserted']} French words into database "
+            f"({verbs['duplicates'] + adjectives['duplicates']} duplicates skipped)!"
+        )
         
     except Exception as e:
         print(f"Error seeding database: {str(e)}")
@@ -0,0 +1,5 @@
+-- Indexes over (sort column, id) so keyset pagination on /api/words can seek
+-- straight to the cursor row for every allowed sort column
+CREATE INDEX IF NOT EXISTS idx_words_french_id ON words(french, id);
+CREATE INDEX IF NOT EXISTS idx_words_english_id ON words(english, id);
+CREATE INDEX IF NOT EXISTS idx_words_gender_id ON words(gender, id);
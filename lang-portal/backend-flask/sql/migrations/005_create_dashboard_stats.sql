@@ -0,0 +1,105 @@
+-- Rollups behind the dashboard endpoints, kept current by triggers so the
+-- dashboard never has to scan word_review_items
+
+-- Per-word review totals (one row per reviewed word)
+CREATE TABLE IF NOT EXISTS word_reviews (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  word_id INTEGER NOT NULL,
+  correct_count INTEGER DEFAULT 0,
+  wrong_count INTEGER DEFAULT 0,
+  last_reviewed TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY (word_id) REFERENCES words(id)
+);
+
+-- Lifetime totals, always a single row with id = 1
+CREATE TABLE IF NOT EXISTS dashboard_stats (
+  id INTEGER PRIMARY KEY CHECK (id = 1),
+  total_words INTEGER NOT NULL DEFAULT 0,
+  words_studied INTEGER NOT NULL DEFAULT 0,
+  total_sessions INTEGER NOT NULL DEFAULT 0,
+  total_reviews INTEGER NOT NULL DEFAULT 0,
+  correct_reviews INTEGER NOT NULL DEFAULT 0
+);
+
+-- word_reviews is only written by the triggers below, so it is rebuilt here
+DELETE FROM word_reviews;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_word_reviews_word_id ON word_reviews(word_id);
+
+CREATE TRIGGER IF NOT EXISTS trg_word_review_items_after_insert
+AFTER INSERT ON word_review_items
+BEGIN
+  UPDATE dashboard_stats SET
+    total_reviews = total_reviews + 1,
+    correct_reviews = correct_reviews + (NEW.is_correct = 1),
+    words_studied = words_studied + NOT EXISTS (SELECT 1 FROM word_reviews WHERE word_id = NEW.word_id)
+  WHERE id = 1;
+
+  INSERT INTO word_reviews (word_id, correct_count, wrong_count, last_reviewed)
+  VALUES (NEW.word_id, NEW.is_correct = 1, NEW.is_correct != 1, COALESCE(NEW.created_at, CURRENT_TIMESTAMP))
+  ON CONFLICT (word_id) DO UPDATE SET
+    correct_count = correct_count + excluded.correct_count,
+    wrong_count = wrong_count + excluded.wrong_count,
+    last_reviewed = MAX(last_reviewed, excluded.last_reviewed);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_word_review_items_after_delete
+AFTER DELETE ON word_review_items
+BEGIN
+  UPDATE word_reviews SET
+    correct_count = correct_count - (OLD.is_correct = 1),
+    wrong_count = wrong_count - (OLD.is_correct != 1)
+  WHERE word_id = OLD.word_id;
+
+  DELETE FROM word_reviews
+  WHERE word_id = OLD.word_id AND correct_count + wrong_count <= 0;
+
+  UPDATE dashboard_stats SET
+    total_reviews = total_reviews - 1,
+    correct_reviews = correct_reviews - (OLD.is_correct = 1),
+    words_studied = words_studied - NOT EXISTS (SELECT 1 FROM word_reviews WHERE word_id = OLD.word_id)
+  WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_words_after_insert
+AFTER INSERT ON words
+BEGIN
+  UPDATE dashboard_stats SET total_words = total_words + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_words_after_delete
+AFTER DELETE ON words
+BEGIN
+  UPDATE dashboard_stats SET total_words = total_words - 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_study_sessions_after_insert
+AFTER INSERT ON study_sessions
+BEGIN
+  UPDATE dashboard_stats SET total_sessions = total_sessions + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_study_sessions_after_delete
+AFTER DELETE ON study_sessions
+BEGIN
+  UPDATE dashboard_stats SET total_sessions = total_sessions - 1 WHERE id = 1;
+END;
+
+-- Backfill from the existing rows (same statements as lib/stats.py)
+INSERT INTO word_reviews (word_id, correct_count, wrong_count, last_reviewed)
+SELECT
+  word_id,
+  SUM(is_correct = 1),
+  SUM(is_correct != 1),
+  MAX(COALESCE(created_at, CURRENT_TIMESTAMP))
+FROM word_review_items
+GROUP BY word_id;
+
+INSERT OR REPLACE INTO dashboard_stats (id, total_words, words_studied, total_sessions, total_reviews, correct_reviews)
+SELECT
+  1,
+  (SELECT COUNT(*) FROM words),
+  (SELECT COUNT(*) FROM word_reviews),
+  (SELECT COUNT(*) FROM study_sessions),
+  COUNT(*),
+  COALESCE(SUM(is_correct = 1), 0)
+FROM word_review_items;
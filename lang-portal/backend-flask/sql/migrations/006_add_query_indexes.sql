@@ -0,0 +1,27 @@
+-- word_groups comes from sql/setup, which databases created by the app
+-- itself never ran
+CREATE TABLE IF NOT EXISTS word_groups (
+  word_id INTEGER NOT NULL,
+  group_id INTEGER NOT NULL,
+  FOREIGN KEY (word_id) REFERENCES words(id),
+  FOREIGN KEY (group_id) REFERENCES groups(id)
+);
+
+-- Group pages filter word_groups by group and join to words; the reverse
+-- index serves word -> groups lookups and cascading deletes of a word
+CREATE INDEX IF NOT EXISTS idx_word_groups_group_word ON word_groups(group_id, word_id);
+CREATE INDEX IF NOT EXISTS idx_word_groups_word_group ON word_groups(word_id, group_id);
+
+-- Per-session review counts and correct/wrong totals are read from the
+-- index alone. This covers the single-column session index from 003.
+CREATE INDEX IF NOT EXISTS idx_word_review_items_session_correct ON word_review_items(session_id, is_correct);
+DROP INDEX IF EXISTS idx_word_review_items_session;
+
+-- Session lists and the dashboard's last session sort by start_time, per
+-- group or overall. Counting sessions joined to their group and activity
+-- reads (group_id, activity_id) from an index instead of the table; both
+-- replace the single-column group index from 003.
+CREATE INDEX IF NOT EXISTS idx_study_sessions_start_time ON study_sessions(start_time);
+CREATE INDEX IF NOT EXISTS idx_study_sessions_group_start_time ON study_sessions(group_id, start_time);
+CREATE INDEX IF NOT EXISTS idx_study_sessions_group_activity ON study_sessions(group_id, activity_id);
+DROP INDEX IF EXISTS idx_study_sessions_group;
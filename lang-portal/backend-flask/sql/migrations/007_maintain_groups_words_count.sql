@@ -0,0 +1,31 @@
+-- groups.words_count is a counter cache of the group's rows in word_groups.
+-- Databases built by Db.init already have the column (sql/setup), those
+-- built by the migrations alone get it here.
+ALTER TABLE groups ADD COLUMN words_count INTEGER DEFAULT 0;
+
+UPDATE groups
+SET words_count = (SELECT COUNT(*) FROM word_groups WHERE word_groups.group_id = groups.id);
+
+CREATE TRIGGER IF NOT EXISTS trg_word_groups_after_insert
+AFTER INSERT ON word_groups
+BEGIN
+  UPDATE groups SET words_count = words_count + 1 WHERE id = NEW.group_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_word_groups_after_delete
+AFTER DELETE ON word_groups
+BEGIN
+  UPDATE groups SET words_count = words_count - 1 WHERE id = OLD.group_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_word_groups_after_update
+AFTER UPDATE OF group_id ON word_groups
+WHEN OLD.group_id IS NOT NEW.group_id
+BEGIN
+  UPDATE groups SET words_count = words_count - 1 WHERE id = OLD.group_id;
+  UPDATE groups SET words_count = words_count + 1 WHERE id = NEW.group_id;
+END;
+
+-- GET /api/groups sorts on either column, with id as the tie-breaker
+CREATE INDEX IF NOT EXISTS idx_groups_words_count_id ON groups(words_count, id);
+CREATE INDEX IF NOT EXISTS idx_groups_name_id ON groups(name, id);
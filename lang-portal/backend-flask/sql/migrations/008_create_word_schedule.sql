@@ -0,0 +1,45 @@
+-- Spaced repetition state per word (SM-2), updated by lib/scheduler.py as
+-- reviews are submitted
+CREATE TABLE IF NOT EXISTS word_schedule (
+  word_id INTEGER PRIMARY KEY,
+  ease REAL NOT NULL DEFAULT 2.5,
+  interval_days REAL NOT NULL DEFAULT 0,
+  repetitions INTEGER NOT NULL DEFAULT 0,
+  lapses INTEGER NOT NULL DEFAULT 0,
+  due_at DATETIME,
+  last_reviewed DATETIME,
+  FOREIGN KEY (word_id) REFERENCES words(id)
+);
+
+-- due_at is copied to every group the word belongs to, so a group's due
+-- queue is one range of this index (NULL = never reviewed)
+ALTER TABLE word_groups ADD COLUMN due_at DATETIME;
+CREATE INDEX IF NOT EXISTS idx_word_groups_group_due ON word_groups(group_id, due_at, word_id);
+
+CREATE TRIGGER IF NOT EXISTS trg_word_schedule_after_insert
+AFTER INSERT ON word_schedule
+BEGIN
+  UPDATE word_groups SET due_at = NEW.due_at WHERE word_id = NEW.word_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_word_schedule_after_update
+AFTER UPDATE OF due_at ON word_schedule
+BEGIN
+  UPDATE word_groups SET due_at = NEW.due_at WHERE word_id = NEW.word_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_word_schedule_after_delete
+AFTER DELETE ON word_schedule
+BEGIN
+  UPDATE word_groups SET due_at = NULL WHERE word_id = OLD.word_id;
+END;
+
+-- A word added to another group brings its due date along
+CREATE TRIGGER IF NOT EXISTS trg_word_groups_after_insert_due
+AFTER INSERT ON word_groups
+WHEN NEW.due_at IS NULL
+BEGIN
+  UPDATE word_groups
+  SET due_at = (SELECT due_at FROM word_schedule WHERE word_id = NEW.word_id)
+  WHERE rowid = NEW.rowid;
+END;
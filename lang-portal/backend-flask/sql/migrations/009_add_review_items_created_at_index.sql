@@ -0,0 +1,2 @@
+-- Incremental exports (?since=) read review items in (created_at, id) order
+CREATE INDEX IF NOT EXISTS idx_word_review_items_created_at ON word_review_items(created_at);
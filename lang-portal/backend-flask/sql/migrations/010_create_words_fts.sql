@@ -0,0 +1,52 @@
+-- Full-text index over the French and English text of every word and the
+-- forms in its parts (conjugations, plurals, feminine forms, ...).
+-- remove_diacritics folds accents on both sides, so "etre" finds "être";
+-- the prefix indexes keep "mang*" style queries fast.
+CREATE VIRTUAL TABLE IF NOT EXISTS words_fts USING fts5(
+  french,
+  english,
+  forms,
+  tokenize = 'unicode61 remove_diacritics 2',
+  prefix = '2 3'
+);
+
+-- Matches on the word itself rank above matches on one of its forms
+INSERT INTO words_fts (words_fts, rank) VALUES ('rank', 'bm25(10.0, 10.0, 1.0)');
+
+-- rowid is words.id; forms are the text values anywhere in the parts JSON
+CREATE TRIGGER IF NOT EXISTS trg_words_fts_after_insert
+AFTER INSERT ON words
+BEGIN
+  INSERT INTO words_fts (rowid, french, english, forms)
+  SELECT NEW.id, NEW.french, NEW.english, group_concat(value, ' ')
+  FROM json_tree(CASE WHEN json_valid(NEW.parts) THEN NEW.parts ELSE '{}' END)
+  WHERE type = 'text';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_words_fts_after_update
+AFTER UPDATE OF french, english, parts ON words
+BEGIN
+  DELETE FROM words_fts WHERE rowid = OLD.id;
+  INSERT INTO words_fts (rowid, french, english, forms)
+  SELECT NEW.id, NEW.french, NEW.english, group_concat(value, ' ')
+  FROM json_tree(CASE WHEN json_valid(NEW.parts) THEN NEW.parts ELSE '{}' END)
+  WHERE type = 'text';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_words_fts_after_delete
+AFTER DELETE ON words
+BEGIN
+  DELETE FROM words_fts WHERE rowid = OLD.id;
+END;
+
+-- Index the words that already exist
+DELETE FROM words_fts;
+INSERT INTO words_fts (rowid, french, english, forms)
+SELECT
+  w.id,
+  w.french,
+  w.english,
+  (SELECT group_concat(value, ' ')
+   FROM json_tree(CASE WHEN json_valid(w.parts) THEN w.parts ELSE '{}' END)
+   WHERE type = 'text')
+FROM words w;
@@ -0,0 +1,49 @@
+-- Reviews per UTC day, group and activity, kept current by triggers so the
+-- trend charts never scan word_review_items. The group and activity are
+-- those of the review's session.
+CREATE TABLE IF NOT EXISTS daily_review_stats (
+  date TEXT NOT NULL,  -- YYYY-MM-DD, from word_review_items.created_at
+  group_id INTEGER NOT NULL,
+  activity_id INTEGER NOT NULL,
+  reviews INTEGER NOT NULL DEFAULT 0,
+  correct INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (date, group_id, activity_id)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_daily_review_stats_after_insert
+AFTER INSERT ON word_review_items
+BEGIN
+  INSERT INTO daily_review_stats (date, group_id, activity_id, reviews, correct)
+  SELECT COALESCE(date(NEW.created_at), date('now')), s.group_id, s.activity_id, 1, NEW.is_correct = 1
+  FROM study_sessions s
+  WHERE s.id = NEW.session_id
+  ON CONFLICT (date, group_id, activity_id) DO UPDATE SET
+    reviews = reviews + 1,
+    correct = correct + excluded.correct;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_daily_review_stats_after_delete
+AFTER DELETE ON word_review_items
+BEGIN
+  UPDATE daily_review_stats SET
+    reviews = reviews - 1,
+    correct = correct - (OLD.is_correct = 1)
+  WHERE date = COALESCE(date(OLD.created_at), date('now'))
+    AND (group_id, activity_id) = (SELECT group_id, activity_id FROM study_sessions WHERE id = OLD.session_id);
+
+  DELETE FROM daily_review_stats
+  WHERE date = COALESCE(date(OLD.created_at), date('now')) AND reviews <= 0;
+END;
+
+-- Backfill from the existing reviews (same statement as lib/stats.py)
+DELETE FROM daily_review_stats;
+INSERT INTO daily_review_stats (date, group_id, activity_id, reviews, correct)
+SELECT
+  COALESCE(date(wri.created_at), date('now')),
+  s.group_id,
+  s.activity_id,
+  COUNT(*),
+  SUM(wri.is_correct = 1)
+FROM word_review_items wri
+JOIN study_sessions s ON s.id = wri.session_id
+GROUP BY 1, 2, 3;
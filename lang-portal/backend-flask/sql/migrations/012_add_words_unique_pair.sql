@@ -0,0 +1,46 @@
+-- One row per (french, english) pair, so importers can skip existing words
+-- with ON CONFLICT instead of loading the whole table to compare against.
+-- Databases seeded before the importer deduplicated may hold copies of a
+-- pair: the lowest id is kept and everything pointing at a copy moves to it.
+CREATE TEMP TABLE word_copies AS
+SELECT words.id AS id, kept.id AS keep_id
+FROM words
+JOIN (SELECT MIN(id) AS id, french, english FROM words GROUP BY french, english) AS kept
+  ON kept.french = words.french AND kept.english = words.english
+WHERE words.id <> kept.id;
+
+UPDATE word_review_items
+SET word_id = (SELECT keep_id FROM word_copies WHERE word_copies.id = word_review_items.word_id)
+WHERE word_id IN (SELECT id FROM word_copies);
+
+-- word_reviews is a rollup of word_review_items: fold the copies' totals in
+INSERT INTO word_reviews (word_id, correct_count, wrong_count, last_reviewed)
+SELECT word_copies.keep_id, word_reviews.correct_count, word_reviews.wrong_count, word_reviews.last_reviewed
+FROM word_reviews
+JOIN word_copies ON word_copies.id = word_reviews.word_id
+WHERE true
+ON CONFLICT (word_id) DO UPDATE SET
+  correct_count = correct_count + excluded.correct_count,
+  wrong_count = wrong_count + excluded.wrong_count,
+  last_reviewed = MAX(last_reviewed, excluded.last_reviewed);
+DELETE FROM word_reviews WHERE word_id IN (SELECT id FROM word_copies);
+UPDATE dashboard_stats SET words_studied = (SELECT COUNT(*) FROM word_reviews) WHERE id = 1;
+
+-- A group that already has the kept word drops the copy (the words_count trigger follows)
+DELETE FROM word_groups
+WHERE word_id IN (SELECT id FROM word_copies)
+  AND EXISTS (
+    SELECT 1 FROM word_groups AS other
+    JOIN word_copies ON word_copies.keep_id = other.word_id
+    WHERE word_copies.id = word_groups.word_id AND other.group_id = word_groups.group_id
+  );
+UPDATE word_groups
+SET word_id = (SELECT keep_id FROM word_copies WHERE word_copies.id = word_groups.word_id)
+WHERE word_id IN (SELECT id FROM word_copies);
+
+-- The kept word's schedule stays; `invoke rebuild-schedule` replays the merged history
+DELETE FROM word_schedule WHERE word_id IN (SELECT id FROM word_copies);
+DELETE FROM words WHERE id IN (SELECT id FROM word_copies);
+DROP TABLE word_copies;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_words_french_english ON words(french, english);
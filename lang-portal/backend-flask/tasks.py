@@ -1,5 +1,5 @@
 from invoke import task
-from lib.db import db
+from lib.db import db, Db
 
 @task
 def init_db(c):
@@ -7,4 +7,130 @@ def init_db(c):
   app = Flask(__name__)
   with app.app_context():
     db.init(app)
-  print("Database initialized successfully.")
\ No newline at end of file
+  print("Database initialized successfully.")
+
+@task(help={'database': "SQLite database file"})
+def migrate(c, database='words.db'):
+  """Apply pending sql/migrations files to an existing database"""
+  import sqlite3
+  from lib.migrations import migrate as run_migrations
+  conn = sqlite3.connect(database)
+  try:
+    applied = run_migrations(conn)
+  finally:
+    conn.close()
+  print(f"Applied {', '.join(applied)}" if applied else "Database schema is up to date.")
+
+@task(help={
+  'path': "JSON file containing an array of words",
+  'group': "Group to add the words to (created if missing)",
+  'gender': "Override the gender of every imported word, e.g. 'verb'",
+  'batch_size': "Rows per executemany batch",
+  'database': "SQLite database file"
+})
+def import_words(c, path, group=None, gender=None, batch_size=1000, database='words.db'):
+  """Bulk import a vocabulary JSON file in a single transaction"""
+  from flask import Flask
+  from lib.importer import import_words as bulk_import_words
+  app = Flask(__name__)
+  target = Db(database=database, read_pool_size=0)
+  with app.app_context():
+    stats = bulk_import_words(target.get(), path, group_name=group, gender=gender, batch_size=int(batch_size))
+    target.close()
+  target.close_all()
+  print(
+    f"Imported {stats['inserted']} new words from {path} "
+    f"({stats['duplicates']} duplicates, {stats['grouped']} added to group) "
+    f"in {stats['seconds']}s - {stats['rows_per_sec']} rows/sec"
+  )
+
+@task(help={'database': "SQLite database file"})
+def rebuild_stats(c, database='words.db'):
+  """Recompute the dashboard rollups from word_review_items"""
+  import sqlite3
+  from lib.stats import rebuild_dashboard_stats
+  conn = sqlite3.connect(database)
+  try:
+    rebuild_dashboard_stats(conn)
+  finally:
+    conn.close()
+  print("Dashboard stats rebuilt successfully.")
+
+@task(help={'database': "SQLite database file"})
+def backfill_trends(c, database='words.db'):
+  """Rebuild the per-day review rollup behind /api/dashboard/trends"""
+  import sqlite3
+  from lib.stats import rebuild_daily_review_stats
+  conn = sqlite3.connect(database)
+  try:
+    rows = rebuild_daily_review_stats(conn)
+  finally:
+    conn.close()
+  print(f"Daily review stats rebuilt ({rows} day/group/activity rows).")
+
+@task(help={'database': "SQLite database file"})
+def rebuild_word_counts(c, database='words.db'):
+  """Repair groups.words_count from word_groups"""
+  import sqlite3
+  from lib.stats import rebuild_group_words_count
+  conn = sqlite3.connect(database)
+  try:
+    drift = rebuild_group_words_count(conn)
+  finally:
+    conn.close()
+  for group_id, (cached, actual) in sorted(drift.items()):
+    print(f"Group {group_id}: words_count {cached} -> {actual}")
+  print(f"Repaired {len(drift)} group(s).")
+
+@task(help={'database': "SQLite database file"})
+def rebuild_schedule(c, database='words.db'):
+  """Rebuild the spaced repetition schedule by replaying word_review_items"""
+  import sqlite3
+  from lib.scheduler import rebuild_schedule as replay_reviews
+  conn = sqlite3.connect(database)
+  try:
+    replayed = replay_reviews(conn)
+  finally:
+    conn.close()
+  print(f"Schedule rebuilt from {replayed} reviews.")
+
+@task(help={
+  'dataset': "words, groups, study-sessions or review-items",
+  'format': "ndjson or csv",
+  'since': "Only rows at or after this timestamp (study-sessions, review-items)",
+  'after_id': "Resume after this row, the last one of the previous export",
+  'output': "File to write (default: stdout)",
+  'database': "SQLite database file"
+})
+def export(c, dataset, format='ndjson', since=None, after_id=None, output=None, database='words.db'):
+  """Stream a table as NDJSON or CSV with constant memory"""
+  import sqlite3
+  import sys
+  from lib.export import export_chunks, get_dataset
+  conn = sqlite3.connect(database)
+  conn.row_factory = sqlite3.Row
+  out = open(output, 'w', encoding='utf-8', newline='') if output else sys.stdout
+  try:
+    chunks = export_chunks(conn, get_dataset(dataset), fmt=format, since=since,
+                           after_id=int(after_id) if after_id is not None else None)
+    for chunk in chunks:
+      out.write(chunk)
+  finally:
+    if output:
+      out.close()
+    conn.close()
+
+@task(help={
+  'baseline': "Results JSON to compare against; the task fails on a p95 regression",
+  'output': "Write the results as JSON (e.g. to store a new baseline)",
+  'reviews': "Synthetic review items to generate",
+  'concurrency': "Requests in flight per route"
+})
+def bench(c, baseline=None, output=None, reviews=200000, concurrency=8):
+  """Benchmark every API route against a generated temporary database"""
+  command = f"python benchmarks/api_suite.py --reviews {reviews} --concurrency {concurrency}"
+  if baseline:
+    command += f" --baseline {baseline}"
+  if output:
+    command += f" --output {output}"
+  c.run(command, pty=False)
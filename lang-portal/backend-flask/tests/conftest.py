@@ -102,6 +102,8 @@ def app():
     # Clean up the test database
     os.close(db_fd)
     os.unlink(db_path)
+    if os.path.exists(db_path + '.migrate.lock'):
+        os.unlink(db_path + '.migrate.lock')
 
 @pytest.fixture
 def client(app):
@@ -110,3 +112,31 @@ def client(app):
 @pytest.fixture
 def runner(app):
     return app.test_cli_runner()
+
+@pytest.fixture
+def seeded_app():
+    # Build the database the same way `invoke init-db` does, so the schema
+    # matches what the routes query in development
+    db_fd, db_path = tempfile.mkstemp()
+
+    app = create_app({
+        'TESTING': True,
+        'DATABASE': db_path,
+        # Tests switch the query log on through /api/debug/query-log
+        'DEBUG_ENDPOINTS': True
+    })
+
+    with app.app_context():
+        app.db.init(app)
+
+    yield app
+
+    app.db.close_all()
+    os.close(db_fd)
+    for path in (db_path, db_path + '-wal', db_path + '-shm', db_path + '.migrate.lock'):
+        if os.path.exists(path):
+            os.unlink(path)
+
+@pytest.fixture
+def seeded_client(seeded_app):
+    return seeded_app.test_client()
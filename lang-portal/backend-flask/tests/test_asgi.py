@@ -0,0 +1,128 @@
+import asyncio
+import json
+import threading
+
+from lib.asgi import AsgiAdapter, build_environ
+
+async def call(adapter, method, path, body=b'', content_type='application/json', gate=None, disconnect=False):
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'query_string': query.encode(),
+        'headers': [(b'content-type', content_type.encode()), (b'content-length', str(len(body)).encode())],
+    }
+    # Deliver the body in two chunks to exercise more_body
+    messages = [
+        {'type': 'http.request', 'body': body[:3], 'more_body': True},
+        {'type': 'http.disconnect'} if disconnect else {'type': 'http.request', 'body': body[3:], 'more_body': False},
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        # A gate stands in for a slow client
+        if gate is not None:
+            await gate.wait()
+        sent.append(message)
+
+    await adapter(scope, receive, send)
+    if disconnect:
+        return sent
+    assert sent[0]['type'] == 'http.response.start'
+    assert sent[-1]['type'] == 'http.response.body' and not sent[-1]['more_body']
+    return sent[0]['status'], dict(sent[0]['headers']), b''.join(m['body'] for m in sent[1:])
+
+def count_reviews(app, session_id):
+    with app.app_context():
+        count = app.db.get().execute(
+            'SELECT COUNT(*) FROM word_review_items WHERE session_id = ?', (session_id,)
+        ).fetchone()[0]
+        app.db.close()
+    return count
+
+def test_build_environ_headers():
+    environ = build_environ({
+        'type': 'http', 'method': 'GET', 'path': '/api/words/é', 'query_string': b'page=2',
+        'headers': [(b'accept', b'a'), (b'accept', b'b'), (b'content-type', b'text/plain')],
+    }, b'')
+    assert environ['PATH_INFO'] == '/api/words/é'.encode('utf-8').decode('latin-1')
+    assert environ['QUERY_STRING'] == 'page=2'
+    assert environ['HTTP_ACCEPT'] == 'a,b'
+    assert environ['CONTENT_TYPE'] == 'text/plain'
+
+def test_same_responses_as_flask(seeded_app):
+    adapter = AsgiAdapter(seeded_app, read_workers=2)
+    try:
+        for path in ('/api/words?page=2', '/api/groups', '/api/dashboard/quick-stats', '/api/words/99999'):
+            expected = seeded_app.test_client().get(path)
+            status, headers, body = asyncio.run(call(adapter, 'GET', path))
+            assert status == expected.status_code
+            assert json.loads(body) == expected.get_json()
+            assert headers[b'content-type'] == b'application/json'
+    finally:
+        adapter.shutdown()
+
+def test_writes_run_on_one_thread(seeded_app):
+    threads = set()
+
+    @seeded_app.before_request
+    def record_thread():
+        from flask import request
+        if request.method == 'POST':
+            threads.add(threading.current_thread().name)
+
+    adapter = AsgiAdapter(seeded_app, read_workers=4)
+    session_id = seeded_app.test_client().post('/api/study-sessions', json={'group_id': 1, 'activity_id': 1}).get_json()['id']
+    threads.clear()
+
+    async def main():
+        body = json.dumps({'reviews': [{'word_id': 1, 'is_correct': True}]}).encode()
+        return await asyncio.gather(*(
+            call(adapter, 'POST', f'/api/study-sessions/{session_id}/review', body) for _ in range(20)
+        ))
+
+    try:
+        results = asyncio.run(main())
+    finally:
+        adapter.shutdown()
+
+    assert [status for status, _, _ in results] == [201] * 20
+    assert len(threads) == 1 and threads.pop().startswith('sqlite-write')
+    assert count_reviews(seeded_app, session_id) == 20
+
+def test_slow_client_does_not_hold_the_writer(seeded_app):
+    adapter = AsgiAdapter(seeded_app)
+    session_id = seeded_app.test_client().post('/api/study-sessions', json={'group_id': 1, 'activity_id': 1}).get_json()['id']
+    body = json.dumps({'reviews': [{'word_id': 1, 'is_correct': True}]}).encode()
+    path = f'/api/study-sessions/{session_id}/review'
+
+    async def main():
+        gate = asyncio.Event()
+        slow = asyncio.ensure_future(call(adapter, 'POST', path, body, gate=gate))
+        # Finishes while the first response is still waiting to be sent
+        fast = await asyncio.wait_for(call(adapter, 'POST', path, body), timeout=5)
+        assert not slow.done()
+        gate.set()
+        return fast, await slow
+
+    try:
+        fast, slow = asyncio.run(main())
+    finally:
+        adapter.shutdown()
+    assert fast[0] == slow[0] == 201
+    assert count_reviews(seeded_app, session_id) == 2
+
+def test_disconnect_before_body_is_complete(seeded_app):
+    adapter = AsgiAdapter(seeded_app)
+    session_id = seeded_app.test_client().post('/api/study-sessions', json={'group_id': 1, 'activity_id': 1}).get_json()['id']
+    body = json.dumps({'reviews': [{'word_id': 1, 'is_correct': True}]}).encode()
+    try:
+        sent = asyncio.run(call(adapter, 'POST', f'/api/study-sessions/{session_id}/review', body, disconnect=True))
+    finally:
+        adapter.shutdown()
+    assert sent == []
+    assert count_reviews(seeded_app, session_id) == 0
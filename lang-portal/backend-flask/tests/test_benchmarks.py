@@ -0,0 +1,74 @@
+import os
+import sqlite3
+import tempfile
+
+import pytest
+
+from app import create_app
+from benchmarks.api_suite import ROUTES, compare, run_suite
+from benchmarks.datagen import generate
+
+@pytest.fixture
+def generated_db():
+    db_fd, database = tempfile.mkstemp(suffix='.db')
+    os.close(db_fd)
+    os.unlink(database)
+    conn = sqlite3.connect(database)
+    counts = generate(conn, words=400, groups=4, sessions=60, reviews=3000)
+    conn.close()
+    yield database, counts
+    for path in (database, database + '-wal', database + '-shm', database + '.migrate.lock'):
+        if os.path.exists(path):
+            os.unlink(path)
+
+def test_generated_data_is_consistent(generated_db):
+    database, counts = generated_db
+    assert counts == {'groups': 4, 'words': 400, 'study_sessions': 60, 'word_review_items': 3000}
+    conn = sqlite3.connect(database)
+    try:
+        assert conn.execute('SELECT words_count FROM groups ORDER BY id').fetchall() == [(100,)] * 4
+        assert conn.execute('SELECT total_words, total_sessions, total_reviews FROM dashboard_stats').fetchone() \
+            == (400, 60, 3000)
+        # Reviews only use words of their session's group
+        assert conn.execute('''
+            SELECT COUNT(*) FROM word_review_items wri
+            JOIN study_sessions s ON s.id = wri.session_id
+            LEFT JOIN word_groups wg ON wg.word_id = wri.word_id AND wg.group_id = s.group_id
+            WHERE wg.word_id IS NULL
+        ''').fetchone()[0] == 0
+        assert conn.execute('SELECT COUNT(*) FROM word_schedule').fetchone()[0] > 0
+    finally:
+        conn.close()
+
+def test_suite_reports_percentiles(generated_db):
+    database, _ = generated_db
+    app = create_app({'TESTING': True, 'DATABASE': database, 'RESPONSE_CACHE_ENABLED': False})
+    only = {'words', 'group_words', 'dashboard_quick_stats', 'review'}
+    results = run_suite(app, database, requests_per_route=20, concurrency=4, only=only)
+    app.db.close_all()
+
+    assert set(results) == only
+    for result in results.values():
+        assert result['requests'] == 20
+        assert result['errors'] == 0
+        assert 0 < result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+
+def test_every_route_is_benchmarked():
+    names = [name for name, _, _ in ROUTES]
+    assert len(names) == len(set(names))
+    assert {'words', 'study_sessions', 'dashboard_quick_stats', 'review'} <= set(names)
+
+def test_compare_flags_p95_regressions():
+    baseline = {'routes': {
+        'words': {'p95_ms': 10.0},
+        'word': {'p95_ms': 0.5},
+        'groups': {'p95_ms': 4.0},
+    }}
+    results = {
+        'words': {'p95_ms': 12.5},   # 25% slower
+        'word': {'p95_ms': 0.9},     # 80% slower, but under a millisecond
+        'groups': {'p95_ms': 3.0},
+        'search': {'p95_ms': 50.0},  # not in the baseline
+    }
+    assert compare(results, baseline, tolerance=0.2) == {'words': (10.0, 12.5)}
+    assert compare(results, baseline, tolerance=0.3) == {}
@@ -0,0 +1,95 @@
+import json
+import time
+
+import pytest
+
+from lib.cache import LRUCache, FileStore, ResponseCache
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+def test_lru_entries_expire():
+    cache = LRUCache(max_entries=2, ttl=0)
+    cache.set('a', 1)
+    time.sleep(0.001)
+    assert cache.get('a') is None
+
+def test_file_store_roundtrip(tmp_path):
+    store = FileStore(str(tmp_path), ttl=60)
+    assert store.get('key') is None
+    store.set('key', {'body': '{}'})
+    assert store.get('key') == {'body': '{}'}
+
+    assert store.get_version('words') == 0
+    store.bump_version('words')
+    assert store.get_version('words') > 0
+
+def test_repeat_requests_are_served_from_cache(seeded_client, seeded_app):
+    first = seeded_client.get('/api/groups')
+    assert first.status_code == 200
+    assert first.headers['ETag']
+    misses = seeded_app.response_cache.misses
+
+    second = seeded_client.get('/api/groups')
+    assert second.get_json() == first.get_json()
+    assert second.headers['ETag'] == first.headers['ETag']
+    assert seeded_app.response_cache.misses == misses
+    assert seeded_app.response_cache.hits >= 1
+
+def test_query_args_are_normalized(seeded_client, seeded_app):
+    seeded_client.get('/api/groups?sort_by=name&order=desc')
+    misses = seeded_app.response_cache.misses
+    seeded_client.get('/api/groups?order=desc&sort_by=name')
+    assert seeded_app.response_cache.misses == misses
+
+def test_if_none_match_returns_304(seeded_client):
+    etag = seeded_client.get('/api/study-activities').headers['ETag']
+    response = seeded_client.get('/api/study-activities', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+def test_add_word_invalidates_cached_word(seeded_client, seeded_app):
+    seeded_client.get('/api/words/1')
+    misses = seeded_app.response_cache.misses
+
+    response = seeded_client.post('/api/words', json={
+        'french': 'hibou', 'english': 'owl', 'gender': 'masculine', 'parts': {}
+    })
+    assert response.status_code == 201
+
+    seeded_client.get('/api/words/1')
+    assert seeded_app.response_cache.misses == misses + 1
+
+def test_import_invalidates_group_counts(seeded_client, seeded_app, tmp_path):
+    before = seeded_client.get('/api/groups/1').get_json()
+
+    path = tmp_path / 'words.json'
+    path.write_text(json.dumps([
+        {'french': 'hibou', 'english': 'owl', 'gender': 'masculine', 'parts': {}}
+    ]), encoding='utf-8')
+    with seeded_app.app_context():
+        cursor = seeded_app.db.get().cursor()
+        seeded_app.db.import_word_json(cursor, 'Core Verbs', str(path))
+
+    after = seeded_client.get('/api/groups/1').get_json()
+    assert after['word_count'] == before['word_count'] + 1
+
+def test_errors_are_not_cached(seeded_client, seeded_app):
+    assert seeded_client.get('/api/words/99999').status_code == 404
+    assert len(seeded_app.response_cache.local) == 0
+
+def test_shared_store_versions_invalidate_other_processes(tmp_path):
+    store = FileStore(str(tmp_path), ttl=60)
+    worker_a = ResponseCache(store=store)
+    worker_b = ResponseCache(store=FileStore(str(tmp_path), ttl=60))
+
+    assert worker_a._version('words') == worker_b._version('words')
+    worker_a.invalidate('words')
+    assert worker_a._version('words') == worker_b._version('words') != 0
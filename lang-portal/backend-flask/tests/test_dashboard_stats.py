@@ -0,0 +1,79 @@
+import json
+
+from lib.stats import rebuild_dashboard_stats
+
+def create_session(client, group_id=1):
+    response = client.post('/api/study-sessions', json={'group_id': group_id, 'activity_id': 1})
+    assert response.status_code == 201
+    return response.get_json()['id']
+
+def submit(client, session_id, reviews):
+    response = client.post(f'/api/study-sessions/{session_id}/review', json={'reviews': reviews})
+    assert response.status_code == 201
+
+def raw_stats(app):
+    with app.app_context():
+        conn = app.db.get()
+        reviews, correct, studied = conn.execute('''
+            SELECT COUNT(*), COALESCE(SUM(is_correct = 1), 0), COUNT(DISTINCT word_id)
+            FROM word_review_items
+        ''').fetchone()
+        sessions = conn.execute('SELECT COUNT(*) FROM study_sessions').fetchone()[0]
+        words = conn.execute('SELECT COUNT(*) FROM words').fetchone()[0]
+    return reviews, correct, studied, sessions, words
+
+def test_stats_follow_review_inserts(seeded_client, seeded_app):
+    session_id = create_session(seeded_client)
+    submit(seeded_client, session_id, [
+        {'word_id': 1, 'is_correct': True},
+        {'word_id': 1, 'is_correct': False},
+        {'word_id': 2, 'is_correct': True},
+    ])
+
+    progress = seeded_client.get('/api/dashboard/study-progress').get_json()['study_progress']
+    assert progress == {'total_words_studied': 2, 'total_available_words': 94}
+
+    stats = seeded_client.get('/api/dashboard/quick-stats').get_json()
+    assert stats == {'total_words_studied': 2, 'total_sessions': 1, 'success_rate': 66.7}
+
+    with seeded_app.app_context():
+        rows = seeded_app.db.get().execute(
+            'SELECT word_id, correct_count, wrong_count FROM word_reviews ORDER BY word_id'
+        ).fetchall()
+    assert [tuple(row) for row in rows] == [(1, 1, 1), (2, 1, 0)]
+
+def test_stats_follow_reset(seeded_client):
+    session_id = create_session(seeded_client)
+    submit(seeded_client, session_id, [{'word_id': 3, 'is_correct': True}])
+
+    assert seeded_client.post('/api/study-sessions/reset').status_code == 200
+
+    stats = seeded_client.get('/api/dashboard/quick-stats').get_json()
+    assert stats == {'total_words_studied': 0, 'total_sessions': 0, 'success_rate': 0}
+
+def test_rebuild_matches_incremental_rollup(seeded_client, seeded_app):
+    for group_id in (1, 2):
+        session_id = create_session(seeded_client, group_id)
+        submit(seeded_client, session_id, [
+            {'word_id': word_id, 'is_correct': word_id % 3 != 0} for word_id in range(1, 20)
+        ])
+
+    with seeded_app.app_context():
+        conn = seeded_app.db.get()
+        before = dict(conn.execute('SELECT * FROM dashboard_stats').fetchone())
+        # Simulate drift, then repair it
+        conn.execute('UPDATE dashboard_stats SET total_reviews = 0, words_studied = 0')
+        conn.commit()
+        rebuild_dashboard_stats(conn)
+        after = dict(conn.execute('SELECT * FROM dashboard_stats').fetchone())
+
+    assert before == after
+    reviews, correct, studied, sessions, words = raw_stats(seeded_app)
+    assert after == {
+        'id': 1,
+        'total_words': words,
+        'words_studied': studied,
+        'total_sessions': sessions,
+        'total_reviews': reviews,
+        'correct_reviews': correct
+    }
@@ -0,0 +1,115 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import pytest
+from flask import Flask
+
+from lib.db import Db, PoolTimeoutError
+
+@pytest.fixture
+def db_path():
+    db_fd, path = tempfile.mkstemp()
+    yield path
+    os.close(db_fd)
+    for p in (path, path + '-wal', path + '-shm', path + '.migrate.lock'):
+        if os.path.exists(p):
+            os.unlink(p)
+
+def test_connections_use_wal_and_tuned_pragmas(db_path):
+    db = Db(database=db_path)
+    app = Flask(__name__)
+    with app.app_context():
+        conn = db.get()
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+        assert conn.execute('PRAGMA foreign_keys').fetchone()[0] == 1
+        assert conn.execute('PRAGMA cache_size').fetchone()[0] == -16000
+    db.close_all()
+
+def test_connections_are_reused_across_app_contexts(db_path):
+    db = Db(database=db_path, pool_size=2)
+    app = Flask(__name__)
+    with app.app_context():
+        first = db.get()
+        db.close()
+    with app.app_context():
+        assert db.get() is first
+        db.close()
+
+    stats = db.pool_stats()['writer']
+    assert stats['open'] == 1
+    assert stats['checkouts'] == 2
+    assert stats['in_use'] == 0
+    db.close_all()
+
+def test_release_rolls_back_open_transaction(db_path):
+    db = Db(database=db_path, pool_size=1)
+    app = Flask(__name__)
+    with app.app_context():
+        db.get().execute('CREATE TABLE t (x INTEGER)')
+        db.commit()
+        db.get().execute('INSERT INTO t VALUES (1)')
+        db.close()
+    with app.app_context():
+        assert db.get().execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+        db.close()
+    db.close_all()
+
+def test_pool_is_bounded(db_path):
+    db = Db(database=db_path, pool_size=1, pool_timeout=0.05)
+    held = db.pool.acquire()
+
+    with pytest.raises(PoolTimeoutError):
+        db.pool.acquire()
+    assert db.pool_stats()['writer']['timeouts'] == 1
+
+    # A waiter is handed the connection as soon as it is released
+    result = {}
+    db.pool.timeout = 2
+    waiter = threading.Thread(target=lambda: result.setdefault('conn', db.pool.acquire()))
+    waiter.start()
+    db.pool.release(held)
+    waiter.join()
+    assert result['conn'] is held
+    db.pool.release(held)
+    db.close_all()
+
+def test_close_all_closes_checked_out_connections_on_release(db_path):
+    db = Db(database=db_path, pool_size=2)
+    held = db.pool.acquire()
+    idle = db.pool.acquire()
+    db.pool.release(idle)
+
+    db.close_all()
+    assert db.pool_stats()['writer']['open'] == 1
+    db.pool.release(held)
+    with pytest.raises(sqlite3.ProgrammingError):
+        held.execute('SELECT 1')
+    assert db.pool_stats()['writer']['open'] == 0
+
+    # The pool still opens fresh connections afterwards
+    conn = db.pool.acquire()
+    assert conn is not held
+    db.pool.release(conn)
+    db.close_all()
+
+def test_get_requests_use_read_only_connections(seeded_app):
+    @seeded_app.route('/_test/write', methods=['GET', 'POST'])
+    def write():
+        cursor = seeded_app.db.cursor()
+        try:
+            cursor.execute("INSERT INTO groups (name) VALUES ('x')")
+        except sqlite3.OperationalError:
+            return 'readonly'
+        seeded_app.db.rollback()
+        return 'writable'
+
+    client = seeded_app.test_client()
+    assert client.get('/_test/write').data == b'readonly'
+    assert client.post('/_test/write').data == b'writable'
+
+    stats = seeded_app.db.pool_stats()
+    assert stats['reader']['checkouts'] >= 1
+    assert stats['reader']['in_use'] == 0
+    assert stats['writer']['in_use'] == 0
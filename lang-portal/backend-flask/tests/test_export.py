@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+
+from lib.export import DATASETS, export_chunks
+
+def ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+def add_reviews(client, reviews):
+    session_id = client.post('/api/study-sessions', json={'group_id': 1, 'activity_id': 1}).get_json()['id']
+    client.post(f'/api/study-sessions/{session_id}/review', json={'reviews': reviews})
+    return session_id
+
+def test_export_words_ndjson(seeded_client):
+    response = seeded_client.get('/api/export/words?batch_size=7')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.is_streamed
+    words = ndjson(response)
+    assert len(words) == 94
+    assert [word['id'] for word in words] == sorted(word['id'] for word in words)
+    assert set(words[0]) == {'id', 'french', 'english', 'gender', 'type', 'parts'}
+    assert isinstance(words[0]['parts'], dict)
+
+def test_export_words_csv(seeded_client):
+    response = seeded_client.get('/api/export/words?format=csv&after_id=90')
+    assert response.mimetype == 'text/csv'
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [row['id'] for row in rows] == ['91', '92', '93', '94']
+    assert isinstance(json.loads(rows[0]['parts']), dict)
+
+def test_export_groups_and_sessions(seeded_client):
+    groups = ndjson(seeded_client.get('/api/export/groups'))
+    assert [(group['id'], group['words_count']) for group in groups] == [(1, 34), (2, 30), (3, 30)]
+
+    session_id = add_reviews(seeded_client, [{'word_id': 1, 'is_correct': True}])
+    sessions = ndjson(seeded_client.get('/api/export/study-sessions'))
+    assert sessions[-1]['id'] == session_id
+
+def test_incremental_review_export(seeded_client):
+    add_reviews(seeded_client, [
+        {'word_id': 1, 'is_correct': True, 'created_at': '2025-01-01 10:00:00'},
+        {'word_id': 2, 'is_correct': False, 'created_at': '2025-02-01 10:00:00'},
+    ])
+    items = ndjson(seeded_client.get('/api/export/review-items'))
+    assert len(items) == 2
+
+    recent = ndjson(seeded_client.get('/api/export/review-items?since=2025-01-15'))
+    assert [item['word_id'] for item in recent] == [2]
+
+    add_reviews(seeded_client, [{'word_id': 3, 'is_correct': True}])
+    newer = ndjson(seeded_client.get(f"/api/export/review-items?after_id={items[-1]['id']}"))
+    assert [item['word_id'] for item in newer] == [3]
+
+def test_export_errors(seeded_client):
+    assert seeded_client.get('/api/export/kanji').status_code == 400
+    assert seeded_client.get('/api/export/words?format=xml').status_code == 400
+    assert seeded_client.get('/api/export/words?since=2025-01-01').status_code == 400
+    assert seeded_client.get('/api/export/words?batch_size=0').status_code == 400
+
+def test_chunks_follow_batch_size(seeded_app):
+    with seeded_app.app_context():
+        conn = seeded_app.db.get()
+        chunks = list(export_chunks(conn, DATASETS['words'], batch_size=10))
+        seeded_app.db.close()
+    assert len(chunks) == 10
+    assert all(chunk.count('\n') == 10 for chunk in chunks[:-1])
+
+def test_since_uses_the_timestamp_index(seeded_app):
+    from lib.query_plan import explain
+    sql, params = DATASETS['review-items'].query(since='2025-01-01')
+    with seeded_app.app_context():
+        plan = explain(seeded_app.db.get(), sql, params)
+        seeded_app.db.close()
+    assert any('idx_word_review_items_created_at' in detail for detail in plan)
+    assert not any('TEMP B-TREE' in detail for detail in plan)
+
+def test_since_resumes_in_timestamp_order(seeded_client):
+    # Inserted newest first, so ids run against the timestamp order
+    add_reviews(seeded_client, [
+        {'word_id': 1, 'is_correct': True, 'created_at': '2025-03-01 10:00:00'},
+        {'word_id': 2, 'is_correct': True, 'created_at': '2025-02-01 10:00:00'},
+        {'word_id': 3, 'is_correct': True, 'created_at': '2025-02-01 10:00:00'},
+    ])
+    items = ndjson(seeded_client.get('/api/export/review-items?since=2025-01-01'))
+    assert [item['word_id'] for item in items] == [2, 3, 1]
+
+    rest = ndjson(seeded_client.get(f"/api/export/review-items?since=2025-01-01&after_id={items[0]['id']}"))
+    assert [item['word_id'] for item in rest] == [3, 1]
+    assert ndjson(seeded_client.get(f"/api/export/review-items?since=2025-01-01&after_id={items[-1]['id']}")) == []
+
+def test_since_resume_uses_the_timestamp_index(seeded_app):
+    from lib.query_plan import explain
+    sql, params = DATASETS['review-items'].query(since='2025-01-01', after_id=1)
+    with seeded_app.app_context():
+        plan = explain(seeded_app.db.get(), sql, params)
+        seeded_app.db.close()
+    assert any('idx_word_review_items_created_at' in detail for detail in plan)
+    assert not any('TEMP B-TREE' in detail for detail in plan)
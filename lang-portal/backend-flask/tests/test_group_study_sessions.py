@@ -0,0 +1,56 @@
+def add_session(app, group_id, start_time, reviews=()):
+    with app.app_context():
+        conn = app.db.get()
+        cursor = conn.execute('''
+            INSERT INTO study_sessions (group_id, activity_id, start_time)
+            VALUES (?, 1, ?)
+        ''', (group_id, start_time))
+        session_id = cursor.lastrowid
+        conn.executemany('''
+            INSERT INTO word_review_items (session_id, word_id, is_correct, created_at)
+            VALUES (?, 1, ?, ?)
+        ''', [(session_id, is_correct, created_at) for is_correct, created_at in reviews])
+        conn.commit()
+        app.db.close()
+    return session_id
+
+def test_group_sessions_summary(seeded_app):
+    with_reviews = add_session(seeded_app, 2, '2025-03-01 10:00:00', [
+        (1, '2025-03-01 10:05:00'),
+        (0, '2025-03-01 10:12:00'),
+    ])
+    without_reviews = add_session(seeded_app, 2, '2025-03-02 09:00:00')
+    add_session(seeded_app, 1, '2025-03-03 09:00:00', [(1, '2025-03-03 09:01:00')])
+
+    response = seeded_app.test_client().get('/api/groups/2/study-sessions')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['total_pages'] == 1
+
+    sessions = {session['id']: session for session in data['study_sessions']}
+    assert list(sessions) == [without_reviews, with_reviews]  # newest first
+    assert sessions[with_reviews]['end_time'] == '2025-03-01 10:12:00'
+    assert sessions[with_reviews]['review_items_count'] == 2
+    assert sessions[with_reviews]['correct_count'] == 1
+    assert sessions[without_reviews]['end_time'] == '2025-03-02 09:30:00'
+    assert sessions[without_reviews]['review_items_count'] == 0
+    assert sessions[without_reviews]['activity_name'] is not None
+
+def test_group_sessions_sort_by_review_count(seeded_client, seeded_app):
+    busy = add_session(seeded_app, 2, '2025-03-01 10:00:00', [(1, '2025-03-01 10:05:00')] * 3)
+    add_session(seeded_app, 2, '2025-03-02 10:00:00')
+
+    response = seeded_client.get('/api/groups/2/study_sessions?sort_by=reviewItemsCount&order=desc')
+    assert response.get_json()['study_sessions'][0]['id'] == busy
+
+def test_group_sessions_statement_count_is_constant(seeded_app):
+    for day in range(1, 10):
+        add_session(seeded_app, 2, f'2025-03-0{day} 10:00:00', [(1, f'2025-03-0{day} 10:05:00')])
+
+    statements = []
+    seeded_app.db.close_all()
+    seeded_app.db.connect_hooks.append(lambda conn: conn.set_trace_callback(statements.append))
+    seeded_app.test_client().get('/api/groups/2/study_sessions')
+
+    queries = [s for s in statements if s.lstrip().upper().startswith(('SELECT', 'WITH'))]
+    assert len(queries) == 2  # the page count and the page itself
@@ -0,0 +1,45 @@
+from lib.query_plan import explain
+from lib.stats import rebuild_group_words_count
+
+def words_counts(app):
+    with app.app_context():
+        conn = app.db.get()
+        counts = dict(conn.execute('SELECT id, words_count FROM groups').fetchall())
+        app.db.close()
+    return counts
+
+def test_seeded_counts(seeded_app):
+    assert words_counts(seeded_app) == {1: 34, 2: 30, 3: 30}
+
+def test_triggers_follow_word_groups(seeded_app):
+    with seeded_app.app_context():
+        conn = seeded_app.db.get()
+        conn.execute('INSERT INTO word_groups (word_id, group_id) VALUES (1, 2)')
+        conn.execute('DELETE FROM word_groups WHERE word_id = 40 AND group_id = 2')
+        conn.execute('UPDATE word_groups SET group_id = 1 WHERE word_id = 80 AND group_id = 3')
+        conn.commit()
+        seeded_app.db.close()
+
+    assert words_counts(seeded_app) == {1: 35, 2: 30, 3: 29}
+
+def test_rebuild_repairs_drift(seeded_app):
+    with seeded_app.app_context():
+        conn = seeded_app.db.get()
+        conn.execute('UPDATE groups SET words_count = 0 WHERE id = 2')
+        conn.commit()
+        assert rebuild_group_words_count(conn) == {2: (0, 30)}
+        assert rebuild_group_words_count(conn) == {}
+        seeded_app.db.close()
+
+    assert words_counts(seeded_app) == {1: 34, 2: 30, 3: 30}
+
+def test_groups_sorted_by_cached_count(seeded_client, seeded_app):
+    response = seeded_client.get('/api/groups?sort_by=words_count&order=desc')
+    groups = response.get_json()['groups']
+    assert [(group['id'], group['word_count']) for group in groups] == [(1, 34), (3, 30), (2, 30)]
+
+    with seeded_app.app_context():
+        plan = explain(seeded_app.db.get(), 'SELECT id FROM groups g ORDER BY g.words_count DESC, g.id DESC LIMIT 10')
+        seeded_app.db.close()
+    assert any('idx_groups_words_count_id' in detail for detail in plan)
+    assert not any('TEMP B-TREE' in detail for detail in plan)
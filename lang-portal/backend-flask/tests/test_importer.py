@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from lib.importer import iter_json_array, import_words
+
+def write_json(tmp_path, data, name='words.json'):
+    path = tmp_path / name
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+    return str(path)
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64 * 1024])
+def test_iter_json_array_matches_json_load(chunk_size):
+    expected = json.load(open('seed/data_verbs.json', encoding='utf-8'))
+    assert list(iter_json_array('seed/data_verbs.json', chunk_size=chunk_size)) == expected
+
+def test_iter_json_array_handles_scalars_across_chunks(tmp_path):
+    path = write_json(tmp_path, [12345, "ab", [1, 2], {}])
+    assert list(iter_json_array(path, chunk_size=2)) == [12345, "ab", [1, 2], {}]
+
+def test_iter_json_array_rejects_non_arrays(tmp_path):
+    path = write_json(tmp_path, {"french": "chat"})
+    with pytest.raises(ValueError):
+        list(iter_json_array(path))
+
+def test_seed_import_sets_words_count(seeded_app):
+    with seeded_app.app_context():
+        cursor = seeded_app.db.get().cursor()
+        cursor.execute('SELECT name, words_count FROM groups ORDER BY id')
+        assert [tuple(row) for row in cursor.fetchall()] == [
+            ('Core Verbs', 34), ('Basic Nouns', 30), ('Core Adjectives', 30)
+        ]
+
+def test_import_dedupes_and_groups_existing_words(seeded_app, tmp_path):
+    path = write_json(tmp_path, [
+        {"french": "hibou", "english": "owl", "gender": "masculine", "parts": {"plural": "hiboux"}},
+        {"french": "hibou", "english": "owl", "gender": "masculine", "parts": {"plural": "hiboux"}},
+        {"french": "voiture", "english": "car", "gender": "feminine", "parts": {"plural": "voitures"}},
+    ])
+
+    with seeded_app.app_context():
+        conn = seeded_app.db.get()
+        stats = import_words(conn, path, group_name='Animals and Cars', batch_size=2)
+
+        # voiture is already in the seed data, the second hibou is a duplicate
+        assert stats['read'] == 3
+        assert stats['inserted'] == 1
+        assert stats['duplicates'] == 2
+        assert stats['grouped'] == 2
+        assert stats['rows_per_sec'] > 0
+
+        count = conn.execute('SELECT words_count FROM groups WHERE id = ?', (stats['group_id'],)).fetchone()[0]
+        assert count == 2
+        assert conn.execute("SELECT COUNT(*) FROM words WHERE french = 'voiture'").fetchone()[0] == 1
+
+        # Importing the same file again changes nothing
+        again = import_words(conn, path, group_name='Animals and Cars')
+        assert again['inserted'] == 0
+        assert again['grouped'] == 0
+        assert conn.execute('SELECT COUNT(*) FROM groups WHERE name = ?', ('Animals and Cars',)).fetchone()[0] == 1
+
+def test_import_rolls_back_on_bad_row(seeded_app, tmp_path):
+    path = write_json(tmp_path, [
+        {"french": "brumeux", "english": "foggy", "parts": {}},
+        {"french": "cassé", "parts": {}},
+    ])
+
+    with seeded_app.app_context():
+        conn = seeded_app.db.get()
+        with pytest.raises(KeyError):
+            import_words(conn, path, group_name='Broken', batch_size=1)
+        assert conn.execute("SELECT COUNT(*) FROM words WHERE french = 'brumeux'").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM groups WHERE name = 'Broken'").fetchone()[0] == 0
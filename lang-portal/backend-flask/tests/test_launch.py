@@ -0,0 +1,101 @@
+import time
+from datetime import datetime, timedelta
+
+from lib.query_log import logger as sql_logger
+from tests.test_query_log import capture_sql
+
+def test_launch_lists_groups_with_word_counts(seeded_client):
+    response = seeded_client.get('/api/study-activities/1/launch')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['activity']['id'] == 1
+    assert [(group['id'], group['words_count']) for group in data['groups']] == [(1, 34), (2, 30), (3, 30)]
+    assert 'words' not in data
+
+def test_launch_bundle_for_a_group(seeded_client):
+    data = seeded_client.get('/api/study-activities/1/launch?group_id=2&fields=id,french&limit=5').get_json()
+    assert data['group'] == {'id': 2, 'name': 'Basic Nouns', 'words_count': 30}
+    assert [word['id'] for word in data['words']] == [35, 36, 37, 38, 39]
+    assert set(data['words'][0]) == {'id', 'french'}
+    assert data['words_truncated'] is True
+
+    data = seeded_client.get('/api/study-activities/1/launch?group_id=2').get_json()
+    assert len(data['words']) == 30
+    assert data['words_truncated'] is False
+
+def test_launch_etag(seeded_client):
+    first = seeded_client.get('/api/study-activities/1/launch?group_id=2')
+    etag = first.headers['ETag']
+    again = seeded_client.get('/api/study-activities/1/launch?group_id=2', headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.get_data() == b''
+
+    seeded_client.post('/api/words', json={'french': 'arbre', 'english': 'tree', 'gender': 'masculine', 'parts': {}})
+    other_group = seeded_client.get('/api/study-activities/1/launch?group_id=3', headers={'If-None-Match': etag})
+    assert other_group.status_code == 200
+    assert other_group.headers['ETag'] != etag
+
+def test_launch_reads_in_one_transaction(seeded_client):
+    handler = capture_sql()
+    try:
+        seeded_client.post('/api/debug/query-log', json={'enabled': True})
+        seeded_client.get('/api/study-activities/1/launch?group_id=2')
+    finally:
+        sql_logger.removeHandler(handler)
+    statements = [r['statement'] for r in handler.records if r['path'].endswith('/launch')]
+    assert statements[0] == 'BEGIN'
+    assert statements[-1] == 'COMMIT'
+    assert len(statements) == 5
+
+def test_post_launch_creates_then_resumes_a_session(seeded_client):
+    created = seeded_client.post('/api/study-activities/2/launch', json={'group_id': 1, 'fields': 'id'})
+    assert created.status_code == 201
+    data = created.get_json()
+    assert data['session']['resumed'] is False
+    assert len(data['words']) == 34
+    assert data['activity']['id'] == 2
+
+    resumed = seeded_client.post('/api/study-activities/2/launch', json={'group_id': 1})
+    assert resumed.status_code == 200
+    assert resumed.get_json()['session'] == {**data['session'], 'resumed': True}
+
+    # Another group or activity gets its own session
+    other = seeded_client.post('/api/study-activities/1/launch', json={'group_id': 1})
+    assert other.status_code == 201
+    assert other.get_json()['session']['id'] != data['session']['id']
+
+    sessions = seeded_client.get('/api/study-sessions?group_id=1').get_json()
+    assert len(sessions['study_sessions']) == 2
+
+def test_resume_window_uses_local_time(seeded_app, monkeypatch):
+    # Eight hours ahead of UTC: a session started 30 local hours ago is
+    # only 22 UTC hours old, but must not be resumed
+    monkeypatch.setenv('TZ', 'XXX-8')
+    time.tzset()
+    try:
+        start_time = (datetime.now() - timedelta(hours=30)).strftime('%Y-%m-%d %H:%M:%S')
+        with seeded_app.app_context():
+            cursor = seeded_app.db.cursor()
+            cursor.execute('INSERT INTO study_sessions (group_id, activity_id, start_time) VALUES (1, 2, ?)',
+                           (start_time,))
+            cursor.connection.commit()
+
+        client = seeded_app.test_client()
+        created = client.post('/api/study-activities/2/launch', json={'group_id': 1})
+        assert created.status_code == 201
+        assert created.get_json()['session']['start_time'] != start_time
+        assert client.post('/api/study-activities/2/launch', json={'group_id': 1}).status_code == 200
+    finally:
+        monkeypatch.delenv('TZ')
+        time.tzset()
+
+def test_launch_errors(seeded_client):
+    assert seeded_client.get('/api/study-activities/99/launch').status_code == 404
+    assert seeded_client.get('/api/study-activities/1/launch?group_id=99').status_code == 404
+    assert seeded_client.get('/api/study-activities/1/launch?group_id=x').status_code == 400
+    assert seeded_client.get('/api/study-activities/1/launch?group_id=1&limit=0').status_code == 400
+    assert seeded_client.get('/api/study-activities/1/launch?group_id=1&fields=kanji').status_code == 400
+    assert seeded_client.post('/api/study-activities/1/launch', json={}).status_code == 400
+    assert seeded_client.post('/api/study-activities/1/launch', json={'group_id': 99}).status_code == 404
+    assert seeded_client.post('/api/study-activities/1/launch', json=[1]).status_code == 400
+    assert seeded_client.post('/api/study-activities/1/launch', json='group_id').status_code == 400
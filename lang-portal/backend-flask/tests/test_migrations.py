@@ -0,0 +1,129 @@
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from app import create_app
+from lib.migrations import MigrationError, discover, migrate, pending, split_statements, status
+
+def write(directory, name, sql):
+    with open(os.path.join(directory, name), 'w') as file:
+        file.write(sql)
+
+def tables(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+def test_split_statements_keeps_triggers_whole():
+    statements = split_statements('''
+        -- leading comment
+        CREATE TABLE a (id INTEGER PRIMARY KEY, note TEXT DEFAULT 'x;y');
+        CREATE TRIGGER t AFTER INSERT ON a
+        BEGIN
+            UPDATE a SET note = 'z' WHERE id = NEW.id;
+        END;
+        INSERT INTO a (id) VALUES (1)
+    ''')
+    assert len(statements) == 3
+    assert statements[1].startswith('CREATE TRIGGER') and statements[1].endswith('END;')
+
+def test_migrate_applies_pending_once(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'test.db'))
+    applied = migrate(conn)
+    assert applied == [migration.name for migration in discover()]
+    assert {'words', 'study_sessions', 'dashboard_stats', 'schema_migrations'} <= tables(conn)
+
+    assert migrate(conn) == []
+    assert pending(conn) == []
+    assert not any(migration['modified'] for migration in status(conn))
+
+def test_failed_migration_keeps_nothing(tmp_path):
+    write(tmp_path, '001_a.sql', 'CREATE TABLE a (id INTEGER PRIMARY KEY);')
+    write(tmp_path, '002_b.sql', 'CREATE TABLE b (id INTEGER PRIMARY KEY); INSERT INTO missing VALUES (1);')
+    conn = sqlite3.connect(str(tmp_path / 'test.db'))
+
+    with pytest.raises(MigrationError, match='002_b.sql'):
+        migrate(conn, str(tmp_path))
+    assert tables(conn) == set()
+
+    write(tmp_path, '002_b.sql', 'CREATE TABLE b (id INTEGER PRIMARY KEY);')
+    assert migrate(conn, str(tmp_path)) == ['001_a.sql', '002_b.sql']
+
+def test_legacy_database_is_baselined(tmp_path):
+    # Built by the old init_db: tables exist, but no schema_migrations
+    conn = sqlite3.connect(str(tmp_path / 'test.db'))
+    for migration in discover()[:3]:
+        conn.executescript(migration.read())
+    conn.execute("INSERT INTO study_sessions (group_id, activity_id, start_time) VALUES (1, 1, '2025-01-01')")
+    conn.commit()
+
+    applied = migrate(conn)
+    assert applied == [migration.name for migration in discover()[3:]]
+    # 003 would have dropped the session
+    assert conn.execute('SELECT COUNT(*) FROM study_sessions').fetchone()[0] == 1
+
+def test_concurrent_runners_migrate_once(tmp_path):
+    db_path = str(tmp_path / 'test.db')
+    results = []
+
+    def run():
+        conn = sqlite3.connect(db_path, timeout=10)
+        results.append(migrate(conn))
+        conn.close()
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    applied = [names for names in results if names]
+    assert len(applied) == 1
+    assert applied[0] == [migration.name for migration in discover()]
+
+def test_restart_keeps_study_data(tmp_path):
+    db_path = str(tmp_path / 'test.db')
+    app = create_app({'TESTING': True, 'DATABASE': db_path})
+    session_id = app.test_client().post('/api/study-sessions', json={'group_id': 1, 'activity_id': 1}).get_json()['id']
+    app.db.close_all()
+
+    app = create_app({'TESTING': True, 'DATABASE': db_path})
+    with app.app_context():
+        row = app.db.cursor().execute('SELECT id FROM study_sessions WHERE id = ?', (session_id,)).fetchone()
+    app.db.close_all()
+    assert row is not None
+
+def test_existing_column_counts_as_added(tmp_path):
+    write(tmp_path, '001_a.sql', 'CREATE TABLE a (id INTEGER PRIMARY KEY, note TEXT);')
+    write(tmp_path, '002_b.sql', '-- already there on some databases\nALTER TABLE a ADD COLUMN note TEXT;')
+    conn = sqlite3.connect(str(tmp_path / 'test.db'))
+    assert migrate(conn, str(tmp_path)) == ['001_a.sql', '002_b.sql']
+
+def test_word_copies_are_merged_before_the_unique_index(tmp_path):
+    # A database seeded before the importer deduplicated: 012 is still pending
+    for migration in discover()[:-1]:
+        write(tmp_path, migration.name, migration.read())
+    conn = sqlite3.connect(str(tmp_path / 'test.db'))
+    migrate(conn, str(tmp_path))
+    conn.executescript('''
+        INSERT INTO groups (id, name) VALUES (1, 'Animals'), (2, 'Pets');
+        INSERT INTO words (id, french, english, gender, parts) VALUES
+            (1, 'chat', 'cat', 'masculine', '{}'),
+            (2, 'chat', 'cat', 'masculine', '{}'),
+            (3, 'chien', 'dog', 'masculine', '{}');
+        INSERT INTO word_groups (word_id, group_id) VALUES (1, 1), (2, 1), (2, 2), (3, 1);
+        INSERT INTO study_sessions (id, group_id, activity_id, start_time) VALUES (1, 1, 1, '2025-01-01');
+        INSERT INTO word_review_items (word_id, session_id, is_correct, created_at) VALUES
+            (1, 1, 1, '2025-01-01'), (2, 1, 0, '2025-01-02');
+    ''')
+    conn.commit()
+
+    assert migrate(conn) == [discover()[-1].name]
+    assert conn.execute('SELECT id FROM words ORDER BY id').fetchall() == [(1,), (3,)]
+    assert conn.execute('SELECT word_id, group_id FROM word_groups ORDER BY group_id, word_id').fetchall() == [
+        (1, 1), (3, 1), (1, 2)
+    ]
+    assert conn.execute('SELECT word_id, correct_count, wrong_count FROM word_reviews').fetchall() == [(1, 1, 1)]
+    assert conn.execute('SELECT words_count FROM groups ORDER BY id').fetchall() == [(2,), (1,)]
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("INSERT INTO words (french, english, gender, parts) VALUES ('chat', 'cat', 'masculine', '{}')")
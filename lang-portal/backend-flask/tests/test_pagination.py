@@ -0,0 +1,66 @@
+import pytest
+
+from lib.pagination import encode_cursor, decode_cursor, InvalidCursorError
+
+def collect_pages(client, url, key='words'):
+    items = []
+    cursor = ''
+    while True:
+        sep = '&' if '?' in url else '?'
+        response = client.get(f'{url}{sep}cursor={cursor}')
+        assert response.status_code == 200
+        data = response.get_json()
+        items.extend(data[key])
+        next_cursor = data['pagination']['next_cursor'] if 'pagination' in data else data['next_cursor']
+        if next_cursor is None:
+            return items
+        cursor = next_cursor
+
+def test_cursor_roundtrip():
+    cursor = encode_cursor('être', 42)
+    assert decode_cursor(cursor) == ('être', 42)
+
+def test_decode_rejects_garbage():
+    with pytest.raises(InvalidCursorError):
+        decode_cursor('not-a-cursor')
+
+@pytest.mark.parametrize('sort_value', [['a'], {'a': 1}])
+def test_decode_rejects_unbindable_sort_values(seeded_client, sort_value):
+    cursor = encode_cursor(sort_value, 1)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+    assert seeded_client.get(f'/api/words?cursor={cursor}').status_code == 400
+
+@pytest.mark.parametrize('sort_by,order', [('french', 'asc'), ('english', 'desc'), ('gender', 'asc')])
+def test_words_cursor_pages_match_offset_order(seeded_client, sort_by, order):
+    by_cursor = collect_pages(seeded_client, f'/api/words?sort_by={sort_by}&order={order}')
+
+    by_offset = []
+    for page in (1, 2):
+        data = seeded_client.get(f'/api/words?sort_by={sort_by}&order={order}&page={page}').get_json()
+        by_offset.extend(data['words'])
+
+    assert len(by_cursor) == 94
+    assert len({word['id'] for word in by_cursor}) == 94
+    assert [w[sort_by] for w in by_cursor] == [w[sort_by] for w in by_offset]
+
+def test_words_cursor_total_is_opt_in(seeded_client):
+    data = seeded_client.get('/api/words?cursor=').get_json()
+    assert 'total_words' not in data['pagination']
+    assert data['pagination']['has_more'] is True
+
+    data = seeded_client.get('/api/words?cursor=&include_total=true').get_json()
+    assert data['pagination']['total_words'] == 94
+
+def test_words_invalid_cursor(seeded_client):
+    response = seeded_client.get('/api/words?cursor=bogus')
+    assert response.status_code == 400
+
+def test_group_words_cursor(seeded_client):
+    words = collect_pages(seeded_client, '/api/groups/1/words?sort_by=english')
+    assert len(words) == 34
+    assert [w['english'] for w in words] == sorted(w['english'] for w in words)
+
+def test_group_words_cursor_rejects_unseekable_sort(seeded_client):
+    response = seeded_client.get('/api/groups/1/words?sort_by=correct_count&cursor=')
+    assert response.status_code == 400
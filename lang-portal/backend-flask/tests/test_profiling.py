@@ -0,0 +1,107 @@
+import os
+import re
+import tempfile
+
+import pytest
+
+from app import create_app
+from lib.profiling import RequestProfile
+
+def server_timing(response):
+    timings = {}
+    for entry in response.headers['Server-Timing'].split(', '):
+        name, *params = entry.split(';')
+        timings[name] = dict(param.split('=', 1) for param in params)
+    return timings
+
+@pytest.fixture
+def profiled_app():
+    db_fd, db_path = tempfile.mkstemp()
+    app = create_app({'TESTING': True, 'DATABASE': db_path, 'PROFILE_CPROFILE_ENABLED': True,
+                      'PROFILE_SQL_IN_HEADER': True})
+    with app.app_context():
+        app.db.init(app)
+    yield app
+    app.db.close_all()
+    os.close(db_fd)
+    for path in (db_path, db_path + '-wal', db_path + '-shm', db_path + '.migrate.lock'):
+        if os.path.exists(path):
+            os.unlink(path)
+
+def test_profile_keeps_the_slowest_statement():
+    profile = RequestProfile()
+    profile.add('SELECT 1', 0.002, 0.002)
+    profile.add('SELECT 2', 0.001, 0.001)
+    profile.add('SELECT 2', 0.004, 0.005)
+    assert profile.sql_time == pytest.approx(0.007)
+    assert (profile.slowest, profile.slowest_time) == ('SELECT 2', pytest.approx(0.005))
+
+def test_server_timing_counts_statements(seeded_client):
+    response = seeded_client.get('/api/study-sessions')
+    assert response.status_code == 200
+    timings = server_timing(response)
+    # the page count and the page itself
+    assert timings['sql']['desc'] == '"2 statements"'
+    assert float(timings['sql']['dur']) > 0
+    assert float(timings['app']['dur']) >= float(timings['sql']['dur'])
+    # Statement text stays out of the header unless PROFILE_SQL_IN_HEADER is set
+    assert 'desc' not in timings['sql-slowest']
+    assert float(timings['sql-slowest']['dur']) > 0
+
+def test_sql_in_header_is_opt_in(profiled_app):
+    header = profiled_app.test_client().get('/api/words/1').headers['Server-Timing']
+    # Placeholders, not the values bound to them
+    assert header.endswith(';desc="SELECT id, french, english, gender, parts FROM words WHERE id = ?"')
+
+def test_trigger_statements_are_not_counted(profiled_app):
+    client = profiled_app.test_client()
+    session_id = client.post('/api/study-sessions', json={'group_id': 1, 'activity_id': 1}).get_json()['id']
+    review = {'reviews': [{'word_id': 1, 'is_correct': True}]}
+    one = server_timing(client.post(f'/api/study-sessions/{session_id}/review', json=review))
+    # Word review items fire triggers that maintain the dashboard stats
+    review['reviews'] *= 3
+    three = server_timing(client.post(f'/api/study-sessions/{session_id}/review', json=review))
+    assert one['sql']['desc'] == three['sql']['desc']
+    assert one['sql-slowest']['desc'].startswith('"INSERT INTO word_review_items')
+
+def test_sql_time_covers_slow_statements(seeded_client, seeded_app):
+    with seeded_app.app_context():
+        conn = seeded_app.db.get()
+        conn.executemany(
+            "INSERT INTO words (french, english, gender, parts) VALUES (?, ?, 'masculine', '{}')",
+            [(f'mot{i}', f'word{i}') for i in range(5000)]
+        )
+        conn.commit()
+        seeded_app.db.close()
+    # A deep OFFSET steps over every skipped row inside SQLite
+    response = seeded_client.get('/api/words?sort_by=gender&page=90')
+    timings = server_timing(response)
+    assert float(timings['sql']['dur']) > 0.1
+    assert float(timings['sql-slowest']['dur']) > 0.5 * float(timings['sql']['dur'])
+
+def test_metrics_in_prometheus_format(seeded_client):
+    seeded_client.get('/api/words')
+    seeded_client.get('/api/words')
+    seeded_client.get('/no/such/page')
+    response = seeded_client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+
+    assert 'langportal_http_requests_total{method="GET",endpoint="get_words",status="200"} 2' in text
+    assert 'endpoint="unmatched",status="404"' in text
+    assert 'langportal_http_request_duration_seconds_count{method="GET",endpoint="get_words"} 2' in text
+    assert re.search(r'langportal_sql_statements_total\{endpoint="get_words"\} 4\n', text)
+    assert 'langportal_db_pool_connections{pool="reader",state="idle"}' in text
+    for line in text.splitlines():
+        assert line.startswith('#') or re.fullmatch(r'\w+(\{[^}]*\})? [0-9.e+-]+', line), line
+
+def test_cprofile_is_opt_in(seeded_client, profiled_app):
+    # Off unless the app enables it
+    response = seeded_client.get('/api/words?profile=1')
+    assert response.mimetype == 'application/json'
+
+    response = profiled_app.test_client().get('/api/words?profile=1')
+    assert response.mimetype == 'text/plain'
+    assert 'cumulative' in response.get_data(as_text=True)
+    assert 'Server-Timing' in response.headers
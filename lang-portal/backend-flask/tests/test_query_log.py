@@ -0,0 +1,75 @@
+import json
+import logging
+
+from app import create_app
+from lib.query_log import logger as sql_logger
+
+class Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(json.loads(record.getMessage()))
+
+def capture_sql():
+    handler = Capture()
+    sql_logger.addHandler(handler)
+    return handler
+
+def test_study_sessions_runs_no_schema_queries(seeded_client):
+    handler = capture_sql()
+    try:
+        seeded_client.post('/api/debug/query-log', json={'enabled': True, 'sample_rate': 1})
+        response = seeded_client.get('/api/study-sessions')
+        assert response.status_code == 200
+    finally:
+        sql_logger.removeHandler(handler)
+
+    statements = [r['statement'] for r in handler.records if r['path'] == '/api/study-sessions']
+    assert len(statements) == 2  # the page count and the page itself
+    assert not any('sqlite_master' in s or 'PRAGMA' in s for s in statements)
+
+def test_query_log_is_off_by_default_and_sampled(seeded_client):
+    handler = capture_sql()
+    try:
+        assert seeded_client.get('/api/debug/query-log').get_json() == {'enabled': False, 'sample_rate': 1.0}
+        seeded_client.get('/api/words')
+        assert handler.records == []
+
+        seeded_client.post('/api/debug/query-log', json={'enabled': True, 'sample_rate': 0})
+        seeded_client.get('/api/words')
+        assert handler.records == []
+
+        seeded_client.post('/api/debug/query-log', json={'sample_rate': 1})
+        seeded_client.get('/api/words')
+        assert handler.records
+        assert handler.records[0]['event'] == 'sql'
+        assert handler.records[0]['endpoint'] == 'get_words'
+    finally:
+        sql_logger.removeHandler(handler)
+
+def test_query_log_rejects_bad_sample_rate(seeded_client):
+    response = seeded_client.post('/api/debug/query-log', json={'sample_rate': 'often'})
+    assert response.status_code == 400
+
+def test_query_log_only_accepts_booleans(seeded_client):
+    for enabled in ('false', 'true', 1, 'yes'):
+        response = seeded_client.post('/api/debug/query-log', json={'enabled': enabled})
+        assert response.status_code == 400
+    assert seeded_client.post('/api/debug/query-log', json=[True]).status_code == 400
+    assert seeded_client.get('/api/debug/query-log').get_json()['enabled'] is False
+
+def test_debug_endpoints_are_opt_in(tmp_path):
+    app = create_app({'TESTING': True, 'DATABASE': str(tmp_path / 'test.db')})
+    client = app.test_client()
+    assert client.post('/api/debug/query-log', json={'enabled': True}).status_code == 404
+    assert client.get('/api/debug/query-log').status_code == 404
+    assert not app.query_log.enabled
+    assert client.get('/metrics').status_code == 200
+    app.db.close_all()
+
+def test_schema_cache_is_refreshed_by_init(seeded_app):
+    assert seeded_app.schema.has_column('groups', 'words_count')
+    assert seeded_app.schema.has_table('dashboard_stats')
+    assert not seeded_app.schema.has_column('study_sessions', 'study_activity_id')
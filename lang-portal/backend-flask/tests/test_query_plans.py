@@ -0,0 +1,89 @@
+import re
+import sqlite3
+
+import pytest
+
+from lib.query_plan import full_scans, is_query, table_aliases
+
+# Extra query strings for routes whose SQL changes with them
+EXTRA_URLS = (
+    '/api/words?sort_by=english&order=desc',
+    '/api/words?cursor=&sort_by=french&include_total=1',
+    '/api/groups/1/words?cursor=&sort_by=english',
+    '/api/groups/1/words?sort_by=english',
+    '/api/study-sessions?group_id=1',
+    '/api/study-sessions?active=true',
+)
+
+# Bulk exports read whole tables by design
+SKIPPED_PREFIXES = ('/api/export',)
+
+def get_urls(app):
+    urls = []
+    for rule in app.url_map.iter_rules():
+        if 'GET' not in rule.methods or rule.endpoint == 'static':
+            continue
+        if rule.rule.startswith(SKIPPED_PREFIXES):
+            continue
+        urls.append(re.sub(r'<[^>]+>', '1', rule.rule))
+    return sorted(urls) + list(EXTRA_URLS)
+
+@pytest.fixture
+def traced_app(seeded_app):
+    statements = []
+    seeded_app.db.close_all()
+    seeded_app.db.connect_hooks.append(lambda conn: conn.set_trace_callback(statements.append))
+    seeded_app.config['RESPONSE_CACHE_ENABLED'] = False
+    seeded_app.response_cache.enabled = False
+    seeded_app.config['PROPAGATE_EXCEPTIONS'] = False
+    yield seeded_app, statements
+
+def test_table_aliases():
+    sql = '''
+        SELECT * FROM study_sessions ss
+        LEFT JOIN groups g ON g.id = ss.group_id
+        JOIN study_activities ON study_activities.id = ss.activity_id
+        WHERE ss.id IN (SELECT session_id FROM word_review_items)
+    '''
+    assert table_aliases(sql) == {
+        'study_sessions': 'study_sessions', 'ss': 'study_sessions',
+        'groups': 'groups', 'g': 'groups',
+        'study_activities': 'study_activities',
+        'word_review_items': 'word_review_items',
+    }
+
+def test_full_scans_flags_unindexed_tables():
+    conn = sqlite3.connect(':memory:')
+    conn.executescript('''
+        CREATE TABLE words (id INTEGER PRIMARY KEY, french TEXT);
+        CREATE TABLE groups (id INTEGER PRIMARY KEY, name TEXT);
+        CREATE INDEX idx_words_french ON words(french);
+    ''')
+    scans = full_scans(conn, "SELECT * FROM words w WHERE w.french LIKE '%a%'")
+    assert [scan.table for scan in scans] == ['words']
+    assert full_scans(conn, "SELECT * FROM words WHERE french = 'chat'") == []
+    assert full_scans(conn, 'SELECT * FROM words ORDER BY french LIMIT 5') == []
+    assert full_scans(conn, 'SELECT * FROM groups') == []
+
+def test_route_queries_use_indexes(traced_app):
+    app, statements = traced_app
+    client = app.test_client()
+
+    # Give the session and review routes some rows to plan against
+    session_id = client.post('/api/study-sessions', json={'group_id': 1, 'activity_id': 1}).get_json()['id']
+    client.post(f'/api/study-sessions/{session_id}/review', json={'reviews': [{'word_id': 1, 'is_correct': True}]})
+
+    captured = []
+    for url in get_urls(app):
+        del statements[:]
+        client.get(url)
+        captured.extend((url, sql) for sql in statements if is_query(sql))
+    assert captured
+
+    with app.app_context():
+        conn = app.db.get()
+        conn.set_trace_callback(None)
+        problems = [(url, scan) for url, sql in captured for scan in full_scans(conn, sql)]
+        app.db.close()
+
+    assert problems == []
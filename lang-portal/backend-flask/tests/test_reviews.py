@@ -0,0 +1,94 @@
+import json
+
+def create_session(client, group_id=1):
+    response = client.post('/api/study-sessions', json={'group_id': group_id, 'activity_id': 1})
+    assert response.status_code == 201
+    return response.get_json()['id']
+
+def session_row(app, session_id):
+    with app.app_context():
+        return app.db.get().execute('SELECT * FROM study_sessions WHERE id = ?', (session_id,)).fetchone()
+
+def test_batch_of_reviews_in_one_request(seeded_client, seeded_app):
+    session_id = create_session(seeded_client)
+    assert session_row(seeded_app, session_id)['end_time'] is None
+
+    reviews = [{'word_id': (i % 94) + 1, 'is_correct': i % 2 == 0} for i in range(300)]
+    response = seeded_client.post(f'/api/study-sessions/{session_id}/review', json={'reviews': reviews})
+    assert response.status_code == 201
+
+    data = response.get_json()
+    assert len(data['review_ids']) == 300
+    assert data['review_ids'] == list(range(data['review_ids'][0], data['review_ids'][0] + 300))
+    assert session_row(seeded_app, session_id)['end_time'] is not None
+
+    stats = seeded_client.get('/api/dashboard/quick-stats').get_json()
+    assert stats['success_rate'] == 50.0
+    assert stats['total_words_studied'] == 94
+
+def test_single_review_and_bare_array(seeded_client):
+    session_id = create_session(seeded_client)
+    response = seeded_client.post(f'/api/study-sessions/{session_id}/review', json={'word_id': 1, 'is_correct': True})
+    assert response.status_code == 201
+    assert len(response.get_json()['review_ids']) == 1
+
+    response = seeded_client.post(f'/api/study-sessions/{session_id}/review', json=[
+        {'word_id': 2, 'is_correct': True},
+        {'is_correct': True},
+    ])
+    assert response.status_code == 201
+    assert len(response.get_json()['review_ids']) == 1
+    assert response.get_json()['skipped'] == 1
+
+def test_ndjson_body(seeded_client, seeded_app):
+    session_id = create_session(seeded_client)
+    body = '\n'.join(json.dumps({
+        'word_id': word_id,
+        'is_correct': True,
+        'created_at': f'2025-03-01 10:00:{word_id:02d}'
+    }) for word_id in range(1, 11)) + '\n'
+
+    response = seeded_client.post(
+        f'/api/study-sessions/{session_id}/review',
+        data=body,
+        content_type='application/x-ndjson'
+    )
+    assert response.status_code == 201
+    assert len(response.get_json()['review_ids']) == 10
+
+    with seeded_app.app_context():
+        created = [row[0] for row in seeded_app.db.get().execute(
+            'SELECT created_at FROM word_review_items WHERE session_id = ? ORDER BY id', (session_id,)
+        )]
+    assert created[0] == '2025-03-01 10:00:01'
+
+def test_bad_ndjson_line_inserts_nothing(seeded_client, seeded_app):
+    session_id = create_session(seeded_client)
+    body = json.dumps({'word_id': 1, 'is_correct': True}) + '\n{not json\n'
+
+    response = seeded_client.post(
+        f'/api/study-sessions/{session_id}/review',
+        data=body,
+        content_type='application/x-ndjson'
+    )
+    assert response.status_code == 400
+
+    with seeded_app.app_context():
+        count = seeded_app.db.get().execute('SELECT COUNT(*) FROM word_review_items').fetchone()[0]
+    assert count == 0
+
+def test_non_object_review_is_rejected(seeded_client, seeded_app):
+    session_id = create_session(seeded_client)
+    response = seeded_client.post(
+        f'/api/study-sessions/{session_id}/review',
+        json={'reviews': [{'word_id': 1, 'is_correct': True}, 1]}
+    )
+    assert response.status_code == 400
+
+    with seeded_app.app_context():
+        count = seeded_app.db.get().execute('SELECT COUNT(*) FROM word_review_items').fetchone()[0]
+    assert count == 0
+
+def test_review_for_missing_session(seeded_client):
+    response = seeded_client.post('/api/study-sessions/999/review', json={'word_id': 1, 'is_correct': True})
+    assert response.status_code == 404
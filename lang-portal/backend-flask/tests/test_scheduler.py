@@ -0,0 +1,117 @@
+from datetime import datetime
+
+from lib.query_plan import explain
+from lib.scheduler import Schedule, rebuild_schedule
+
+def submit(client, reviews, group_id=1):
+    session_id = client.post('/api/study-sessions', json={'group_id': group_id, 'activity_id': 1}).get_json()['id']
+    response = client.post(f'/api/study-sessions/{session_id}/review', json={'reviews': reviews})
+    assert response.status_code == 201
+
+def schedule_rows(app):
+    with app.app_context():
+        conn = app.db.get()
+        rows = [tuple(row) for row in conn.execute('SELECT * FROM word_schedule ORDER BY word_id')]
+        app.db.close()
+    return rows
+
+def test_sm2_intervals():
+    schedule = Schedule(1)
+    day = datetime(2025, 3, 1, 9, 0, 0)
+
+    schedule.review(True, day)
+    assert (schedule.interval_days, schedule.due_at) == (1.0, '2025-03-02 09:00:00')
+    schedule.review(True, day)
+    assert schedule.interval_days == 6.0
+    schedule.review(True, day)
+    assert schedule.interval_days == 15.0
+    assert schedule.repetitions == 3
+
+    schedule.review(False, day)
+    assert schedule.due_at == '2025-03-01 09:10:00'
+    assert (schedule.repetitions, schedule.lapses) == (0, 1)
+    assert schedule.ease == 2.5 - 0.54
+
+    for _ in range(50):
+        schedule.review(True, day)
+    assert schedule.interval_days == 365
+
+def test_due_queue_follows_reviews(seeded_client):
+    data = seeded_client.get('/api/groups/1/due?limit=3').get_json()
+    assert [word['id'] for word in data['words']] == [1, 2, 3]
+    assert data['words'][0]['due_at'] is None
+
+    submit(seeded_client, [
+        {'word_id': 1, 'is_correct': True},
+        {'word_id': 3, 'is_correct': False, 'created_at': '2025-01-01 10:00:00'},
+    ])
+
+    words = seeded_client.get('/api/groups/1/due?limit=3').get_json()['words']
+    # 3 was missed long ago and is overdue; 1 is due tomorrow
+    assert [word['id'] for word in words] == [3, 2, 4]
+    assert words[0]['due_at'] == '2025-01-01 10:10:00'
+    assert words[0]['lapses'] == 1
+    assert words[0]['type'] == 'verb'
+
+def test_reset_clears_the_schedule(seeded_client, seeded_app):
+    submit(seeded_client, [
+        {'word_id': 3, 'is_correct': False, 'created_at': '2025-01-01 10:00:00'},
+        {'word_id': 40, 'is_correct': True},
+    ])
+    assert seeded_client.post('/api/study-sessions/reset').status_code == 200
+
+    words = seeded_client.get('/api/groups/1/due?limit=3').get_json()['words']
+    assert [word['id'] for word in words] == [1, 2, 3]
+    assert all(word['due_at'] is None for word in words)
+    assert schedule_rows(seeded_app) == []
+    with seeded_app.app_context():
+        scheduled = seeded_app.db.get().execute('SELECT COUNT(*) FROM word_groups WHERE due_at IS NOT NULL').fetchone()[0]
+        seeded_app.db.close()
+    assert scheduled == 0
+
+def test_due_at_is_copied_to_every_group(seeded_client, seeded_app):
+    submit(seeded_client, [{'word_id': 40, 'is_correct': True, 'created_at': '2025-01-01T10:00:00Z'}], group_id=2)
+    with seeded_app.app_context():
+        conn = seeded_app.db.get()
+        conn.execute('INSERT INTO word_groups (word_id, group_id) VALUES (40, 1)')
+        conn.commit()
+        due = [row[0] for row in conn.execute('SELECT due_at FROM word_groups WHERE word_id = 40')]
+        seeded_app.db.close()
+    assert due == ['2025-01-02 10:00:00', '2025-01-02 10:00:00']
+
+def test_due_limit_validation(seeded_client):
+    assert seeded_client.get('/api/groups/1/due?limit=0').status_code == 400
+    assert seeded_client.get('/api/groups/1/due?limit=1000').status_code == 400
+    assert seeded_client.get('/api/groups/999/due').status_code == 404
+
+def test_rebuild_matches_incremental_schedule(seeded_client, seeded_app):
+    submit(seeded_client, [
+        {'word_id': 1, 'is_correct': True, 'created_at': '2025-01-01 10:00:00'},
+        {'word_id': 1, 'is_correct': True, 'created_at': '2025-01-02 10:00:00'},
+        {'word_id': 2, 'is_correct': False, 'created_at': '2025-01-01 10:00:00'},
+    ])
+    submit(seeded_client, [{'word_id': 1, 'is_correct': False, 'created_at': '2025-01-09 10:00:00'}])
+    incremental = schedule_rows(seeded_app)
+
+    with seeded_app.app_context():
+        assert rebuild_schedule(seeded_app.db.get()) == 4
+        seeded_app.db.close()
+    assert schedule_rows(seeded_app) == incremental
+
+def test_due_queries_walk_the_index(seeded_app):
+    with seeded_app.app_context():
+        conn = seeded_app.db.get()
+        overdue = explain(conn, '''
+            SELECT wg.word_id FROM word_groups wg
+            WHERE wg.group_id = 1 AND wg.due_at <= '2025-01-01'
+            ORDER BY wg.due_at, wg.word_id LIMIT 20
+        ''')
+        new = explain(conn, '''
+            SELECT wg.word_id FROM word_groups wg
+            WHERE wg.group_id = 1 AND wg.due_at IS NULL
+            ORDER BY wg.word_id LIMIT 20
+        ''')
+        seeded_app.db.close()
+    for plan in (overdue, new):
+        assert any('idx_word_groups_group_due' in detail for detail in plan)
+        assert not any('TEMP B-TREE' in detail for detail in plan)
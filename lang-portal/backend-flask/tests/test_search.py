@@ -0,0 +1,97 @@
+import time
+
+import pytest
+
+from lib.search import InvalidSearchError, match_query
+
+def search(client, q, **params):
+    response = client.get('/api/words/search', query_string={'q': q, **params})
+    assert response.status_code == 200
+    return response.get_json()
+
+def frenches(data):
+    return [word['french'] for word in data['words']]
+
+def test_match_query_quotes_terms():
+    assert match_query('mang') == '"mang"*'
+    assert match_query('to be') == '"to" "be"*'
+    # FTS5 operators and column filters are searched as plain words
+    assert match_query('NOT french:"x') == '"NOT" "french" "x"*'
+    with pytest.raises(InvalidSearchError):
+        match_query(' "*" ')
+
+def test_search_ignores_accents(seeded_client):
+    assert frenches(search(seeded_client, 'etre'))[0] == 'être'
+    assert frenches(search(seeded_client, 'ÊTRE'))[0] == 'être'
+
+def test_search_by_prefix_and_english(seeded_client):
+    assert 'voiture' in frenches(search(seeded_client, 'voit'))
+    assert frenches(search(seeded_client, 'to be'))[0] == 'être'
+
+def test_search_finds_conjugated_forms(seeded_client):
+    data = search(seeded_client, 'suis')
+    assert frenches(data) == ['être']
+    assert data['words'][0]['parts']['present']['je'] == 'suis'
+
+def test_direct_matches_rank_above_forms(seeded_client):
+    seeded_client.post('/api/words', json={
+        'french': 'canard', 'english': 'duck', 'gender': 'masculine',
+        'parts': {'note': 'ressemble à une voiture'}
+    })
+    assert frenches(search(seeded_client, 'voiture')) == ['voiture', 'canard']
+
+def test_index_follows_inserts_updates_and_deletes(seeded_client, seeded_app):
+    word_id = seeded_client.post('/api/words', json={
+        'french': 'hôpital', 'english': 'hospital', 'gender': 'masculine',
+        'parts': {'plural': 'hôpitaux'}
+    }).get_json()['id']
+    assert frenches(search(seeded_client, 'hopitaux')) == ['hôpital']
+
+    with seeded_app.app_context():
+        conn = seeded_app.db.get()
+        conn.execute("UPDATE words SET english = 'clinic', parts = '{}' WHERE id = ?", (word_id,))
+        conn.commit()
+        assert frenches(search(seeded_client, 'clinic')) == ['hôpital']
+        assert search(seeded_client, 'hopitaux')['words'] == []
+
+        conn.execute('DELETE FROM words WHERE id = ?', (word_id,))
+        conn.commit()
+        seeded_app.db.close()
+    assert search(seeded_client, 'hopital')['words'] == []
+
+def test_search_pagination_and_fields(seeded_client):
+    for i in range(60):
+        seeded_client.post('/api/words', json={
+            'french': f'essai{i}', 'english': f'attempt{i}', 'gender': 'masculine', 'parts': {}
+        })
+    first = search(seeded_client, 'essai', fields='id,french')
+    assert first['pagination'] == {
+        'current_page': 1, 'total_pages': 2, 'total_words': 60, 'words_per_page': 50
+    }
+    assert all(set(word) == {'id', 'french'} for word in first['words'])
+    second = search(seeded_client, 'essai', page=2)
+    assert len(first['words']) + len(second['words']) == 60
+    assert not {w['id'] for w in first['words']} & {w['id'] for w in second['words']}
+
+def test_search_rejects_empty_query(seeded_client):
+    assert seeded_client.get('/api/words/search').status_code == 400
+    assert seeded_client.get('/api/words/search?q=%20').status_code == 400
+    assert seeded_client.get('/api/words/search?q=etre&fields=nope').status_code == 400
+
+def test_search_stays_fast_on_a_large_table(seeded_app):
+    with seeded_app.app_context():
+        conn = seeded_app.db.get()
+        conn.executemany(
+            "INSERT INTO words (french, english, gender, parts) VALUES (?, ?, 'masculine', ?)",
+            [(f'mot{i}', f'word{i}', '{"plural": "mots%d"}' % i) for i in range(20000)]
+        )
+        conn.commit()
+        seeded_app.db.close()
+
+    client = seeded_app.test_client()
+    start = time.perf_counter()
+    for _ in range(20):
+        data = search(client, 'mots1999')
+    elapsed = (time.perf_counter() - start) / 20
+    assert [word['french'] for word in data['words']][0] == 'mot1999'
+    assert elapsed < 0.05
@@ -0,0 +1,94 @@
+from lib.query_plan import explain
+from lib.stats import rebuild_daily_review_stats
+
+def submit(client, reviews, group_id=1, activity_id=1):
+    session_id = client.post('/api/study-sessions', json={'group_id': group_id, 'activity_id': activity_id}).get_json()['id']
+    response = client.post(f'/api/study-sessions/{session_id}/review', json={'reviews': reviews})
+    assert response.status_code == 201
+    return session_id
+
+def rollup(app):
+    with app.app_context():
+        conn = app.db.get()
+        rows = [tuple(row) for row in conn.execute('SELECT * FROM daily_review_stats ORDER BY 1, 2, 3')]
+        app.db.close()
+    return rows
+
+def test_rollup_follows_review_inserts(seeded_client, seeded_app):
+    submit(seeded_client, [
+        {'word_id': 1, 'is_correct': True, 'created_at': '2025-03-03 10:00:00'},
+        {'word_id': 2, 'is_correct': False, 'created_at': '2025-03-03 23:59:59'},
+        {'word_id': 3, 'is_correct': True, 'created_at': '2025-03-04T00:30:00Z'},
+    ])
+    submit(seeded_client, [{'word_id': 40, 'is_correct': True, 'created_at': '2025-03-03 12:00:00'}],
+           group_id=2, activity_id=2)
+    assert rollup(seeded_app) == [
+        ('2025-03-03', 1, 1, 2, 1),
+        ('2025-03-03', 2, 2, 1, 1),
+        ('2025-03-04', 1, 1, 1, 1),
+    ]
+
+def test_backfill_matches_triggers_and_reset_clears_it(seeded_client, seeded_app):
+    submit(seeded_client, [
+        {'word_id': 1, 'is_correct': True, 'created_at': '2025-03-03 10:00:00'},
+        {'word_id': 1, 'is_correct': False, 'created_at': '2025-03-10 10:00:00'},
+    ])
+    incremental = rollup(seeded_app)
+    with seeded_app.app_context():
+        assert rebuild_daily_review_stats(seeded_app.db.get()) == 2
+        seeded_app.db.close()
+    assert rollup(seeded_app) == incremental
+
+    seeded_client.post('/api/study-sessions/reset')
+    assert rollup(seeded_app) == []
+
+def test_trends_by_day_fill_gaps(seeded_client):
+    submit(seeded_client, [
+        {'word_id': 1, 'is_correct': True, 'created_at': '2025-03-03 10:00:00'},
+        {'word_id': 2, 'is_correct': False, 'created_at': '2025-03-05 10:00:00'},
+        {'word_id': 3, 'is_correct': True, 'created_at': '2025-03-05 11:00:00'},
+    ])
+    data = seeded_client.get('/api/dashboard/trends?from=2025-03-02&to=2025-03-05').get_json()
+    assert data['bucket'] == 'day'
+    assert [(p['start'], p['reviews'], p['correct'], p['accuracy']) for p in data['points']] == [
+        ('2025-03-02', 0, 0, None),
+        ('2025-03-03', 1, 1, 100.0),
+        ('2025-03-04', 0, 0, None),
+        ('2025-03-05', 2, 1, 50.0),
+    ]
+    assert data['totals'] == {'reviews': 3, 'correct': 2, 'accuracy': 66.7}
+
+def test_trends_by_week_and_filters(seeded_client):
+    submit(seeded_client, [
+        {'word_id': 1, 'is_correct': True, 'created_at': '2025-03-03 10:00:00'},   # Monday
+        {'word_id': 2, 'is_correct': True, 'created_at': '2025-03-09 10:00:00'},   # Sunday, same week
+        {'word_id': 3, 'is_correct': False, 'created_at': '2025-03-10 10:00:00'},  # next Monday
+    ])
+    submit(seeded_client, [{'word_id': 40, 'is_correct': True, 'created_at': '2025-03-04 12:00:00'}], group_id=2)
+
+    data = seeded_client.get('/api/dashboard/trends?from=2025-03-05&to=2025-03-16&bucket=week').get_json()
+    # Buckets start on the Monday of the week containing from=; only days in range are counted
+    assert [(p['start'], p['reviews']) for p in data['points']] == [('2025-03-03', 1), ('2025-03-10', 1)]
+
+    data = seeded_client.get('/api/dashboard/trends?from=2025-03-01&to=2025-03-16&bucket=week&group_id=2').get_json()
+    assert [p['reviews'] for p in data['points']] == [0, 1, 0]
+
+def test_trends_validation(seeded_client):
+    assert seeded_client.get('/api/dashboard/trends').status_code == 200
+    assert len(seeded_client.get('/api/dashboard/trends').get_json()['points']) == 30
+    assert seeded_client.get('/api/dashboard/trends?bucket=month').status_code == 400
+    assert seeded_client.get('/api/dashboard/trends?from=2025-03-05&to=2025-03-01').status_code == 400
+    assert seeded_client.get('/api/dashboard/trends?from=yesterday').status_code == 400
+    assert seeded_client.get('/api/dashboard/trends?from=2020-01-01&to=2025-01-01').status_code == 400
+    assert seeded_client.get('/api/dashboard/trends?from=2020-01-01&to=2025-01-01&bucket=week').status_code == 200
+
+def test_trends_read_only_the_rollup(seeded_app):
+    with seeded_app.app_context():
+        plan = explain(seeded_app.db.get(), '''
+            SELECT date, SUM(reviews), SUM(correct) FROM daily_review_stats
+            WHERE date BETWEEN '2025-01-01' AND '2025-03-01' AND group_id = 1
+            GROUP BY date
+        ''')
+        seeded_app.db.close()
+    assert any('SEARCH daily_review_stats USING PRIMARY KEY' in detail for detail in plan)
+    assert not any('word_review_items' in detail for detail in plan)
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from lib import words as word_model
+from lib.words import Word, parse_fields, decode_parts, InvalidFieldsError
+
+def test_parse_fields():
+    assert parse_fields(None) is None
+    assert parse_fields('id, french') == ('id', 'french')
+    with pytest.raises(InvalidFieldsError):
+        parse_fields('id,kanji')
+
+def test_parts_are_decoded_once_per_word(monkeypatch):
+    word_model.clear_parts_cache()
+    calls = []
+    real_loads = json.loads
+    monkeypatch.setattr(word_model.json, 'loads', lambda raw: calls.append(raw) or real_loads(raw))
+
+    raw = '{"plural": "chats"}'
+    assert decode_parts(7, raw) == {'plural': 'chats'}
+    assert decode_parts(7, raw) == {'plural': 'chats'}
+    assert len(calls) == 1
+
+    # A changed value for the same word is decoded again
+    assert decode_parts(7, '{"plural": "chatons"}') == {'plural': 'chatons'}
+    assert len(calls) == 2
+
+def test_word_type_is_derived_from_parts():
+    def make(gender, parts):
+        return Word(1, 'x', 'x', gender, parts)
+
+    assert make('none', {'infinitive': 'être'}).type == 'verb'
+    assert make('none', {'masculine': 'petit', 'feminine': 'petite'}).type == 'adjective'
+    assert make('feminine', {'plural': 'maisons'}).type == 'noun'
+
+def test_words_list_returns_decoded_parts(seeded_client):
+    data = seeded_client.get('/api/words').get_json()
+    word = data['words'][0]
+    assert set(word) == {'id', 'french', 'english', 'gender', 'type', 'parts'}
+    assert isinstance(word['parts'], dict)
+
+def test_words_list_projection(seeded_client):
+    data = seeded_client.get('/api/words?fields=id,french').get_json()
+    assert all(set(word) == {'id', 'french'} for word in data['words'])
+
+    data = seeded_client.get('/api/words?cursor=&fields=french,type').get_json()
+    assert all(set(word) == {'french', 'type'} for word in data['words'])
+
+    assert seeded_client.get('/api/words?fields=kanji').status_code == 400
+
+def test_single_word_shape_matches_list(seeded_client):
+    listed = seeded_client.get('/api/words?sort_by=english').get_json()['words'][0]
+    single = seeded_client.get(f"/api/words/{listed['id']}").get_json()['word']
+    assert single == listed
+
+def test_group_words_include_type_and_counts(seeded_client):
+    words = seeded_client.get('/api/groups/1/words').get_json()['words']
+    assert all(word['type'] == 'verb' for word in words)
+    assert all('correct_count' in word and isinstance(word['parts'], dict) for word in words)
+
+    words = seeded_client.get('/api/groups/1/words?fields=id,french,correct_count').get_json()['words']
+    assert all(set(word) == {'id', 'french', 'correct_count'} for word in words)
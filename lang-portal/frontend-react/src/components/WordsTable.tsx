@@ -1,7 +1,7 @@
 import React from 'react'
 import { Link } from 'react-router-dom'
 import { ChevronUp, ChevronDown } from 'lucide-react'
-import { Word } from '../services/api'
+import { Word, WordParts } from '../services/api'
 
 export type WordSortKey = 'french' | 'english' | 'gender' | 'parts' | 'correct_count' | 'wrong_count'
 
@@ -12,21 +12,16 @@ interface WordsTableProps {
   onSort: (key: WordSortKey) => void
 }
 
-const formatParts = (parts: string | null) => {
+const formatParts = (parts: WordParts | null) => {
   if (!parts) return '';
-  try {
-    const parsed = JSON.parse(parts);
-    if (parsed.infinitive) {
-      // Handle verb parts
-      return `${parsed.infinitive} (${parsed.present || ''})`;
-    } else if (parsed.masculine) {
-      // Handle adjective parts
-      return `${parsed.masculine}, ${parsed.feminine || ''}`;
-    }
-    return JSON.stringify(parsed);
-  } catch {
-    return parts;
+  if (parts.infinitive) {
+    // Handle verb parts
+    return `${parts.infinitive} (${Object.values((parts.present as Record<string, string>) || {}).join(', ')})`;
+  } else if (parts.masculine) {
+    // Handle adjective parts
+    return `${parts.masculine}, ${parts.feminine || ''}`;
   }
+  return JSON.stringify(parts);
 };
 
 export default function WordsTable({ words, sortKey, sortDirection, onSort }: WordsTableProps) {
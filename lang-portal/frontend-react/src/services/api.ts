@@ -15,12 +15,16 @@ export interface GroupsResponse {
 }
 
 // Word types
+// parts is decoded by the backend: verb conjugations, noun articles/plural or adjective forms
+export type WordParts = Record<string, unknown>;
+
 export interface Word {
   id: number;
   french: string;
   english: string;
   gender: string;
-  parts: string;
+  type: 'noun' | 'verb' | 'adjective';
+  parts: WordParts;
   correct_count?: number;
   wrong_count?: number;
 }
@@ -0,0 +1,117 @@
+"""Recall and latency of the vector index backends on the question corpus.
+
+    python -m backend.benchmark_index backend/data/questions --synthetic 20000
+
+Both backends index the same question files into a scratch directory, then
+answer the same queries: every practice type x topic search the question
+generator makes, plus each question's introduction. Recall@k is measured
+against exact cosine search over every stored vector. --synthetic adds
+random unit vectors to both indexes to see how latency scales. Embeddings
+come from the shared embedding cache, so only the first run calls Bedrock;
+set BEDROCK_ENDPOINT_URL to use the fake runtime instead.
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from .question_generator import QuestionGenerator
+from .vector_store import FrenchQuestionVectorStore
+
+def build_queries(questions: List[Dict]) -> List[str]:
+    queries = [
+        QuestionGenerator.search_query(practice_type, topic)
+        for practice_type in QuestionGenerator.PRACTICE_TYPES
+        for topic in QuestionGenerator.TOPICS
+    ]
+    queries.extend(question['introduction'] for question in questions if question.get('introduction'))
+    return queries
+
+def add_synthetic(store: FrenchQuestionVectorStore, count: int, dimensions: int, seed: int = 0, batch_size: int = 1000):
+    """Random unit vectors as distractors; they have no bodies, so searches skip them"""
+    rng = np.random.default_rng(seed)
+    for start in range(0, count, batch_size):
+        size = min(batch_size, count - start)
+        vectors = rng.standard_normal((size, dimensions)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        store.index.upsert([f"synthetic_{start + i}" for i in range(size)], vectors.tolist())
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def run(questions_dir: str, synthetic: int = 0, k: int = 3, repeat: int = 5, workdir: str = None) -> Dict:
+    workdir = workdir or tempfile.mkdtemp(prefix="index-bench-")
+    stores = {backend: FrenchQuestionVectorStore(os.path.join(workdir, backend), backend=backend)
+              for backend in ("chroma", "numpy")}
+
+    results = {}
+    for backend, store in stores.items():
+        started = time.perf_counter()
+        store.index_questions_directory(questions_dir)
+        results[backend] = {'index_seconds': round(time.perf_counter() - started, 3)}
+
+    numpy_store = stores["numpy"]
+    question_ids, _ = numpy_store.index.vectors()
+    questions = [body for _, body in numpy_store.bodies.get_many(question_ids).values()]
+    queries = build_queries(questions)
+    query_vectors = numpy_store.embedding_fn(queries)
+
+    if synthetic:
+        for store in stores.values():
+            add_synthetic(store, synthetic, numpy_store.index.dimensions)
+
+    # Exact top-k over every vector the indexes hold
+    ids, matrix = numpy_store.index.vectors()
+    truth = []
+    for vector in query_vectors:
+        query = np.asarray(vector, dtype=np.float32)
+        scores = matrix @ (query / np.linalg.norm(query))
+        truth.append({ids[row] for row in np.argsort(-scores)[:k]})
+
+    for backend, store in stores.items():
+        recalls = []
+        index_ms = []
+        search_ms = []
+        for vector, expected in zip(query_vectors, truth):
+            got = {question_id for question_id, _ in store.index.query(vector, k)}
+            recalls.append(len(got & expected) / len(expected))
+            for _ in range(repeat):
+                started = time.perf_counter()
+                store.index.query(vector, k)
+                index_ms.append((time.perf_counter() - started) * 1000)
+                started = time.perf_counter()
+                store.search_by_embedding(vector, k)
+                search_ms.append((time.perf_counter() - started) * 1000)
+        results[backend].update({
+            'vectors': store.index.count(),
+            'queries': len(query_vectors),
+            f'recall@{k}': round(statistics.mean(recalls), 4),
+            'query_p50_ms': round(percentile(index_ms, 0.50), 3),
+            'query_p95_ms': round(percentile(index_ms, 0.95), 3),
+            'search_p50_ms': round(percentile(search_ms, 0.50), 3),
+            'search_p95_ms': round(percentile(search_ms, 0.95), 3),
+        })
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the Chroma and NumPy vector indexes")
+    parser.add_argument("questions_dir", nargs="?", default="data/questions")
+    parser.add_argument("--synthetic", type=int, default=0, help="random distractor vectors to add")
+    parser.add_argument("-k", type=int, default=3, help="results per query (the generator uses 3)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per query")
+    parser.add_argument("--workdir", help="where to build the indexes (default: a temp directory)")
+    parser.add_argument("--output", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.questions_dir, args.synthetic, args.k, args.repeat, args.workdir)
+    for backend, result in results.items():
+        print(f"{backend:>6}: " + ", ".join(f"{key}={value}" for key, value in result.items()))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,119 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .throttling import call_with_retries
+
+class EmbeddingError(RuntimeError):
+    """Raised when some texts could not be embedded; failures maps text hash -> error"""
+
+    def __init__(self, failures: Dict[str, Exception], total: int):
+        self.failures = failures
+        first = next(iter(failures.values()))
+        super().__init__(f"Failed to embed {len(failures)} of {total} texts (first error: {first})")
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """Embeddings on disk, keyed by (model_id, sha256(text)).
+
+    Vectors are stored as float32 blobs in SQLite, so re-embedding a corpus
+    only pays for texts that were never embedded with that model.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model_id TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model_id, text_hash)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+    def get_many(self, model_id: str, hashes: Sequence[str]) -> Dict[str, List[float]]:
+        found = {}
+        hashes = list(hashes)
+        with self._lock:
+            # Stay under SQLite's bound parameter limit
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model_id = ? "
+                    f"AND text_hash IN ({', '.join('?' * len(chunk))})",
+                    [model_id] + chunk
+                )
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, model_id: str, vectors: Dict[str, Sequence[float]]):
+        if not vectors:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model_id, text_hash, vector) VALUES (?, ?, ?)",
+                [(model_id, key, array("f", vector).tobytes()) for key, vector in vectors.items()]
+            )
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def embed_texts(texts: Sequence[str], embed_one: Callable[[str], List[float]], model_id: str,
+                cache: Optional[EmbeddingCache] = None, max_workers: int = 8, max_retries: int = 5,
+                base_delay: float = 0.5) -> List[List[float]]:
+    """Embed texts in input order, reading and filling the cache.
+
+    Duplicate texts are embedded once. Cache misses are embedded by at most
+    max_workers concurrent calls to embed_one, each retried on throttling
+    and transient errors. Successful embeddings are cached even when others
+    fail, and then EmbeddingError is raised: a failed text never comes back
+    as a placeholder vector.
+    """
+    hashes = [text_hash(text) for text in texts]
+    unique: Dict[str, str] = dict(zip(hashes, texts))
+    vectors = cache.get_many(model_id, unique.keys()) if cache is not None else {}
+    missing = [key for key in unique if key not in vectors]
+
+    failures: Dict[str, Exception] = {}
+    if missing:
+        def embed(key):
+            try:
+                return key, call_with_retries(lambda: embed_one(unique[key]), max_retries, base_delay), None
+            except Exception as e:
+                return key, None, e
+
+        embedded = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing)))) as pool:
+            for key, vector, error in pool.map(embed, missing):
+                if error is not None:
+                    failures[key] = error
+                else:
+                    embedded[key] = vector
+        if cache is not None:
+            cache.put_many(model_id, embedded)
+        vectors.update(embedded)
+
+    if failures:
+        raise EmbeddingError(failures, len(unique))
+    return [vectors[key] for key in hashes]
@@ -0,0 +1,186 @@
+"""A local stand-in for the Bedrock runtime, for tests and benchmarks.
+
+Answers POST /model/<model_id>/invoke with a deterministic Titan-style
+embedding of the inputText, so the same text always gets the same vector,
+and POST /model/<model_id>/converse with a stub LLM reply. Point a client
+at it with endpoint_url:
+
+    server = FakeBedrockServer(throttle_every=5).start()
+    fn = BedrockEmbeddingFunction(endpoint_url=server.url, cache_path=None)
+
+FrenchTranscriptStructurer takes endpoint_url as well, and both fall back to
+BEDROCK_ENDPOINT_URL. Run it on its own with `python -m backend.fake_bedrock --port 8089`.
+"""
+import argparse
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional
+from urllib.parse import unquote
+
+MODEL_PATH = re.compile(r"^/model/(?P<model_id>[^/]+)/(?P<operation>invoke|converse)$")
+
+def fake_embedding(text: str, dimensions: int = 1536) -> List[float]:
+    """A unit-length vector derived from sha256 of the text"""
+    values = []
+    counter = 0
+    while len(values) < dimensions:
+        digest = hashlib.sha256(f"{counter}:{text}".encode("utf-8")).digest()
+        values.extend(byte / 127.5 - 1.0 for byte in digest)
+        counter += 1
+    values = values[:dimensions]
+    norm = math.sqrt(sum(value * value for value in values)) or 1.0
+    return [value / norm for value in values]
+
+def stub_reply(prompt: str) -> str:
+    """A deterministic answer in the title/questions format the structurer asks for"""
+    match = re.search(r"Dialogue:\n(.*?)\n\n", prompt, re.DOTALL)
+    words = (match.group(1) if match else prompt).split()
+    title = " ".join(words[:4]).capitalize() or "Dialogue"
+    return (
+        f"Titre: {title}\n\n"
+        "Questions:\n\n"
+        f"1. De quoi parle le dialogue « {' '.join(words[:3])} » ?\n"
+        f"2. Que se passe-t-il après « {' '.join(words[-3:])} » ?\n"
+    )
+
+class FakeBedrockServer:
+    """Threaded HTTP server speaking just enough of bedrock-runtime for embeddings and converse.
+
+    throttle_every=N answers every Nth request with a 429 ThrottlingException;
+    fail_texts is a set of inputText values (or converse prompts) that always get a 400
+    ValidationException; latency adds a delay (seconds) to every request.
+    reply turns a converse prompt into the model's text (stub_reply by default).
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, dimensions: int = 1536,
+                 throttle_every: int = 0, fail_texts: Optional[set] = None, latency: float = 0.0,
+                 reply: Callable[[str], str] = stub_reply):
+        self.dimensions = dimensions
+        self.reply = reply
+        self.throttle_every = throttle_every
+        self.fail_texts = set(fail_texts or ())
+        self.latency = latency
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeBedrockServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, payload, error_type=None):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if error_type:
+                    self.send_header("x-amzn-ErrorType", error_type)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _converse(self, body):
+                try:
+                    messages = json.loads(body)["messages"]
+                    prompt = "".join(part.get("text", "") for part in messages[-1]["content"])
+                except (ValueError, KeyError, IndexError):
+                    self._send(400, {"message": "Malformed input request"}, "ValidationException")
+                    return
+                if prompt in server.fail_texts:
+                    self._send(400, {"message": "Input is not allowed"}, "ValidationException")
+                    return
+                text = server.reply(prompt)
+                self._send(200, {
+                    "output": {"message": {"role": "assistant", "content": [{"text": text}]}},
+                    "stopReason": "end_turn",
+                    "usage": {"inputTokens": len(prompt.split()), "outputTokens": len(text.split()),
+                              "totalTokens": len(prompt.split()) + len(text.split())},
+                    "metrics": {"latencyMs": int(server.latency * 1000)},
+                })
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                match = MODEL_PATH.match(self.path)
+                if not match:
+                    self._send(404, {"message": f"Unknown path {self.path}"}, "ResourceNotFoundException")
+                    return
+
+                with server._lock:
+                    server.requests += 1
+                    number = server.requests
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    if server.latency:
+                        time.sleep(server.latency)
+                    if server.throttle_every and number % server.throttle_every == 0:
+                        self._send(429, {"message": "Too many requests"}, "ThrottlingException")
+                        return
+                    if match.group("operation") == "converse":
+                        self._converse(body)
+                        return
+                    try:
+                        text = json.loads(body)["inputText"]
+                    except (ValueError, KeyError):
+                        self._send(400, {"message": "Malformed input request"}, "ValidationException")
+                        return
+                    if text in server.fail_texts:
+                        self._send(400, {"message": "Input is not allowed"}, "ValidationException")
+                        return
+                    self._send(200, {
+                        "embedding": fake_embedding(text, server.dimensions),
+                        "inputTextTokenCount": len(text.split()),
+                        "modelId": unquote(match.group("model_id")),
+                    })
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+        return Handler
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve fake Bedrock embeddings and replies locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--throttle-every", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakeBedrockServer(args.host, args.port, args.dimensions, args.throttle_every, latency=args.latency)
+    print(f"Fake Bedrock runtime listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
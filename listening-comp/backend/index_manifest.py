@@ -0,0 +1,48 @@
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+# Version 2 moved question bodies out of Chroma metadata; older manifests force a full re-index
+MANIFEST_VERSION = 2
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(65536), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def question_hash(question: Dict) -> str:
+    """Content hash of a parsed question, independent of key order"""
+    return hashlib.sha256(json.dumps(question, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+class IndexManifest:
+    """What the vector store last indexed from each question file.
+
+    files maps file_id -> {"mtime", "size", "sha256", "questions": {question_id: question_hash}}.
+    A file whose mtime and size are unchanged is not even read; one whose
+    sha256 is unchanged is not parsed; otherwise only questions whose hash
+    changed are re-embedded.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.model_id: Optional[str] = None
+        self.files: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.model_id = data.get('model_id')
+                self.files = data.get('files', {})
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write then rename, so a crash never leaves a half-written manifest
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'model_id': self.model_id, 'files': self.files}, f, indent=2)
+        os.replace(tmp_path, self.path)
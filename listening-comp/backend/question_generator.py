@@ -1,9 +1,11 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
+from .embeddings import EmbeddingError
 from .vector_store import FrenchQuestionVectorStore
 from .chat import BedrockChat
 import random
 import re
+import threading
 
 @dataclass
 class GeneratedQuestion:
@@ -12,9 +14,19 @@ class GeneratedQuestion:
     correct_answers: List[str]  # Add correct answers field
 
 class QuestionGenerator:
-    def __init__(self):
+    def __init__(self, warm_cache: bool = True):
         self.vector_store = FrenchQuestionVectorStore()
         self.chat = BedrockChat()
+        # search query -> (index generation, similar questions)
+        self._retrieval_cache: Dict[str, Tuple[int, List[Dict]]] = {}
+        self._cache_lock = threading.Lock()
+        if warm_cache:
+            self.warm_retrieval_cache()
+
+    PRACTICE_TYPES = ["Dialogue Practice", "Vocabulary Quiz", "Listening Exercise"]
+
+    # Similar questions used as examples in the prompt
+    EXAMPLES_PER_PROMPT = 3
         
     TOPICS = {
         "Daily Life": "la vie quotidienne",
@@ -27,14 +39,53 @@ class QuestionGenerator:
         "Work": "le travail"
     }
 
+    @staticmethod
+    def search_query(practice_type: str, topic: str) -> str:
+        """The vector search query for a practice type and topic"""
+        return f"{practice_type.lower()} about {topic.lower()}"
+
+    def warm_retrieval_cache(self):
+        """Retrieve the examples for every practice type and topic up front.
+
+        The queries are embedded in one concurrent batch, so no click has to
+        wait for Bedrock or the vector search until the index changes.
+        """
+        queries = [self.search_query(practice_type, topic)
+                   for practice_type in self.PRACTICE_TYPES for topic in self.TOPICS]
+        generation = self.vector_store.index_generation()
+        try:
+            embeddings = self.vector_store.embedding_fn(queries)
+        except EmbeddingError as e:
+            print(f"Error warming retrieval cache: {str(e)}")
+            return
+        
+        for query, embedding in zip(queries, embeddings):
+            results = self.vector_store.search_by_embedding(embedding, n_results=self.EXAMPLES_PER_PROMPT)
+            with self._cache_lock:
+                self._retrieval_cache[query] = (generation, results)
+        print(f"Warmed retrieval cache with {len(queries)} queries")
+
+    def similar_questions(self, search_query: str) -> List[Dict]:
+        """Example questions for a query, searched again only after the index changed"""
+        # Read the generation first: a re-index during the search leaves a stale tag, not stale results
+        generation = self.vector_store.index_generation()
+        with self._cache_lock:
+            cached = self._retrieval_cache.get(search_query)
+        if cached is None or cached[0] != generation:
+            cached = (generation, self.vector_store.search_similar_questions(
+                search_query, n_results=self.EXAMPLES_PER_PROMPT))
+            with self._cache_lock:
+                self._retrieval_cache[search_query] = cached
+        return [dict(question) for question in cached[1]]
+
     def generate_practice_question(self, practice_type: str, topic: str) -> Optional[GeneratedQuestion]:
         """Generate a practice question with multiple choice options"""
         # Get search query based on practice type and topic
         topic_fr = self.TOPICS.get(topic, "général")
-        search_query = f"{practice_type.lower()} about {topic.lower()}"
+        search_query = self.search_query(practice_type, topic)
         
         # Search for similar questions
-        similar_questions = self.vector_store.search_similar_questions(search_query, n_results=3)
+        similar_questions = self.similar_questions(search_query)
         
         # Create context from similar questions
         context = "\n\n".join([
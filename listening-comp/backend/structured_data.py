@@ -1,18 +1,93 @@
 from typing import Optional, Dict, List, Tuple
-import boto3
 import os
 import re
+import sys
 import glob
+import json
+import time
+import hashlib
 import argparse
 import textwrap
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+if __name__ == "__main__" and not __package__:
+    # Run as a script from backend/: make the package imports below work
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = "backend"
+
+from .throttling import RateLimiter, bedrock_runtime_client, call_with_retries
 
 MODEL_ID = "amazon.nova-lite-v1:0"
 
+# Used for a section when the model keeps failing
+FALLBACK_TITLE = "Dialogue en français"
+FALLBACK_QUESTIONS = "1. Question sur le dialogue?\n2. Question sur le dialogue?"
+
+DEFAULT_CHECKPOINT_PATH = "data/temp/structured_checkpoint.jsonl"
+
+class SectionCheckpoint:
+    """Titles and questions of finished sections, one JSON line each.
+
+    Lines are keyed by a hash of the model id and the cleaned section, so a
+    rerun after a crash skips every section that already has an answer,
+    whichever file it came from. path=None keeps nothing.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.done: Dict[str, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, 'rb+') as f:
+                data = f.read()
+                # A crashed run may have cut off the last line; drop it, or the
+                # next entry would be appended to it and lost as well
+                complete = data.rfind(b"\n") + 1
+                if complete < len(data):
+                    f.truncate(complete)
+            for line in data[:complete].decode('utf-8').splitlines():
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self.done[entry['key']] = (entry['title'], entry['questions'])
+
+    @staticmethod
+    def key(model_id: str, section: str) -> str:
+        return hashlib.sha256(f"{model_id}\0{section}".encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, str]]:
+        return self.done.get(key)
+
+    def add(self, key: str, title: str, questions: str):
+        with self._lock:
+            self.done[key] = (title, questions)
+            if not self.path:
+                return
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'key': key, 'title': title, 'questions': questions}, ensure_ascii=False) + "\n")
+
+    def remove(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
 class FrenchTranscriptStructurer:
-    def __init__(self, model_id: str = MODEL_ID):
-        """Initialize Bedrock client"""
-        self.bedrock_client = boto3.client('bedrock-runtime', region_name="us-east-1")
+    def __init__(self, model_id: str = MODEL_ID, max_workers: int = 4, requests_per_second: float = 2.0,
+                 max_retries: int = 5, base_delay: float = 1.0, endpoint_url: Optional[str] = None):
+        """Initialize Bedrock client.
+
+        Sections are sent to the model by up to max_workers threads, at most
+        requests_per_second between them; throttled and transient failures
+        are retried with exponential backoff and jitter.
+        """
+        self.bedrock_client = bedrock_runtime_client(max_workers, endpoint_url)
         self.model_id = model_id
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
 
     def split_transcript_into_sections(self, text: str) -> List[str]:
         """
@@ -99,6 +174,14 @@ class FrenchTranscriptStructurer:
 
     def generate_title_and_questions(self, conversation: str) -> Tuple[str, str]:
         """Generate a title and questions from the transcript"""
+        try:
+            return self._request_title_and_questions(conversation)
+        except Exception as e:
+            print(f"Error generating title and questions: {str(e)}")
+            return FALLBACK_TITLE, FALLBACK_QUESTIONS
+
+    def _request_title_and_questions(self, conversation: str) -> Tuple[str, str]:
+        """One rate-limited, retried model call for a section; raises if it keeps failing"""
         prompt = f"""Analysez ce dialogue en français (niveau DELF A1-A2).
 
 Dialogue:
@@ -117,96 +200,120 @@ Questions:
 2. [question complète se terminant par un point d'interrogation]
 """
 
-        try:
-            messages = [{
-                "role": "user",
-                "content": [{"text": prompt}]
-            }]
-            
-            response = self.bedrock_client.converse(
+        messages = [{
+            "role": "user",
+            "content": [{"text": prompt}]
+        }]
+        
+        def converse():
+            self.rate_limiter.acquire()
+            return self.bedrock_client.converse(
                 modelId=self.model_id,
                 messages=messages,
                 inferenceConfig={"temperature": 0.7}
             )
-            
-            result_text = response['output']['message']['content'][0]['text']
-            
-            # Extract title and questions
-            title_match = re.search(r'Titre: (.*?)(?:\n|$)', result_text)
-            title = title_match.group(1).strip() if title_match else "Dialogue en français"
-            
-            # Extract questions (everything after "Questions:")
-            questions_match = re.search(r'Questions:(.*)', result_text, re.DOTALL)
-            questions = questions_match.group(1).strip() if questions_match else ""
-            
-            return title, questions
-            
-        except Exception as e:
-            print(f"Error generating title and questions: {str(e)}")
-            return "Dialogue en français", "1. Question sur le dialogue?\n2. Question sur le dialogue?"
+        
+        response = call_with_retries(converse, self.max_retries, self.base_delay)
+        result_text = response['output']['message']['content'][0]['text']
+        
+        # Extract title and questions
+        title_match = re.search(r'Titre: (.*?)(?:\n|$)', result_text)
+        title = title_match.group(1).strip() if title_match else FALLBACK_TITLE
+        
+        # Extract questions (everything after "Questions:")
+        questions_match = re.search(r'Questions:(.*)', result_text, re.DOTALL)
+        questions = questions_match.group(1).strip() if questions_match else ""
+        
+        return title, questions
 
-    def process_transcript_text(self, transcript_text: str) -> List[Dict[str, str]]:
-        """Process plain text and generate Q&A for separate sections"""
-        sections = self.split_transcript_into_sections(transcript_text)
+    def _process_transcripts(self, transcripts: List[Tuple[Optional[str], str]],
+                             checkpoint_path: Optional[str] = None) -> List[List[Dict[str, str]]]:
+        """Generate Q&A for the sections of several (file_name, text) transcripts at once.
+
+        Every section of every transcript goes into one pool of max_workers
+        threads; sections already in the checkpoint are not sent again.
+        Returns each transcript's results in section order.
+        """
+        jobs = []  # (transcript index, section index, cleaned section)
+        for t, (file_name, transcript_text) in enumerate(transcripts):
+            sections = self.split_transcript_into_sections(transcript_text)
+            print(f"Split {file_name or 'transcript'} into {len(sections)} sections")
+            jobs.extend((t, i, self.clean_transcript(section)) for i, section in enumerate(sections))
         
-        print(f"Split transcript into {len(sections)} sections")
+        checkpoint = SectionCheckpoint(checkpoint_path)
         
-        results = []
-        for i, section in enumerate(sections):
-            print(f"Processing section {i+1}/{len(sections)}...")
-            
-            cleaned_section = self.clean_transcript(section)
-            
-            # Generate title and questions for this section
-            title, questions = self.generate_title_and_questions(cleaned_section)
-            
+        def process(job):
+            _, _, cleaned_section = job
+            key = SectionCheckpoint.key(self.model_id, cleaned_section)
+            done = checkpoint.get(key)
+            if done:
+                return done, True
+            try:
+                title, questions = self._request_title_and_questions(cleaned_section)
+            except Exception as e:
+                print(f"Error generating title and questions: {str(e)}")
+                return (FALLBACK_TITLE, FALLBACK_QUESTIONS), False
+            if questions:
+                checkpoint.add(key, title, questions)
+            return (title, questions), False
+        
+        answers = {}
+        resumed = 0
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(process, job): job for job in jobs}
+            for count, future in enumerate(as_completed(futures), 1):
+                t, i, _ = futures[future]
+                answers[(t, i)], from_checkpoint = future.result()
+                resumed += from_checkpoint
+                elapsed = time.perf_counter() - started
+                print(f"Processed section {count}/{len(jobs)} "
+                      f"({count / elapsed:.2f} sections/s, {resumed} from checkpoint)")
+        
+        results = [[] for _ in transcripts]
+        for t, i, cleaned_section in jobs:
             # Use the generated title directly as the introduction (without Section #)
-            introduction = title
-            
-            # We're already getting simple questions without choices from the API
-            # No need to extract them separately
-            
+            introduction, questions = answers[(t, i)]
             if questions:
-                result = {
+                results[t].append({
                     'section_num': i+1,
                     'introduction': introduction,
                     'conversation': cleaned_section,
                     'questions': questions
-                }
-                results.append(result)
-                print(f"Successfully generated questions for section {i+1}")
+                })
             else:
-                print(f"Failed to generate questions for section {i+1}")
-        
+                print(f"Failed to generate questions for section {i+1} of {transcripts[t][0] or 'transcript'}")
         return results
 
-    def process_transcript_files(self, transcript_dir: str) -> List[Dict[str, str]]:
-        """Process all transcript files in the given directory"""
+    def process_transcript_text(self, transcript_text: str, checkpoint_path: Optional[str] = None) -> List[Dict[str, str]]:
+        """Process plain text and generate Q&A for separate sections"""
+        return self._process_transcripts([(None, transcript_text)], checkpoint_path)[0]
+
+    def process_transcript_files(self, transcript_dir: str, checkpoint_path: Optional[str] = None) -> List[Dict[str, str]]:
+        """Process all transcript files in the given directory, their sections in parallel"""
         all_results = []
         
-        # Get all text files in the transcript directory
-        file_paths = glob.glob(os.path.join(transcript_dir, "*.txt"))
+        # Get all text files in the transcript directory, in a stable order
+        file_paths = sorted(glob.glob(os.path.join(transcript_dir, "*.txt")))
         
         if not file_paths:
             print(f"No text files found in directory: {transcript_dir}")
             return all_results
         
-        for i, file_path in enumerate(file_paths):
-            file_name = os.path.basename(file_path)
-            print(f"Processing file {i+1}/{len(file_paths)}: {file_name}")
-            
+        transcripts = []
+        for file_path in file_paths:
             # Read the file content
             with open(file_path, 'r', encoding='utf-8') as f:
-                transcript_text = f.read()
-            
-            # Process the transcript text
-            file_results = self.process_transcript_text(transcript_text)
-            
-            # Add file information to the results
-            for result in file_results:
+                transcripts.append((os.path.basename(file_path), f.read()))
+        
+        print(f"Processing {len(file_paths)} files with {self.max_workers} workers")
+        file_results = self._process_transcripts(transcripts, checkpoint_path)
+        
+        # Add file information to the results
+        for (file_name, _), results in zip(transcripts, file_results):
+            for result in results:
                 result['file_name'] = file_name
-            
-            all_results.extend(file_results)
+            all_results.extend(results)
             
         return all_results
 
@@ -241,6 +348,12 @@ def main():
     parser = argparse.ArgumentParser(description="DELF French Listening Comprehension Question Generator")
     parser.add_argument("--transcript_dir", type=str, default="data/transcripts", 
                         help="Directory containing transcript files (default: data/transcripts)")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Sections sent to the model at once (default: 4)")
+    parser.add_argument("--rate", type=float, default=2.0,
+                        help="Model requests per second across all workers (default: 2)")
+    parser.add_argument("--checkpoint", type=str, default=DEFAULT_CHECKPOINT_PATH,
+                        help=f"Finished sections, to resume an interrupted run (default: {DEFAULT_CHECKPOINT_PATH})")
     # Output directory is now fixed to data/questions
     
     # Parse arguments
@@ -250,7 +363,7 @@ def main():
     print("-" * 50)
     
     # Initialize processor
-    processor = FrenchTranscriptStructurer()
+    processor = FrenchTranscriptStructurer(max_workers=args.workers, requests_per_second=args.rate)
     
     # Use transcript directory from command line arguments or default to data/transcripts
     transcript_dir = args.transcript_dir if args.transcript_dir != "transcripts" else "data/transcripts"
@@ -266,7 +379,7 @@ def main():
         return
     
     # Process all transcript files
-    results = processor.process_transcript_files(transcript_dir)
+    results = processor.process_transcript_files(transcript_dir, args.checkpoint)
     
     if results:
         # Use the specified data/questions directory
@@ -276,6 +389,9 @@ def main():
         # Save results
         processor.save_results(results, data_dir)
         print(f"\nQuestions have been saved to the {data_dir} directory.")
+        
+        # Everything is saved; the next run starts fresh
+        SectionCheckpoint(args.checkpoint).remove()
     else:
         print("Failed to generate any questions!")
 
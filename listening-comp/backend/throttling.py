@@ -0,0 +1,81 @@
+import os
+import random
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+import boto3
+import botocore.exceptions
+from botocore.config import Config
+
+T = TypeVar("T")
+
+# Bedrock error codes worth retrying; anything else fails the text at once
+RETRYABLE_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "ModelNotReadyException",
+    "ModelTimeoutException",
+    "InternalServerException",
+}
+
+def bedrock_runtime_client(max_pool_connections: int = 10, endpoint_url: Optional[str] = None):
+    """A bedrock-runtime client for concurrent callers; retrying is left to call_with_retries.
+
+    endpoint_url, or BEDROCK_ENDPOINT_URL, points it elsewhere, e.g. at fake_bedrock.
+    """
+    endpoint_url = endpoint_url or os.environ.get("BEDROCK_ENDPOINT_URL")
+    client_kwargs = {}
+    if endpoint_url:
+        # The fake server ignores signatures, but botocore still needs credentials
+        client_kwargs = {"endpoint_url": endpoint_url, "aws_access_key_id": "fake", "aws_secret_access_key": "fake"}
+    return boto3.client(
+        'bedrock-runtime',
+        region_name="us-east-1",
+        config=Config(max_pool_connections=max_pool_connections, retries={"total_max_attempts": 1}),
+        **client_kwargs
+    )
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, botocore.exceptions.ClientError):
+        return error.response.get("Error", {}).get("Code") in RETRYABLE_ERROR_CODES
+    # Dropped connections and read timeouts
+    return isinstance(error, (botocore.exceptions.ConnectionError, botocore.exceptions.HTTPClientError))
+
+def call_with_retries(fn: Callable[[], T], max_retries: int = 5, base_delay: float = 0.5,
+                      max_delay: float = 20.0, sleep: Callable[[float], None] = time.sleep) -> T:
+    """Call fn, retrying retryable errors with exponential backoff and full jitter"""
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            sleep(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+            attempt += 1
+
+class RateLimiter:
+    """Token bucket shared by threads: at most rate calls per second, in bursts of up to burst"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
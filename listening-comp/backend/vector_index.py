@@ -0,0 +1,295 @@
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+class VectorIndex(ABC):
+    """Where question embeddings live: upsert/delete by id and top-k search.
+
+    query returns (id, distance) pairs, closest first. Question bodies are
+    kept in a QuestionBodyStore, not in the index.
+    """
+
+    @abstractmethod
+    def upsert(self, ids: List[str], embeddings: List[List[float]], documents: Optional[List[str]] = None,
+               metadatas: Optional[List[Dict]] = None):
+        """Insert or replace the vectors of ids"""
+
+    @abstractmethod
+    def delete(self, ids: List[str]):
+        """Remove ids; unknown ids are ignored"""
+
+    @abstractmethod
+    def query(self, embedding: Sequence[float], n_results: int) -> List[Tuple[str, float]]:
+        """The n_results closest ids with their distances"""
+
+    @abstractmethod
+    def count(self) -> int:
+        """How many vectors are stored"""
+
+    @abstractmethod
+    def clear(self):
+        """Remove every vector, so the next upsert may use a different dimension"""
+
+    def refresh(self):
+        """Pick up writes made through another instance or process; a no-op if queries read storage directly"""
+
+class ChromaIndex(VectorIndex):
+    """A Chroma collection (HNSW, approximate), fed precomputed embeddings"""
+
+    def __init__(self, client, name: str, **collection_options):
+        self.client = client
+        self.name = name
+        self.collection_options = collection_options
+        self.collection = client.get_or_create_collection(name=name, **collection_options)
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None):
+        self.collection.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def delete(self, ids):
+        if ids:
+            self.collection.delete(ids=ids)
+
+    def query(self, embedding, n_results):
+        count = self.collection.count()
+        if not count:
+            return []
+        results = self.collection.query(
+            query_embeddings=[[float(value) for value in embedding]],
+            n_results=min(n_results, count),
+            include=['distances']
+        )
+        return list(zip(results['ids'][0], results['distances'][0]))
+
+    def count(self):
+        return self.collection.count()
+
+    def clear(self):
+        # A collection keeps its dimension even when emptied, so start a new one
+        self.client.delete_collection(self.name)
+        self.collection = self.client.get_or_create_collection(name=self.name, **self.collection_options)
+
+class NumpyIndex(VectorIndex):
+    """Exact cosine search over a memory-mapped float32 matrix.
+
+    Row i of vectors.f32 holds the normalized embedding of ids[i], so a query
+    is one matrix-vector product and a partial sort; distances are
+    1 - cosine similarity. Rows of deleted ids are reused. The ids and the
+    matrix are read once; call refresh after another process writes them.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.ids_path = os.path.join(directory, "ids.json")
+        self._lock = threading.RLock()
+        self._load()
+
+    def _load(self):
+        self.dimensions: Optional[int] = None
+        self.capacity = 0
+        self.ids: List[Optional[str]] = []  # by row; None marks a free row
+        self._matrix = None
+        if os.path.exists(self.ids_path):
+            with open(self.ids_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.dimensions = data['dimensions']
+            self.ids = data['ids']
+            self._open(data['capacity'])
+        self._rows = {question_id: row for row, question_id in enumerate(self.ids) if question_id is not None}
+        self._free = [row for row, question_id in enumerate(self.ids) if question_id is None]
+        self._live = np.zeros(self.capacity, dtype=bool)
+        self._live[list(self._rows.values())] = True
+
+    def _open(self, capacity: int):
+        self.capacity = capacity
+        self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode='r+',
+                                 shape=(capacity, self.dimensions)) if capacity else None
+
+    def _grow(self, rows_needed: int):
+        capacity = max(64, self.capacity * 2, rows_needed)
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+        # Extending the file pads it with zeros
+        with open(self.vectors_path, 'ab') as f:
+            f.truncate(capacity * self.dimensions * 4)
+        self._open(capacity)
+        live = np.zeros(capacity, dtype=bool)
+        live[:len(self._live)] = self._live
+        self._live = live
+
+    def _save(self):
+        if self._matrix is not None:
+            self._matrix.flush()
+        tmp_path = f"{self.ids_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'dimensions': self.dimensions, 'capacity': self.capacity, 'ids': self.ids}, f)
+        os.replace(tmp_path, self.ids_path)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None):
+        if not ids:
+            return
+        vectors = self._normalize(np.asarray(embeddings, dtype=np.float32))
+        with self._lock:
+            if self.dimensions is None:
+                self.dimensions = vectors.shape[1]
+            elif vectors.shape[1] != self.dimensions:
+                raise ValueError(f"Expected {self.dimensions}-dimensional embeddings, got {vectors.shape[1]}")
+
+            rows = []
+            for question_id in ids:
+                row = self._rows.get(question_id)
+                if row is None:
+                    if self._free:
+                        row = self._free.pop()
+                    else:
+                        row = len(self.ids)
+                        self.ids.append(None)
+                    self.ids[row] = question_id
+                    self._rows[question_id] = row
+                rows.append(row)
+            if len(self.ids) > self.capacity:
+                self._grow(len(self.ids))
+
+            self._matrix[rows] = vectors
+            self._live[rows] = True
+            self._save()
+
+    def delete(self, ids):
+        with self._lock:
+            for question_id in ids:
+                row = self._rows.pop(question_id, None)
+                if row is not None:
+                    self.ids[row] = None
+                    self._live[row] = False
+                    self._free.append(row)
+            self._save()
+
+    def query(self, embedding, n_results):
+        query = self._normalize(np.asarray(embedding, dtype=np.float32))
+        with self._lock:
+            k = min(n_results, len(self._rows))
+            if k <= 0:
+                return []
+            rows = len(self.ids)
+            scores = self._matrix[:rows] @ query
+            scores[~self._live[:rows]] = -np.inf
+            top = np.argpartition(-scores, k - 1)[:k] if k < rows else np.arange(rows)
+            top = top[np.argsort(-scores[top], kind='stable')][:k]
+            return [(self.ids[row], float(1.0 - scores[row])) for row in top]
+
+    def count(self):
+        return len(self._rows)
+
+    def refresh(self):
+        """Reload ids.json and re-open the matrix, which another process may have rewritten or grown"""
+        with self._lock:
+            self._load()
+
+    def clear(self):
+        with self._lock:
+            self._matrix = None
+            if os.path.exists(self.vectors_path):
+                os.remove(self.vectors_path)
+            self.dimensions = None
+            self.capacity = 0
+            self.ids = []
+            self._rows = {}
+            self._free = []
+            self._live = np.zeros(0, dtype=bool)
+            self._save()
+
+    def vectors(self) -> Tuple[List[str], np.ndarray]:
+        """Every stored id with its normalized vector, as (ids, matrix)"""
+        with self._lock:
+            ids = list(self._rows)
+            if not ids:
+                return [], np.zeros((0, self.dimensions or 0), dtype=np.float32)
+            return ids, np.asarray(self._matrix[[self._rows[question_id] for question_id in ids]])
+
+class QuestionBodyStore:
+    """Parsed questions by id, in SQLite next to the index"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS questions (
+                id TEXT PRIMARY KEY,
+                file_id TEXT NOT NULL,
+                question_index INTEGER NOT NULL,
+                body TEXT NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0)")
+        self._conn.commit()
+
+    def put_many(self, entries: List[Tuple[str, str, int, Dict]]):
+        """Store (id, file_id, question_index, question) entries"""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO questions (id, file_id, question_index, body) VALUES (?, ?, ?, ?)",
+                [(question_id, file_id, idx, json.dumps(question)) for question_id, file_id, idx, question in entries]
+            )
+            self._conn.commit()
+
+    def delete(self, ids: List[str]):
+        with self._lock:
+            self._conn.executemany("DELETE FROM questions WHERE id = ?", [(question_id,) for question_id in ids])
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM questions")
+            self._conn.commit()
+
+    def get_many(self, ids: Sequence[str]) -> Dict[str, Tuple[str, Dict]]:
+        """Map each stored id to (file_id, question); unknown ids are left out"""
+        found = {}
+        ids = list(ids)
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT id, file_id, body FROM questions WHERE id IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                )
+                for question_id, file_id, body in rows:
+                    found[question_id] = (file_id, json.loads(body))
+        return found
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+
+    def generation(self) -> int:
+        """A counter that changes whenever the index is written, by any process"""
+        with self._lock:
+            return self._conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()[0]
+
+    def bump_generation(self):
+        with self._lock:
+            self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+            self._conn.commit()
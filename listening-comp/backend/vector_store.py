@@ -2,70 +2,124 @@ import chromadb
 from chromadb.utils import embedding_functions
 import json
 import os
-import boto3
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import re
+import time
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+if __name__ == "__main__" and not __package__:
+    # Run as a script from backend/: make the package imports below work
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = "backend"
+
+from .embeddings import EmbeddingCache, EmbeddingError, embed_texts
+from .throttling import bedrock_runtime_client
+from .index_manifest import IndexManifest, file_sha256, question_hash
+from .vector_index import ChromaIndex, NumpyIndex, QuestionBodyStore
+
+# Embeddings survive re-indexing and rebuilding the Chroma collection
+DEFAULT_CACHE_PATH = "data/embedding_cache.sqlite3"
 
 class BedrockEmbeddingFunction(embedding_functions.EmbeddingFunction):
-    def __init__(self, model_id="amazon.titan-embed-text-v1"):
-        """Initialize Bedrock embedding function"""
-        self.bedrock_client = boto3.client('bedrock-runtime', region_name="us-east-1")
+    def __init__(self, model_id="amazon.titan-embed-text-v1", cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+                 max_workers: int = 8, max_retries: int = 5, base_delay: float = 0.5,
+                 endpoint_url: Optional[str] = None):
+        """Initialize Bedrock embedding function.
+
+        At most max_workers InvokeModel calls run at once; throttled and
+        transient failures are retried with backoff. Embeddings are cached
+        in SQLite at cache_path (None disables the cache). endpoint_url, or
+        BEDROCK_ENDPOINT_URL, points the client elsewhere, e.g. at fake_bedrock.
+        """
+        # Retries happen in embed_texts; one connection per worker
+        self.bedrock_client = bedrock_runtime_client(max_workers, endpoint_url)
         self.model_id = model_id
+        self.cache = EmbeddingCache(cache_path) if cache_path else None
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+
+    def _embed(self, text: str) -> List[float]:
+        response = self.bedrock_client.invoke_model(
+            modelId=self.model_id,
+            body=json.dumps({
+                "inputText": text
+            })
+        )
+        response_body = json.loads(response['body'].read())
+        return response_body['embedding']
 
     def __call__(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for a list of texts using Bedrock"""
-        embeddings = []
-        for text in texts:
-            try:
-                response = self.bedrock_client.invoke_model(
-                    modelId=self.model_id,
-                    body=json.dumps({
-                        "inputText": text
-                    })
-                )
-                response_body = json.loads(response['body'].read())
-                embedding = response_body['embedding']
-                embeddings.append(embedding)
-            except Exception as e:
-                print(f"Error generating embedding: {str(e)}")
-                # Return a zero vector as fallback
-                embeddings.append([0.0] * 1536)  # Titan model uses 1536 dimensions
-        return embeddings
+        """Generate embeddings for a list of texts using Bedrock.
+
+        Raises EmbeddingError if any text still fails after retries, rather
+        than indexing a meaningless zero vector for it.
+        """
+        return embed_texts(
+            texts, self._embed, self.model_id,
+            cache=self.cache,
+            max_workers=self.max_workers,
+            max_retries=self.max_retries,
+            base_delay=self.base_delay
+        )
 
 class FrenchQuestionVectorStore:
-    def __init__(self, persist_directory: str = "data/vectorstore"):
-        """Initialize the vector store for French listening questions"""
+    def __init__(self, persist_directory: str = "data/vectorstore", backend: Optional[str] = None):
+        """Initialize the vector store for French listening questions.
+
+        backend is "chroma" (default) or "numpy", or else the VECTOR_BACKEND
+        environment variable. Each backend keeps its own index, question
+        bodies and manifest.
+        """
         self.persist_directory = persist_directory
-        
-        # Initialize ChromaDB client
-        self.client = chromadb.PersistentClient(path=persist_directory)
+        self.backend = backend or os.environ.get("VECTOR_BACKEND", "chroma")
         
         # Use Bedrock's Titan embedding model
         self.embedding_fn = BedrockEmbeddingFunction()
         
-        # Create or get collection for French listening questions
-        self.collection = self.client.get_or_create_collection(
-            name="french_listening_questions",
-            embedding_function=self.embedding_fn,
-            metadata={"description": "DELF French listening comprehension questions"}
-        )
+        if self.backend == "chroma":
+            index_directory = persist_directory
+            
+            # Initialize ChromaDB client
+            self.client = chromadb.PersistentClient(path=persist_directory)
+            
+            # Create or get collection for French listening questions
+            self.index = ChromaIndex(
+                self.client,
+                "french_listening_questions",
+                embedding_function=self.embedding_fn,
+                metadata={"description": "DELF French listening comprehension questions"}
+            )
+        elif self.backend == "numpy":
+            index_directory = os.path.join(persist_directory, "numpy")
+            self.index = NumpyIndex(index_directory)
+        else:
+            raise ValueError(f"Unknown vector backend {self.backend!r}, expected 'chroma' or 'numpy'")
+        
+        self.bodies = QuestionBodyStore(os.path.join(index_directory, "questions.sqlite3"))
+        # Generation the index was last read at; another process may re-index in between
+        self._read_generation = self.bodies.generation()
+        self.manifest_path = os.path.join(index_directory, "index_manifest.json")
 
     def add_questions(self, questions: List[Dict], file_id: str):
-        """Add questions to the vector store"""
+        """Add questions to the vector store, replacing any with the same ids"""
+        self._upsert_questions([(file_id, idx, question) for idx, question in enumerate(questions)])
+        print(f"Added {len(questions)} questions from file {file_id}")
+
+    def _upsert_questions(self, entries: List[Tuple[str, int, Dict]]):
+        """Embed and upsert (file_id, question_index, question) entries"""
         ids = []
         documents = []
         metadatas = []
         
-        for idx, question in enumerate(questions):
+        for file_id, idx, question in entries:
             # Create a unique ID for each question
             question_id = f"{file_id}_{idx}"
             ids.append(question_id)
-            
-            # Store the full question structure as metadata
             metadatas.append({
                 "file_id": file_id,
-                "question_index": idx,
-                "full_structure": json.dumps(question)
+                "question_index": idx
             })
             
             # Create a searchable document from the question content
@@ -76,41 +130,62 @@ class FrenchQuestionVectorStore:
             """
             documents.append(document)
         
-        # Add to collection
-        self.collection.add(
-            ids=ids,
-            documents=documents,
-            metadatas=metadatas
-        )
-        
-        print(f"Added {len(questions)} questions from file {file_id}")
+        # Embed first: if that fails, neither the index nor the bodies change
+        embeddings = self.embedding_fn(documents)
+        self.bodies.put_many([
+            (question_id, file_id, idx, question)
+            for question_id, (file_id, idx, question) in zip(ids, entries)
+        ])
+        # Upsert, so re-indexing a file never collides with its old ids
+        self.index.upsert(ids, embeddings, documents=documents, metadatas=metadatas)
+        self.bodies.bump_generation()
 
-    def search_similar_questions(self, query: str, n_results: int = 5) -> List[Dict]:
-        """Search for similar questions in the vector store"""
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=n_results
-        )
+    def delete_questions(self, ids: List[str]):
+        """Remove questions from the index and the body store"""
+        self.index.delete(ids)
+        self.bodies.delete(ids)
+        self.bodies.bump_generation()
+
+    def clear(self):
+        """Remove every question, e.g. before re-embedding with a model of another dimension"""
+        self.index.clear()
+        self.bodies.clear()
+        self.bodies.bump_generation()
+
+    def index_generation(self) -> int:
+        """Changes after every write to the index, so callers can tell their cached searches are stale"""
+        return self.bodies.generation()
+
+    def search_by_embedding(self, embedding: List[float], n_results: int = 5) -> List[Dict]:
+        """The n_results questions closest to an already embedded query"""
+        generation = self.bodies.generation()
+        if generation != self._read_generation:
+            self.index.refresh()
+            self._read_generation = generation
+        hits = self.index.query(embedding, n_results)
+        bodies = self.bodies.get_many([question_id for question_id, _ in hits])
         
         # Convert results to more usable format
         questions = []
-        for idx, metadata in enumerate(results['metadatas'][0]):
-            question_data = json.loads(metadata['full_structure'])
-            question_data['similarity_score'] = results['distances'][0][idx] if 'distances' in results else None
-            question_data['file_id'] = metadata['file_id']
+        for question_id, distance in hits:
+            if question_id not in bodies:
+                continue
+            file_id, question_data = bodies[question_id]
+            question_data['similarity_score'] = distance
+            question_data['file_id'] = file_id
             questions.append(question_data)
             
         return questions
 
+    def search_similar_questions(self, query: str, n_results: int = 5) -> List[Dict]:
+        """Search for similar questions in the vector store"""
+        return self.search_by_embedding(self.embedding_fn([query])[0], n_results)
+
     def get_question_by_id(self, question_id: str) -> Optional[Dict]:
         """Retrieve a specific question by its ID"""
-        result = self.collection.get(
-            ids=[question_id],
-            include=['metadatas']
-        )
-        
-        if result['metadatas']:
-            return json.loads(result['metadatas'][0]['full_structure'])
+        result = self.bodies.get_many([question_id])
+        if question_id in result:
+            return result[question_id][1]
         return None
 
     def parse_questions_from_file(self, filename: str) -> List[Dict]:
@@ -194,25 +269,136 @@ class FrenchQuestionVectorStore:
         
         # Add to vector store
         if questions:
-            self.add_questions(questions, file_id)
+            try:
+                self.add_questions(questions, file_id)
+            except EmbeddingError as e:
+                # Nothing from the file is indexed; rerunning only embeds what failed
+                print(f"Error indexing {filename}: {str(e)}")
+                return
             print(f"Indexed {len(questions)} questions from {filename}")
         else:
             print(f"No valid questions found in {filename}")
 
-    def index_questions_directory(self, directory: str):
-        """Index all question files in a directory"""
+    def _scan_file(self, path: str, entry: Optional[Dict]) -> Tuple[Optional[Dict], Optional[List[Dict]]]:
+        """Compare one file with its manifest entry; runs in the indexing pool.
+
+        Returns (None, None) if it is untouched, (entry, None) if only its
+        mtime changed, and (entry, questions) if it has to be diffed.
+        """
+        stat = os.stat(path)
+        if entry and entry.get('mtime') == stat.st_mtime and entry.get('size') == stat.st_size:
+            return None, None
+        info = {'path': path, 'mtime': stat.st_mtime, 'size': stat.st_size, 'sha256': file_sha256(path)}
+        if entry and entry.get('sha256') == info['sha256']:
+            return {**info, 'questions': entry['questions']}, None
+        return info, self.parse_questions_from_file(path)
+
+    def index_questions_directory(self, directory: str, max_workers: int = 4, batch_size: int = 64) -> Dict:
+        """Bring the index in line with the question files in a directory.
+
+        Only questions added, changed or removed since the last run (per the
+        manifest) are upserted or deleted. Files are hashed and parsed by
+        max_workers threads, and questions are upserted batch_size at a time
+        (each batch is embedded concurrently by the embedding function).
+        Returns counts and timings of the run.
+        """
         if not os.path.exists(directory):
             print(f"Directory {directory} does not exist")
-            return
+            return {}
+        
+        started = time.perf_counter()
+        manifest = IndexManifest(self.manifest_path)
+        # A different embedding model makes every stored vector stale
+        reembed = manifest.model_id != self.embedding_fn.model_id
+        if reembed:
+            self.clear()
+            manifest.files = {}
+        paths = {
+            os.path.basename(filename).split('.')[0]: os.path.join(os.path.normpath(directory), filename)
+            for filename in sorted(os.listdir(directory))
+            if filename.endswith(".txt")
+        }
+        stats = {'files': len(paths), 'unchanged_files': 0, 'changed_files': 0, 'removed_files': 0,
+                 'failed_files': 0, 'upserted': 0, 'deleted': 0, 'failed': 0}
+        
+        upserts = []  # (file_id, question_index, question)
+        deletes = []
+        pending = {}  # file_id -> manifest entry, recorded once its questions are written
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                file_id: pool.submit(self._scan_file, path, None if reembed else manifest.files.get(file_id))
+                for file_id, path in paths.items()
+            }
+            for file_id, future in futures.items():
+                try:
+                    info, questions = future.result()
+                except OSError as e:
+                    print(f"Error reading {paths[file_id]}: {str(e)}")
+                    stats['failed_files'] += 1
+                    continue
+                if info is None:
+                    stats['unchanged_files'] += 1
+                    continue
+                if questions is None:
+                    manifest.files[file_id] = info
+                    stats['unchanged_files'] += 1
+                    continue
+                
+                stats['changed_files'] += 1
+                old_hashes = manifest.files.get(file_id, {}).get('questions', {})
+                hashes = {}
+                for idx, question in enumerate(questions):
+                    question_id = f"{file_id}_{idx}"
+                    hashes[question_id] = question_hash(question)
+                    if reembed or old_hashes.get(question_id) != hashes[question_id]:
+                        upserts.append((file_id, idx, question))
+                deletes.extend(question_id for question_id in old_hashes if question_id not in hashes)
+                pending[file_id] = {**info, 'questions': hashes}
+        
+        # Files indexed from this directory before but gone now
+        for file_id, entry in list(manifest.files.items()):
+            if file_id not in paths and os.path.dirname(entry.get('path', '')) == os.path.normpath(directory):
+                deletes.extend(entry.get('questions', {}))
+                del manifest.files[file_id]
+                stats['removed_files'] += 1
+        
+        for start in range(0, len(deletes), batch_size):
+            self.delete_questions(deletes[start:start + batch_size])
+        stats['deleted'] = len(deletes)
+        
+        failed_ids = set()
+        upsert_started = time.perf_counter()
+        for start in range(0, len(upserts), batch_size):
+            batch = upserts[start:start + batch_size]
+            try:
+                self._upsert_questions(batch)
+            except EmbeddingError as e:
+                print(f"Error upserting questions {start + 1}-{start + len(batch)}: {str(e)}")
+                failed_ids.update(f"{file_id}_{idx}" for file_id, idx, _ in batch)
+                continue
+            stats['upserted'] += len(batch)
+            elapsed = time.perf_counter() - upsert_started
+            print(f"Upserted {stats['upserted']}/{len(upserts)} questions "
+                  f"({stats['upserted'] / elapsed:.1f} questions/s)")
+        stats['failed'] = len(failed_ids)
         
-        file_count = 0
-        for filename in os.listdir(directory):
-            if filename.endswith(".txt"):
-                full_path = os.path.join(directory, filename)
-                self.index_questions_file(full_path)
-                file_count += 1
+        for file_id, entry in pending.items():
+            if failed_ids.intersection(entry['questions']):
+                # Forget the failed questions and the file hash, so the next run retries them
+                entry = {**entry, 'mtime': None, 'sha256': None, 'questions': {
+                    question_id: digest for question_id, digest in entry['questions'].items()
+                    if question_id not in failed_ids
+                }}
+            manifest.files[file_id] = entry
+        manifest.model_id = self.embedding_fn.model_id
+        manifest.save()
         
-        print(f"Indexed questions from {file_count} files in {directory}")
+        stats['seconds'] = round(time.perf_counter() - started, 3)
+        print(f"Indexed {stats['files']} files in {directory} in {stats['seconds']}s: "
+              f"{stats['changed_files']} changed, {stats['unchanged_files']} unchanged, "
+              f"{stats['removed_files']} removed; {stats['upserted']} questions upserted, "
+              f"{stats['deleted']} deleted, {stats['failed']} failed")
+        return stats
 
 if __name__ == "__main__":
     # Example usage
@@ -26,11 +26,16 @@ if 'answers_submitted' not in st.session_state:
 if 'selected_answers' not in st.session_state:
     st.session_state.selected_answers = []
 
+@st.cache_resource
+def get_question_generator():
+    """One generator per server process, so its warmed retrieval cache survives reruns"""
+    return QuestionGenerator()
+
 def main():
     st.title("🇫🇷 French Learning Assistant")
     
     # Initialize generators and stores
-    generator = QuestionGenerator()
+    generator = get_question_generator()
     question_store = QuestionStore()
     audio_generator = AudioGenerator()
     
@@ -76,7 +81,7 @@ def main():
         with col1:
             practice_type = st.selectbox(
                 "Select Practice Type",
-                ["Dialogue Practice", "Vocabulary Quiz", "Listening Exercise"],
+                QuestionGenerator.PRACTICE_TYPES,
                 key="practice_type"
             )
 
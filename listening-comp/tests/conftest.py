@@ -0,0 +1,28 @@
+import pytest
+
+from backend.fake_bedrock import FakeBedrockServer
+
+# Small vectors keep the fake embeddings cheap
+DIMENSIONS = 16
+
+@pytest.fixture
+def bedrock(tmp_path, monkeypatch):
+    """A fake Bedrock runtime that every client created in the test talks to.
+
+    The test runs in tmp_path, so the default embedding cache and checkpoint
+    paths land there too.
+    """
+    monkeypatch.chdir(tmp_path)
+    with FakeBedrockServer(dimensions=DIMENSIONS) as server:
+        monkeypatch.setenv("BEDROCK_ENDPOINT_URL", server.url)
+        yield server
+
+def question_text(introduction, conversation="Bonjour. Au revoir.", questions="1. Qui parle ?"):
+    return f"Introduction:\n{introduction}\n\nConversation:\n{conversation}\n\nQuestions:\n{questions}\n--\n"
+
+def write_questions(directory, file_id, introductions):
+    """A question file in the format the vector store parses, one question per introduction"""
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{file_id}.txt"
+    path.write_text("".join(question_text(introduction) for introduction in introductions), encoding="utf-8")
+    return path
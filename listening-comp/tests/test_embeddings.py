@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from backend.embeddings import EmbeddingCache, EmbeddingError, text_hash
+from backend.fake_bedrock import fake_embedding
+from backend.throttling import call_with_retries
+from backend.vector_store import BedrockEmbeddingFunction
+
+from .conftest import DIMENSIONS
+
+TEXTS = [f"Question {i} sur le dialogue" for i in range(12)]
+
+def embedding_fn(bedrock, cache_path=None, **kwargs):
+    return BedrockEmbeddingFunction(cache_path=cache_path, endpoint_url=bedrock.url, base_delay=0.01, **kwargs)
+
+def test_throttled_calls_are_retried(bedrock):
+    bedrock.throttle_every = 3
+    vectors = embedding_fn(bedrock, max_workers=4)(TEXTS)
+    assert np.allclose(vectors, [fake_embedding(text, DIMENSIONS) for text in TEXTS])
+    # Every third request was throttled and made again
+    assert bedrock.requests > len(TEXTS)
+
+def test_failed_texts_raise_instead_of_zero_vectors(bedrock, tmp_path):
+    bedrock.fail_texts = {TEXTS[1], TEXTS[5]}
+    fn = embedding_fn(bedrock, cache_path=str(tmp_path / "cache.sqlite3"))
+    with pytest.raises(EmbeddingError) as error:
+        fn(TEXTS)
+    assert set(error.value.failures) == {text_hash(TEXTS[1]), text_hash(TEXTS[5])}
+    assert "2 of 12" in str(error.value)
+
+    # The texts that succeeded were cached; only the failed ones are sent again
+    bedrock.fail_texts = set()
+    requests = bedrock.requests
+    vectors = fn(TEXTS)
+    assert bedrock.requests - requests == 2
+    assert all(any(value != 0 for value in vector) for vector in vectors)
+
+def test_cache_hits_skip_invoke_model(bedrock, tmp_path):
+    cache_path = str(tmp_path / "cache.sqlite3")
+    first = embedding_fn(bedrock, cache_path=cache_path)(TEXTS + TEXTS[:3])
+    # Duplicates are embedded once
+    assert bedrock.requests == len(TEXTS)
+
+    # A new function on the same cache file, as after a restart
+    second = embedding_fn(bedrock, cache_path=cache_path)(list(reversed(TEXTS)))
+    assert bedrock.requests == len(TEXTS)
+    assert np.allclose(second, list(reversed(first[:len(TEXTS)])))
+
+    other_model = embedding_fn(bedrock, cache_path=cache_path, model_id="amazon.titan-embed-text-v2:0")
+    other_model(TEXTS[:2])
+    assert bedrock.requests == len(TEXTS) + 2
+    assert len(EmbeddingCache(cache_path)) == len(TEXTS) + 2
+
+def test_only_retryable_errors_are_retried():
+    delays = []
+
+    def fail():
+        raise ValueError("not a Bedrock error")
+
+    with pytest.raises(ValueError):
+        call_with_retries(fail, max_retries=3, sleep=delays.append)
+    assert delays == []
@@ -0,0 +1,61 @@
+import os
+
+from backend.index_manifest import IndexManifest
+from backend.vector_store import FrenchQuestionVectorStore
+
+from .conftest import write_questions
+
+def counts(stats):
+    return {key: stats[key] for key in ('changed_files', 'unchanged_files', 'removed_files',
+                                        'upserted', 'deleted', 'failed')}
+
+def test_only_changed_questions_are_reindexed(bedrock, tmp_path):
+    questions = tmp_path / "questions"
+    write_questions(questions, "a", ["À la gare.", "Au café."])
+    write_questions(questions, "b", ["Au marché.", "Chez le médecin."])
+    write_questions(questions, "c", ["À la banque."])
+    store = FrenchQuestionVectorStore(str(tmp_path / "store"), backend="numpy")
+
+    stats = store.index_questions_directory(str(questions), batch_size=2)
+    assert counts(stats) == {'changed_files': 3, 'unchanged_files': 0, 'removed_files': 0,
+                             'upserted': 5, 'deleted': 0, 'failed': 0}
+
+    # Nothing changed, and a file that was only touched is hashed but not re-embedded
+    os.utime(questions / "a.txt", (1, 1))
+    requests = bedrock.requests
+    stats = store.index_questions_directory(str(questions))
+    assert counts(stats) == {'changed_files': 0, 'unchanged_files': 3, 'removed_files': 0,
+                             'upserted': 0, 'deleted': 0, 'failed': 0}
+    assert bedrock.requests == requests
+
+    write_questions(questions, "b", ["Au marché.", "À la pharmacie.", "À la poste."])
+    (questions / "c.txt").unlink()
+    stats = store.index_questions_directory(str(questions))
+    assert counts(stats) == {'changed_files': 1, 'unchanged_files': 1, 'removed_files': 1,
+                             'upserted': 2, 'deleted': 1, 'failed': 0}
+    assert store.index.count() == store.bodies.count() == 5
+    assert store.get_question_by_id("c_0") is None
+    assert store.get_question_by_id("b_1")['introduction'] == "À la pharmacie."
+    assert set(IndexManifest(store.manifest_path).files) == {"a", "b"}
+
+def test_failed_batches_are_retried_on_the_next_run(bedrock, tmp_path):
+    questions = tmp_path / "questions"
+    write_questions(questions, "a", ["À la gare."])
+    store = FrenchQuestionVectorStore(str(tmp_path / "store"), backend="numpy")
+    store.index_questions_directory(str(questions))
+
+    # Every call is throttled and nothing is retried, so the new file fails
+    bedrock.throttle_every = 1
+    store.embedding_fn.max_retries = 0
+    write_questions(questions, "b", ["Au marché.", "Au café."])
+    stats = store.index_questions_directory(str(questions))
+    assert (stats['upserted'], stats['failed']) == (0, 2)
+    assert store.index.count() == 1
+    entry = IndexManifest(store.manifest_path).files["b"]
+    assert entry['sha256'] is None and entry['questions'] == {}
+
+    bedrock.throttle_every = 0
+    stats = store.index_questions_directory(str(questions))
+    assert counts(stats) == {'changed_files': 1, 'unchanged_files': 1, 'removed_files': 0,
+                             'upserted': 2, 'deleted': 0, 'failed': 0}
+    assert store.index.count() == 3
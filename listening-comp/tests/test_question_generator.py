@@ -0,0 +1,47 @@
+from backend.question_generator import QuestionGenerator
+
+from .conftest import write_questions
+
+QUERY = QuestionGenerator.search_query("Dialogue Practice", "Travel")
+
+def make_generator(tmp_path, monkeypatch):
+    monkeypatch.setenv("VECTOR_BACKEND", "numpy")
+    generator = QuestionGenerator(warm_cache=False)
+    # Without the embedding cache, every search shows up as a request to Bedrock
+    generator.vector_store.embedding_fn.cache = None
+    write_questions(tmp_path / "questions", "a", ["Dans une gare.", "Au marché.", "Chez le médecin."])
+    generator.vector_store.index_questions_directory(str(tmp_path / "questions"))
+    return generator
+
+def test_warmed_queries_send_no_requests(bedrock, tmp_path, monkeypatch):
+    generator = make_generator(tmp_path, monkeypatch)
+    generator.warm_retrieval_cache()
+
+    requests = bedrock.requests
+    first = generator.similar_questions(QUERY)
+    assert len(first) == QuestionGenerator.EXAMPLES_PER_PROMPT
+    assert generator.similar_questions(QUERY) == first
+    assert bedrock.requests == requests
+
+def test_new_questions_invalidate_the_cache(bedrock, tmp_path, monkeypatch):
+    generator = make_generator(tmp_path, monkeypatch)
+    generator.similar_questions(QUERY)
+
+    store = generator.vector_store
+    path = write_questions(tmp_path / "questions", "b", ["À la plage."])
+    store.add_questions(store.parse_questions_from_file(str(path)), "b")
+
+    requests = bedrock.requests
+    generator.similar_questions(QUERY)
+    assert bedrock.requests == requests + 1
+    generator.similar_questions(QUERY)
+    assert bedrock.requests == requests + 1
+
+def test_callers_cannot_change_cached_results(bedrock, tmp_path, monkeypatch):
+    generator = make_generator(tmp_path, monkeypatch)
+    first = generator.similar_questions(QUERY)
+    expected = [dict(question) for question in first]
+
+    first[0]["introduction"] = "changed"
+    first.clear()
+    assert generator.similar_questions(QUERY) == expected
@@ -0,0 +1,75 @@
+import random
+import time
+
+from backend.fake_bedrock import stub_reply
+from backend.structured_data import FALLBACK_TITLE, FrenchTranscriptStructurer
+
+TRANSCRIPTS = {
+    "b_gare.txt": "Bonjour madame, je voudrais un billet de train pour Lyon demain matin. "
+                  "Pardon, vous préférez un aller simple ou un aller-retour pour ce voyage ? "
+                  "Merci beaucoup, un aller-retour en deuxième classe, c'est combien en tout ? "
+                  "Au revoir et bon voyage, votre train part du quai numéro trois à huit heures.",
+    "a_cafe.txt": "Bonjour monsieur, une table pour deux personnes en terrasse, s'il vous plaît. "
+                  "Excusez-moi, je voudrais un café crème et un croissant au beurre, merci. "
+                  "Monsieur, l'addition s'il vous plaît, je dois partir au travail tout de suite.",
+}
+
+def write_transcripts(directory):
+    directory.mkdir()
+    for name, text in TRANSCRIPTS.items():
+        (directory / name).write_text(text, encoding="utf-8")
+
+def structurer(**kwargs):
+    return FrenchTranscriptStructurer(max_workers=4, requests_per_second=0, base_delay=0.01, **kwargs)
+
+def expected_title(conversation):
+    return " ".join(conversation.split()[:4]).capitalize()
+
+def test_results_keep_file_and_section_order(bedrock, tmp_path):
+    # Replies take random time, so sections finish out of order
+    bedrock.reply = lambda prompt: time.sleep(random.uniform(0, 0.02)) or stub_reply(prompt)
+    write_transcripts(tmp_path / "transcripts")
+    processor = structurer()
+    results = processor.process_transcript_files(str(tmp_path / "transcripts"))
+
+    expected = [
+        (name, i + 1, processor.clean_transcript(section))
+        for name in sorted(TRANSCRIPTS)
+        for i, section in enumerate(processor.split_transcript_into_sections(TRANSCRIPTS[name]))
+    ]
+    assert [(r['file_name'], r['section_num'], r['conversation']) for r in results] == expected
+    # Each section got the answer to its own prompt
+    assert all(r['introduction'] == expected_title(r['conversation']) for r in results)
+    assert bedrock.requests == len(expected) == 7
+    assert bedrock.max_in_flight > 1
+
+def test_checkpoint_resumes_an_interrupted_run(bedrock, tmp_path):
+    write_transcripts(tmp_path / "transcripts")
+    checkpoint = tmp_path / "checkpoint.jsonl"
+    first = structurer().process_transcript_files(str(tmp_path / "transcripts"), str(checkpoint))
+    assert bedrock.requests == 7
+
+    # A crash after two sections, in the middle of writing the third
+    lines = checkpoint.read_text(encoding="utf-8").splitlines(keepends=True)
+    checkpoint.write_text("".join(lines[:2]) + lines[2][:20], encoding="utf-8")
+    resumed = structurer().process_transcript_files(str(tmp_path / "transcripts"), str(checkpoint))
+    assert bedrock.requests == 7 + 5
+    assert resumed == first
+
+    # Everything is in the checkpoint now
+    structurer().process_transcript_files(str(tmp_path / "transcripts"), str(checkpoint))
+    assert bedrock.requests == 12
+
+def test_failed_sections_are_not_checkpointed(bedrock, tmp_path):
+    write_transcripts(tmp_path / "transcripts")
+    checkpoint = tmp_path / "checkpoint.jsonl"
+    bedrock.throttle_every = 1
+    results = structurer(max_retries=0).process_transcript_files(str(tmp_path / "transcripts"), str(checkpoint))
+    assert {r['introduction'] for r in results} == {FALLBACK_TITLE}
+    assert not checkpoint.exists()
+
+    bedrock.throttle_every = 0
+    requests = bedrock.requests
+    results = structurer().process_transcript_files(str(tmp_path / "transcripts"), str(checkpoint))
+    assert bedrock.requests - requests == 7
+    assert FALLBACK_TITLE not in {r['introduction'] for r in results}
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from backend.vector_index import NumpyIndex, VectorIndex
+from backend.vector_store import FrenchQuestionVectorStore
+
+from .conftest import write_questions
+
+def test_vector_index_is_abstract():
+    with pytest.raises(TypeError):
+        VectorIndex()
+
+def test_numpy_index_query_delete_and_reload(tmp_path):
+    index = NumpyIndex(str(tmp_path))
+    index.upsert(["a", "b", "c"], [[1, 0, 0], [0, 1, 0], [1, 1, 0]])
+    assert [question_id for question_id, _ in index.query([1, 0.1, 0], 2)] == ["a", "c"]
+    assert index.query([1, 0, 0], 1)[0][1] == pytest.approx(0.0, abs=1e-6)
+
+    index.delete(["a"])
+    index.upsert(["d"], [[0, 0, 1]])
+    # d takes the row a left free
+    assert index.capacity == 64 and len(index.ids) == 3
+
+    reopened = NumpyIndex(str(tmp_path))
+    assert reopened.count() == 3
+    assert reopened.query([0, 0, 1], 1)[0][0] == "d"
+    ids, matrix = reopened.vectors()
+    assert sorted(ids) == ["b", "c", "d"]
+    assert np.allclose(np.linalg.norm(matrix, axis=1), 1.0)
+
+def test_numpy_index_rejects_other_dimensions_until_cleared(tmp_path):
+    index = NumpyIndex(str(tmp_path))
+    index.upsert(["a"], [[1, 0, 0]])
+    with pytest.raises(ValueError):
+        index.upsert(["b"], [[1, 0]])
+
+    index.clear()
+    index.upsert(["b"], [[1, 0]])
+    assert NumpyIndex(str(tmp_path)).query([1, 0], 5) == [("b", pytest.approx(0.0, abs=1e-6))]
+
+@pytest.mark.parametrize("backend", ["numpy", "chroma"])
+def test_new_embedding_model_resets_the_index(bedrock, tmp_path, backend):
+    questions = tmp_path / "questions"
+    write_questions(questions, "a", ["Dans une gare.", "Au marché."])
+    store = FrenchQuestionVectorStore(str(tmp_path / "store"), backend=backend)
+    assert store.index_questions_directory(str(questions))['upserted'] == 2
+
+    # A model with a different dimension re-embeds everything instead of failing
+    bedrock.dimensions = 8
+    store.embedding_fn.model_id = "amazon.titan-embed-text-v2:0"
+    stats = store.index_questions_directory(str(questions))
+    assert (stats['upserted'], stats['failed']) == (2, 0)
+    assert store.index.count() == 2
+    assert store.search_by_embedding([1.0] * 8, 1)[0]['file_id'] == "a"
+
+def test_numpy_index_refresh_sees_other_writers(tmp_path):
+    writer = NumpyIndex(str(tmp_path))
+    writer.upsert(["a"], [[1, 0, 0]])
+    reader = NumpyIndex(str(tmp_path))
+
+    # Grows the matrix past its first capacity and moves "a"'s row to "b"
+    writer.delete(["a"])
+    writer.upsert(["b"] + [f"q{i}" for i in range(99)], [[0, 1, 0]] + [[0, 0, 1]] * 99)
+    reader.refresh()
+    assert reader.count() == 100
+    assert reader.query([0, 1, 0], 1)[0][0] == "b"
+
+def test_store_reads_a_reindex_from_another_process(bedrock, tmp_path):
+    questions = tmp_path / "questions"
+    write_questions(questions, "a", ["Dans une gare.", "Au marché."])
+    indexer = FrenchQuestionVectorStore(str(tmp_path / "store"), backend="numpy")
+    indexer.index_questions_directory(str(questions))
+    reader = FrenchQuestionVectorStore(str(tmp_path / "store"), backend="numpy")
+    query = indexer.embedding_fn(["Introduction: Au marché."])[0]
+    assert reader.search_by_embedding(query, 1)[0]['introduction'] == "Au marché."
+
+    # Another process renames the file, so the rows of "a_*" are reused by "b_*"
+    (questions / "a.txt").unlink()
+    write_questions(questions, "b", ["Au marché.", "Dans une gare."])
+    indexer.index_questions_directory(str(questions))
+    results = reader.search_by_embedding(query, 1)
+    assert [(result['file_id'], result['introduction']) for result in results] == [("b", "Au marché.")]
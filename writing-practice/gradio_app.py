@@ -44,6 +44,7 @@ selected_group_id = None
 current_word_id = None  # Store the current word ID for review submission
 current_session_id = None  # Add this to track the current session
 API_BASE_URL = "http://localhost:8000/api"  # Base API URL for backend
+WRITING_PRACTICE_ACTIVITY_ID = 2
 
 # Custom CSS for larger fonts
 custom_css = """
@@ -90,8 +91,8 @@ except Exception as e:
     logger.warning(f"Error checking tesseract French support: {e}")
 
 def fetch_vocabulary(group_id):
-    """Fetch vocabulary from the API"""
-    global vocabulary, selected_group_id
+    """Fetch the group's vocabulary and its study session from the API in one request"""
+    global vocabulary, selected_group_id, current_session_id
 
     try:
         # Handle different input formats from Gradio dropdown
@@ -105,22 +106,26 @@ def fetch_vocabulary(group_id):
         # Get group name for display purposes
         group_name = group_names.get(group_id, f"Group {group_id}")
         selected_group_id = group_id
+        current_session_id = None
         
         # Log the attempt with improved debugging
         logger.debug(f"Attempting to fetch vocabulary for group ID: {group_id} (Type: {type(group_id)}, Name: {group_name})")
         
-        # Use the group_id directly in the URL
-        url = f'{API_BASE_URL}/groups/{group_id}/words'
+        # The launch bundle has all of the group's words and the session
+        # (resumed or new) that the reviews are recorded in
+        url = f'{API_BASE_URL}/study-activities/{WRITING_PRACTICE_ACTIVITY_ID}/launch'
         logger.debug(f"Requesting from URL: {url}")
         
         try:
-            response = requests.get(url)
+            response = requests.post(url, json={'group_id': int(group_id), 'fields': 'id,french,english,gender,type'})
             logger.debug(f"Response status code: {response.status_code}")
             
-            if response.status_code == 200:
+            if response.status_code in (200, 201):
                 try:
                     response_data = response.json()
                     logger.debug(f"Raw API response keys: {response_data.keys() if isinstance(response_data, dict) else 'not a dict'}")
+                    if isinstance(response_data, dict) and 'session' in response_data:
+                        current_session_id = response_data['session']['id']
                     
                     # Handle different response formats
                     if isinstance(response_data, dict) and 'words' in response_data:
@@ -142,16 +147,9 @@ def fetch_vocabulary(group_id):
                         if 'french' not in word or 'english' not in word:
                             logger.warning(f"Word missing required fields: {word}")
                         
-                        # Set a default gender if not present
-                        if 'gender' not in word and 'parts' in word:
-                            # Try to determine gender from parts if available
-                            parts = word.get('parts', '').lower()
-                            if 'f' in parts:
-                                word['gender'] = 'f'
-                            else:
-                                word['gender'] = 'm'  # Default to masculine
-                        elif 'gender' not in word:
-                            word['gender'] = 'm'  # Default to masculine
+                        # The API sends gender and a derived type ('noun', 'verb', 'adjective') for every word
+                        if 'gender' not in word:
+                            word['gender'] = 'none'
                     
                     logger.debug(f"Received data for group: {group_name}")
                     return f"Successfully loaded {len(vocabulary)} words from {group_name}", display_vocabulary_callback()
@@ -189,21 +187,26 @@ def generate_sentence(word_entry):
     # Log the word we're working with
     logger.debug(f"Working with word: {word} ({english}) - ID: {current_word_id}")
     
-    # Parse parts if it's a JSON string
-    parts_data = {}
-    parts_str = word_entry.get('parts', '')
-    if parts_str and isinstance(parts_str, str):
+    # parts arrives decoded; older backends sent it as a JSON string
+    parts_data = word_entry.get('parts') or {}
+    if isinstance(parts_data, str):
         try:
-            parts_data = json.loads(parts_str)
+            parts_data = json.loads(parts_data)
             logger.debug(f"Successfully parsed parts data: {parts_data.keys()}")
         except json.JSONDecodeError as e:
             logger.warning(f"Could not parse parts JSON: {e}")
+            parts_data = {}
     
     # Determine if it's a verb
     is_verb = False
     
+    # Method 0: Use the word type sent by the API
+    if word_entry.get('type'):
+        is_verb = word_entry['type'] == 'verb'
+        logger.debug(f"Word type from API: {word_entry['type']}")
+    
     # Method 1: Check for 'infinitive' in parts_data
-    if parts_data and 'infinitive' in parts_data:
+    elif parts_data and 'infinitive' in parts_data:
         is_verb = True
         logger.debug("Identified as verb from parts data (infinitive field)")
     
@@ -224,8 +227,8 @@ def generate_sentence(word_entry):
         french_sentence = f"J'aime {word}."
         english_sentence = f"I like to {english.lower().replace('to ', '')}."
     else:
-        # Default to masculine
-        gender = 'm'
+        # Use the gender from the API, defaulting to masculine
+        gender = 'f' if word_entry.get('gender') == 'feminine' else 'm'
         articles = {"m": "le", "f": "la"}
         article = articles.get(gender, "le")
         
@@ -451,7 +454,7 @@ def perform_ocr(image):
         return f"Error in OCR processing: {str(e)}"
 
 def submit_review_to_api(session_id, word_id, grade, transcription, expected_french):
-    """Submit word review to the backend API and update session end time"""
+    """Submit word review to the backend API (which also updates the session end time)"""
     if not session_id or not word_id:
         logger.error("Missing session_id or word_id for API submission")
         return False, "Missing session or word ID"
@@ -477,15 +480,6 @@ def submit_review_to_api(session_id, word_id, grade, transcription, expected_fre
         
         if response.status_code in [200, 201]:
             logger.debug(f"API submission successful: {response.json()}")
-            
-            # Always update the end_time to the current time
-            update_url = f"{API_BASE_URL}/study-sessions/{session_id}/update-time"
-            try:
-                update_response = requests.post(update_url)
-                logger.debug(f"Session time update: {update_response.status_code}")
-            except Exception as update_error:
-                logger.error(f"Error updating session time: {str(update_error)}")
-            
             return True, "Review submitted successfully"
         else:
             logger.error(f"API submission failed: {response.status_code}, {response.text}")
@@ -503,6 +497,10 @@ def create_or_get_study_session():
     if not selected_group_id:
         logger.error("No group selected for creating study session")
         return None, "No vocabulary group selected"
+
+    # Loading the vocabulary already resumed or created one
+    if current_session_id:
+        return current_session_id, "Using existing session"
     
     try:
         # Check if we already have an active session for this group
@@ -619,7 +617,9 @@ def display_vocabulary_callback():
         # Determine word type
         word_type = "Unknown"
         parts_str = word.get('parts', '')
-        if parts_str and isinstance(parts_str, str):
+        if word.get('type'):
+            word_type = word['type'].capitalize()
+        elif parts_str and isinstance(parts_str, str):
             try:
                 parts_data = json.loads(parts_str)
                 if 'infinitive' in parts_data: